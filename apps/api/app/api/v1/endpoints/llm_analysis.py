@@ -439,10 +439,11 @@ async def llm_health_check() -> Dict[str, Any]:
         # Verificar Post Processing Service
         post_processing_service = PostProcessingService()
         await post_processing_service._setup()
+        terms_index = await post_processing_service._terms_index()
         
         post_processing_health = {
-            "medical_dict_loaded": len(post_processing_service.medical_dict) > 0,
-            "aho_corasick_ready": post_processing_service.aho_corasick is not None,
+            "medical_dict_loaded": terms_index is not None,
+            "aho_corasick_ready": terms_index is not None,
             "correction_patterns_loaded": len(post_processing_service.correction_patterns) > 0,
             "is_initialized": post_processing_service.is_initialized
         }
@@ -3,6 +3,7 @@ Endpoints REST API para procesamiento OCR y gestión de documentos.
 """
 
 import logging
+import os
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 from uuid import UUID
@@ -125,20 +126,23 @@ async def process_document(
                 detail=f"Formato no soportado: {file_ext}. Soportados: {supported_formats}"
             )
         
-        # Verificar tamaño de archivo
-        file_content = await file.read()
-        if len(file_content) > 50 * 1024 * 1024:  # 50MB
+        # Verificar tamaño de archivo sin leerlo en memoria
+        file.file.seek(0, os.SEEK_END)
+        file_size = file.file.tell()
+        file.file.seek(0)
+        if file_size > 50 * 1024 * 1024:  # 50MB
             raise HTTPException(
                 status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
                 detail="Archivo demasiado grande. Máximo 50MB."
             )
         
-        # Subir archivo a MinIO
+        # Subir archivo a MinIO por streaming desde el spool del upload
         file_key = f"ocr_documents/{class_session_id}/{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
         
-        await minio_service.upload_file(
-            file_key=file_key,
-            file_data=file_content,
+        await minio_service.upload_stream(
+            file.file,
+            file_key,
+            length=file_size,
             content_type=file.content_type or "application/octet-stream"
         )
         
@@ -165,7 +169,7 @@ async def process_document(
             class_session_id=str(class_session_id),
             task_id=task.id,
             filename=file.filename,
-            file_size=len(file_content)
+            file_size=file_size
         )
         
         return ResponseModel(
@@ -175,7 +179,7 @@ async def process_document(
                 "task_id": task.id,
                 "file_key": file_key,
                 "filename": file.filename,
-                "file_size": len(file_content),
+                "file_size": file_size,
                 "class_session_id": str(class_session_id),
                 "auto_generate_memos": auto_generate_memos,
                 "estimated_processing_time": "60-300 segundos"
@@ -2,11 +2,12 @@
 Endpoints REST API para procesamiento de IA (ASR y Diarización).
 """
 
+import hashlib
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -14,6 +15,8 @@ from app.core import api_logger, get_async_db
 from app.models import ProcessingJob, TranscriptionResult, DiarizationResult, ClassSession
 from app.models.processing_job import TipoProcesamiento, PrioridadProcesamiento, EstadoProcesamiento
 from app.schemas.base import ResponseModel
+from app.services.speaker_fusion_service import speaker_fusion_service
+from app.services.transcript_store_service import transcript_store_service
 from app.tasks.processing import process_audio_complete_task, transcribe_audio_task, diarize_audio_task
 
 
@@ -323,6 +326,80 @@ async def cancel_processing(
         )
 
 
+@router.post("/resume/{processing_job_id}")
+async def resume_processing(
+    processing_job_id: UUID,
+    db: AsyncSession = Depends(get_async_db)
+) -> ResponseModel[Dict[str, Any]]:
+    """
+    Reanudar un pipeline fallido o cancelado desde sus checkpoints.
+    
+    Solo se re-ejecutan las etapas sin checkpoint persistido.
+    """
+    try:
+        # Obtener ProcessingJob
+        processing_job = await db.get(ProcessingJob, processing_job_id)
+        if not processing_job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"ProcessingJob {processing_job_id} no encontrado"
+            )
+        
+        if processing_job.tipo_procesamiento != TipoProcesamiento.FULL_PIPELINE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Solo se pueden reanudar pipelines completos, no {processing_job.tipo_procesamiento.value}"
+            )
+        
+        # Verificar que se puede reanudar
+        if processing_job.estado not in [EstadoProcesamiento.ERROR, EstadoProcesamiento.CANCELADO]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"No se puede reanudar job en estado: {processing_job.estado.value}"
+            )
+        
+        processing_job.estado = EstadoProcesamiento.PENDIENTE
+        processing_job.error_actual = None
+        processing_job.updated_at = datetime.utcnow()
+        await db.commit()
+        
+        task = process_audio_complete_task.delay(str(processing_job.id))
+        processing_job.celery_task_id = task.id
+        await db.commit()
+        
+        etapas_completadas = sorted((processing_job.checkpoints_etapas or {}).keys())
+        
+        api_logger.info(
+            "Procesamiento reanudado",
+            processing_job_id=str(processing_job_id),
+            etapas_completadas=etapas_completadas,
+            celery_task_id=task.id
+        )
+        
+        return ResponseModel(
+            success=True,
+            message="Procesamiento reanudado exitosamente",
+            data={
+                "processing_job_id": str(processing_job_id),
+                "celery_task_id": task.id,
+                "etapas_completadas": etapas_completadas
+            }
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        api_logger.error(
+            "Error reanudando procesamiento",
+            processing_job_id=str(processing_job_id),
+            error=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error interno: {str(e)}"
+        ) from e
+
+
 @router.get("/results/transcription/{transcription_id}")
 async def get_transcription_result(
     transcription_id: UUID,
@@ -365,6 +442,121 @@ async def get_transcription_result(
         )
 
 
+@router.get("/results/transcription/{transcription_id}/segments")
+async def get_transcription_segments(
+    transcription_id: UUID,
+    request: Request,
+    response: Response,
+    t0: Optional[float] = Query(default=None, ge=0.0, description="Inicio del rango en segundos"),
+    t1: Optional[float] = Query(default=None, gt=0.0, description="Fin del rango en segundos"),
+    cursor: int = Query(default=0, ge=0, description="Índice del primer segmento"),
+    limit: int = Query(default=100, ge=1, le=500),
+    include_words: bool = Query(default=True),
+    include_speakers: bool = Query(default=True),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Obtener una página de segmentos por rango de tiempo y/o cursor.
+    
+    Pensado para el reproductor: devuelve solo la ventana pedida, con
+    palabras y etiquetas de speaker. Soporta ``If-None-Match``: el ETag
+    cambia cuando se actualiza la transcripción o su diarización.
+    """
+    try:
+        if t0 is not None and t1 is not None and t1 <= t0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="t1 debe ser mayor que t0"
+            )
+        
+        # Solo metadatos: evita cargar el JSON de segmentos
+        result = await db.execute(
+            select(
+                TranscriptionResult.ruta_segmentos_columnar,
+                TranscriptionResult.processing_job_id,
+                TranscriptionResult.updated_at
+            ).where(TranscriptionResult.id == transcription_id)
+        )
+        transcripcion = result.first()
+        if transcripcion is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"TranscriptionResult {transcription_id} no encontrado"
+            )
+        
+        # De la diarización solo id y fecha: bastan para el ETag
+        diarizacion = None
+        if include_speakers:
+            result = await db.execute(
+                select(DiarizationResult.id, DiarizationResult.updated_at)
+                .where(DiarizationResult.processing_job_id == transcripcion.processing_job_id)
+                .order_by(DiarizationResult.created_at.desc())
+                .limit(1)
+            )
+            diarizacion = result.first()
+        
+        etag = _transcription_etag(transcription_id, transcripcion.updated_at, diarizacion)
+        if _etag_coincide(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        
+        segmentos_json = None
+        if not transcripcion.ruta_segmentos_columnar:
+            segmentos_json = (await db.get(TranscriptionResult, transcription_id)).segmentos
+        tabla = await transcript_store_service.obtener_tabla(
+            transcripcion.ruta_segmentos_columnar, segmentos_json
+        )
+        segmentos, next_cursor = tabla.pagina(t0, t1, cursor, limit, include_words)
+        
+        if diarizacion is not None:
+            # El índice de intervalos se construye una vez por versión de la diarización
+            clave_indice = f"{diarizacion.id}:{diarizacion.updated_at.isoformat() if diarizacion.updated_at else ''}"
+            indexada = speaker_fusion_service.indice_cacheado(clave_indice)
+            if indexada is None:
+                result = await db.execute(
+                    select(
+                        DiarizationResult.segmentos_diarizacion,
+                        DiarizationResult.speakers_clasificados
+                    ).where(DiarizationResult.id == diarizacion.id)
+                )
+                fila = result.one()
+                indexada = speaker_fusion_service.indexar_diarizacion(
+                    clave_indice,
+                    fila.segmentos_diarizacion or [],
+                    fila.speakers_clasificados or []
+                )
+            speaker_fusion_service.etiquetar_segmentos(segmentos, indexada)
+        
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, no-cache"
+        
+        return ResponseModel(
+            success=True,
+            message=f"{len(segmentos)} segmentos",
+            data={
+                "transcription_id": str(transcription_id),
+                "t0": t0,
+                "t1": t1,
+                "cursor": cursor,
+                "next_cursor": next_cursor,
+                "total_segmentos": tabla.num_segmentos,
+                "segmentos": segmentos
+            }
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        api_logger.error(
+            "Error obteniendo segmentos de transcripción",
+            transcription_id=str(transcription_id),
+            error=str(e)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error interno: {str(e)}"
+        ) from e
+
+
 @router.get("/results/diarization/{diarization_id}")
 async def get_diarization_result(
     diarization_id: UUID,
@@ -413,11 +605,13 @@ async def processing_health_check() -> ResponseModel[Dict[str, Any]]:
     Health check de servicios de procesamiento.
     """
     try:
-        from app.services import whisper_service, diarization_service
+        from app.services import whisper_service, diarization_service, inference_executor, result_cache_service, minio_service
         
         # Health check de servicios
         whisper_health = await whisper_service.health_check()
         diarization_health = await diarization_service.health_check()
+        inference_health = await inference_executor.health_check()
+        result_cache_health = await result_cache_service.health_check()
         
         # Estado general
         all_healthy = (
@@ -432,6 +626,9 @@ async def processing_health_check() -> ResponseModel[Dict[str, Any]]:
                 "overall_status": "healthy" if all_healthy else "degraded",
                 "whisper_service": whisper_health,
                 "diarization_service": diarization_health,
+                "inference_executor": inference_health,
+                "result_cache": result_cache_health,
+                "minio_io": minio_service.metricas(),
                 "timestamp": datetime.utcnow().isoformat()
             }
         )
@@ -449,6 +646,40 @@ async def processing_health_check() -> ResponseModel[Dict[str, Any]]:
 # FUNCIONES DE UTILIDAD
 # ============================================================================
 
+def _transcription_etag(
+    transcription_id: UUID,
+    updated_at: Optional[datetime],
+    diarizacion: Optional[Any]
+) -> str:
+    """
+    ETag de la transcripción y de la diarización con la que se etiqueta.
+    
+    ``diarizacion`` es una fila con ``id`` y ``updated_at``.
+    """
+    partes = [str(transcription_id), updated_at.isoformat() if updated_at else ""]
+    if diarizacion is not None:
+        partes += [str(diarizacion.id), diarizacion.updated_at.isoformat() if diarizacion.updated_at else ""]
+    return f'W/"{hashlib.sha1("|".join(partes).encode()).hexdigest()}"'
+
+
+def _etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluar ``If-None-Match`` con comparación débil (RFC 9110).
+    
+    La cabecera es ``*`` o una lista de ETags separados por comas; el
+    prefijo ``W/`` se ignora al comparar.
+    """
+    if not if_none_match:
+        return False
+    
+    etag_opaco = etag.removeprefix("W/")
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*" or candidato.removeprefix("W/") == etag_opaco:
+            return True
+    return False
+
+
 def _estimate_processing_time(tipo_procesamiento: TipoProcesamiento) -> int:
     """Estimar tiempo de procesamiento en minutos."""
     if tipo_procesamiento == TipoProcesamiento.FULL_PIPELINE:
@@ -8,6 +8,7 @@ from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import BaseModel
+import os
 import uuid
 from datetime import datetime
 
@@ -15,6 +16,7 @@ from app.core import settings, api_logger, validate_upload_file, sanitize_filena
 from app.core.database import get_db
 from app.models import ClassSession, UploadSession, EstadoUpload
 from app.services.chunk_service import chunk_service
+from app.tasks.processing import transcribe_incremental_task
 
 router = APIRouter()
 
@@ -172,9 +174,10 @@ async def upload_audio_chunk(
         if not file.filename:
             raise HTTPException(status_code=400, detail="Nombre de archivo requerido")
         
-        # Leer contenido del chunk
-        content = await file.read()
-        file_size = len(content)
+        # Tamaño del chunk sin leerlo en memoria
+        file.file.seek(0, os.SEEK_END)
+        file_size = file.file.tell()
+        file.file.seek(0)
         
         # Validar tamaño del chunk
         max_chunk_size = settings.MAX_CHUNK_SIZE_MB * 1024 * 1024
@@ -189,7 +192,7 @@ async def upload_audio_chunk(
             db=db,
             upload_session_id=upload_session_id,
             chunk_number=chunk_number,
-            chunk_data=content,
+            chunk_data=file.file,
             total_chunks=total_chunks
         )
         
@@ -276,6 +279,10 @@ async def complete_recording_upload(
         # Obtener información final de la sesión de upload
         upload_status = await chunk_service.get_upload_status(db, upload_session_id)
         
+        # Cerrar la transcripción incremental: solo queda la cola sin transcribir
+        if settings.ASR_INCREMENTAL_ENABLED:
+            transcribe_incremental_task.delay(upload_session_id, True)
+        
         # TODO: Encolar tareas de procesamiento (Celery tasks)
         processing_tasks = [
             "asr_transcribe", 
@@ -413,6 +420,7 @@ async def recover_upload_session(
             "recording_id": recording_id,
             "upload_session_id": upload_session_id,
             "chunks_missing": upload_status["missing_chunks"],
+            "chunks_bitmap": upload_status["chunks_bitmap"],
             "chunks_received": upload_status["chunks_received"],
             "total_chunks_expected": upload_status["total_chunks_expected"],
             "progress_percentage": upload_status["progress_percentage"],
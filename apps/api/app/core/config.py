@@ -94,6 +94,12 @@ class Settings(BaseSettings):
     MINIO_SECRET_KEY: str = "minioadmin"
     MINIO_BUCKET: str = "recordings"
     MINIO_SECURE: bool = False
+    MINIO_STREAM_PART_SIZE_MB: int = 8  # Parte de uploads/descargas por streaming (mín. 5)
+    MINIO_IO_MAX_WORKERS: int = 16  # Threads del pool de I/O propio de MinIO
+    MINIO_HTTP_POOL_SIZE: int = 32  # Conexiones HTTP reutilizables por host
+    MINIO_HTTP_CONNECT_TIMEOUT_SEC: float = 10.0
+    MINIO_HTTP_READ_TIMEOUT_SEC: float = 300.0
+    MINIO_BATCH_CONCURRENCY: int = 8  # Operaciones simultáneas en upload_many/download_many
     
     # Nextcloud Configuration (alternativa)
     NEXTCLOUD_URL: Optional[HttpUrl] = None
@@ -200,6 +206,7 @@ class Settings(BaseSettings):
     ENABLE_ASR_CORRECTION: bool = True
     ASR_CONFIDENCE_THRESHOLD: float = 0.8
     MEDICAL_DICT_PATH: str = "data/medical_dict_it.json"
+    TERMINOLOGY_INDEX_REFRESH_SEC: int = 300  # Intervalo de comprobación de cambios en la terminología
     
     # NER Médico
     ENABLE_MEDICAL_NER: bool = True
@@ -219,6 +226,8 @@ class Settings(BaseSettings):
     # Procesamiento
     MAX_PROCESSING_TIME_MINUTES: int = 120
     ENABLE_AUDIO_NORMALIZATION: bool = True
+    FFMPEG_BIN: str = "ffmpeg"
+    FFPROBE_BIN: str = "ffprobe"
     PROCESSING_CHUNK_SIZE_SEC: int = 600
     
     # ==============================================
@@ -288,11 +297,36 @@ class Settings(BaseSettings):
     WHISPER_COMPUTE_TYPE: str = "float16"  # float16, int8, int8_float16
     USE_WHISPERX: bool = True
     VAD_FILTER: bool = True
+    WHISPER_MODEL_POOL_BUDGET_MB: int = 12000  # Memoria para modelos Whisper residentes
+    WHISPER_MODEL_POOL_MAX_MODELS: int = 3  # Modelos calientes simultáneos (LRU)
+    
+    # Transcripción long-form (VAD + ventanas en paralelo)
+    WHISPER_LONGFORM_ENABLED: bool = True
+    WHISPER_LONGFORM_MIN_DURATION_SEC: int = 600  # Duración mínima para trocear
+    WHISPER_LONGFORM_WINDOW_SEC: int = 120  # Duración máxima de cada ventana
+    WHISPER_LONGFORM_OVERLAP_SEC: float = 2.0  # Solape al partir habla continua
+    
+    # ASR incremental durante el upload por chunks
+    ASR_INCREMENTAL_ENABLED: bool = True
+    ASR_INCREMENTAL_EVERY_CHUNKS: int = 6  # Chunks recibidos entre pasadas incrementales
+    ASR_INCREMENTAL_MIN_NEW_AUDIO_SEC: float = 60.0  # Audio nuevo mínimo para transcribir
+    ASR_INCREMENTAL_TAIL_MARGIN_SEC: float = 5.0  # Cola no definitiva hasta el siguiente prefijo
+    ASR_INCREMENTAL_PRESET: str = "MEDICAL_HIGH_PRECISION"
+    
+    # Segmentos de transcripción en formato columnar (MinIO)
+    TRANSCRIPT_COLUMNAR_ENABLED: bool = True
     
     # Diarización
     USE_DIARIZATION: bool = True
     DIARIZATION_MODEL: str = "pyannote/speaker-diarization-3.1"
     HF_TOKEN: Optional[str] = None  # Hugging Face token para pyannote
+    DIARIZATION_EMBEDDING_BATCH_SIZE: int = 32  # Recortes por pasada del modelo de embeddings
+    DIARIZATION_EMBEDDING_MAX_SEGMENTS_PER_SPEAKER: int = 50  # Segmentos promediados por speaker
+    DIARIZATION_EMBEDDING_MAX_CROP_SEC: float = 10.0  # Duración máxima de cada recorte
+    
+    # Executor de inferencia (fuera del event loop)
+    INFERENCE_MAX_WORKERS: int = 2  # Threads concurrentes de inferencia
+    INFERENCE_MAX_QUEUE: int = 8  # Trabajos en espera antes de bloquear el envío
     
     # ==============================================
     # OCR CONFIGURATION
@@ -401,6 +435,9 @@ class Settings(BaseSettings):
     OCR_CHUNK_SIZE: int = 4  # Páginas por chunk
     OCR_TIMEOUT_SECONDS: int = 300  # Timeout procesamiento
     OCR_RETRY_ATTEMPTS: int = 3  # Intentos de retry
+    OCR_PAGE_PARALLEL: bool = True  # OCR de páginas de PDF en paralelo
+    OCR_PAGE_WORKERS: int = 0  # Workers del pool de páginas (0 = núcleos del host)
+    OCR_PDF_STREAMING: bool = True  # Rasterizar cada página del PDF en su worker
     
     # Validación calidad
     OCR_REQUIRE_MEDICAL_VALIDATION: bool = True  # Validar contenido médico
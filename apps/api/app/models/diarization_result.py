@@ -211,6 +211,14 @@ class DiarizationResult(BaseModel):
         comment="Patrones temporales de participación detectados"
     )
     
+    # Cache por contenido
+    clave_cache: Optional[String] = Column(
+        String(64),
+        nullable=True,
+        index=True,
+        comment="SHA-256 de (audio, preset, versión de modelo) para reutilizar resultados"
+    )
+    
     # Timestamps
     created_at: DateTime = Column(
         DateTime(timezone=True),
@@ -141,6 +141,12 @@ class ProcessingJob(BaseModel):
         nullable=True,
         comment="Ruta del audio normalizado para procesamiento"
     )
+    audio_sha256: Optional[String] = Column(
+        String(64),
+        nullable=True,
+        index=True,
+        comment="SHA-256 del audio original (clave de cache del audio normalizado)"
+    )
     chunks_audio: List[Dict[str, Any]] = Column(
         JSON,
         nullable=False,
@@ -181,6 +187,12 @@ class ProcessingJob(BaseModel):
         nullable=True,
         comment="Resultado de fusión ASR + diarización"
     )
+    checkpoints_etapas: Dict[str, Any] = Column(
+        JSON,
+        nullable=False,
+        default=dict,
+        comment="Salida persistida de cada etapa completada, para reanudar tras un fallo"
+    )
     
     # Métricas de calidad
     metricas_calidad: Dict[str, Any] = Column(
@@ -311,7 +323,9 @@ class ProcessingJob(BaseModel):
             "estado": self.estado.value,
             "progreso_porcentaje": self.progreso_porcentaje,
             "etapa_actual": self.etapa_actual.value if self.etapa_actual else None,
+            "etapas_completadas": sorted((self.checkpoints_etapas or {}).keys()),
             "duracion_audio_sec": self.duracion_audio_sec,
+            "audio_sha256": self.audio_sha256,
             "confianza_global": self.confianza_global,
             "tiempo_inicio": self.tiempo_inicio.isoformat() if self.tiempo_inicio else None,
             "tiempo_fin": self.tiempo_fin.isoformat() if self.tiempo_fin else None,
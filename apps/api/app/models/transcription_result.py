@@ -186,6 +186,17 @@ class TranscriptionResult(BaseModel):
         default=False,
         comment="Si se aplicó post-procesamiento del texto"
     )
+    es_parcial: Boolean = Column(
+        Boolean,
+        nullable=False,
+        default=False,
+        comment="Transcripción incremental aún en curso (upload sin completar)"
+    )
+    audio_procesado_hasta_sec: Optional[Float] = Column(
+        Float,
+        nullable=True,
+        comment="Segundo de audio hasta el que la transcripción incremental es definitiva"
+    )
     
     # Timing y rendimiento
     tiempo_procesamiento_sec: Float = Column(
@@ -224,6 +235,21 @@ class TranscriptionResult(BaseModel):
         comment="Estadísticas lingüísticas del texto transcrito"
     )
     
+    # Almacenamiento columnar de segmentos
+    ruta_segmentos_columnar: Optional[String] = Column(
+        String(500),
+        nullable=True,
+        comment="Objeto MinIO con segmentos y palabras en formato columnar (consultas por rango)"
+    )
+    
+    # Cache por contenido
+    clave_cache: Optional[String] = Column(
+        String(64),
+        nullable=True,
+        index=True,
+        comment="SHA-256 de (audio, preset, versión de modelo) para reutilizar resultados"
+    )
+    
     # Timestamps
     created_at: DateTime = Column(
         DateTime(timezone=True),
@@ -274,6 +300,9 @@ class TranscriptionResult(BaseModel):
             "vad_aplicado": self.vad_aplicado,
             "alineacion_temporal_aplicada": self.alineacion_temporal_aplicada,
             "post_procesamiento_aplicado": self.post_procesamiento_aplicado,
+            "es_parcial": self.es_parcial,
+            "audio_procesado_hasta_sec": self.audio_procesado_hasta_sec,
+            "segmentos_columnar_disponible": bool(self.ruta_segmentos_columnar),
             "tiempo_procesamiento_sec": self.tiempo_procesamiento_sec,
             "velocidad_procesamiento": self.velocidad_procesamiento,
             "memoria_gpu_usada_mb": self.memoria_gpu_usada_mb,
@@ -4,12 +4,12 @@ Maneja el estado de uploads chunked con recovery y validación de integridad.
 """
 
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import enum
 
 from sqlalchemy import (
     Column, String, Text, Integer, Float, DateTime, 
-    Enum, ForeignKey, JSON, Boolean
+    Enum, ForeignKey, JSON, Boolean, LargeBinary
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -84,8 +84,10 @@ class UploadSession(BaseModel):
     # TRACKING DE CHUNKS
     # ==============================================
     
-    # Metadata de chunks recibidos: {chunk_number: {size, checksum, received_at}}
-    chunks_metadata = Column(JSON, nullable=False, default=dict)
+    # Bitmap de chunks recibidos: el bit (n - 1) indica si llegó el chunk n.
+    # Orden de bits de get_bit/set_bit de PostgreSQL (bit menos significativo
+    # primero dentro de cada byte). El detalle por chunk vive en ChunkUpload.
+    chunks_bitmap = Column(LargeBinary, nullable=False, default=b"")
     
     # Lista de chunks faltantes (para recovery)
     missing_chunks = Column(JSON, nullable=False, default=list)
@@ -114,6 +116,9 @@ class UploadSession(BaseModel):
     # URL final del archivo (cuando esté completado)
     final_file_url = Column(String(1000), nullable=True)
     
+    # ProcessingJob de ASR incremental (transcripción durante el upload)
+    processing_job_id = Column(UUID(as_uuid=True), nullable=True)
+    
     # ==============================================
     # INFORMACIÓN DE ERRORES
     # ==============================================
@@ -195,49 +200,53 @@ class UploadSession(BaseModel):
         return int(bytes_remaining / self.upload_speed_bps)
     
     @property
-    def chunks_missing_list(self) -> list:
+    def chunks_missing_list(self) -> List[int]:
         """Lista de números de chunks faltantes."""
         if not self.total_chunks_expected:
             return []
-        
-        received_chunks = set(self.chunks_metadata.keys())
-        expected_chunks = set(range(1, self.total_chunks_expected + 1))
-        missing = expected_chunks - received_chunks
-        
-        return sorted(list(missing))
+        return self.missing_chunks_from_bitmap(self.chunks_bitmap, self.total_chunks_expected)
     
-    def add_chunk_metadata(self, chunk_number: int, size: int, checksum: Optional[str] = None) -> None:
-        """
-        Agregar metadata de un chunk recibido.
-        
-        Args:
-            chunk_number: Número del chunk (1-based)
-            size: Tamaño del chunk en bytes
-            checksum: Checksum del chunk (opcional)
-        """
-        if not self.chunks_metadata:
-            self.chunks_metadata = {}
-        
-        self.chunks_metadata[str(chunk_number)] = {
-            "size": size,
-            "checksum": checksum,
-            "received_at": datetime.utcnow().isoformat(),
-            "order": chunk_number
-        }
-        
-        self.chunks_received = len(self.chunks_metadata)
-        self.bytes_uploaded = sum(chunk["size"] for chunk in self.chunks_metadata.values())
-        self.last_chunk_at = datetime.utcnow()
+    @property
+    def contiguous_chunks_received(self) -> int:
+        """Número de chunks recibidos de forma contigua desde el chunk 1."""
+        return self.contiguous_chunks_from_bitmap(self.chunks_bitmap)
     
     def is_chunk_received(self, chunk_number: int) -> bool:
         """Verificar si un chunk específico ha sido recibido."""
-        return str(chunk_number) in (self.chunks_metadata or {})
-    
-    def get_chunk_info(self, chunk_number: int) -> Optional[Dict[str, Any]]:
-        """Obtener información de un chunk específico."""
-        if not self.chunks_metadata:
-            return None
-        return self.chunks_metadata.get(str(chunk_number))
+        return self.chunk_in_bitmap(self.chunks_bitmap, chunk_number)
+    
+    @staticmethod
+    def empty_chunks_bitmap(total_chunks: Optional[int]) -> bytes:
+        """Bitmap vacío con espacio para total_chunks chunks."""
+        return bytes(((total_chunks or 0) + 7) // 8)
+    
+    @staticmethod
+    def chunk_in_bitmap(bitmap: Optional[bytes], chunk_number: int) -> bool:
+        """True si el bit del chunk (1-based) está marcado."""
+        bitmap = bitmap or b""
+        indice = chunk_number - 1
+        return indice >> 3 < len(bitmap) and bool(bitmap[indice >> 3] >> (indice & 7) & 1)
+    
+    @staticmethod
+    def contiguous_chunks_from_bitmap(bitmap: Optional[bytes]) -> int:
+        """Número de bits marcados consecutivos desde el chunk 1."""
+        bits = int.from_bytes(bitmap or b"", "little")
+        return (bits ^ (bits + 1)).bit_length() - 1
+    
+    @staticmethod
+    def missing_chunks_from_bitmap(bitmap: Optional[bytes], total_chunks: int) -> List[int]:
+        """Números de chunk (1-based) sin marcar en el bitmap hasta total_chunks."""
+        bitmap = (bitmap or b"").ljust((total_chunks + 7) // 8, b"\x00")
+        missing = []
+        for byte_index in range(0, (total_chunks + 7) // 8):
+            byte = bitmap[byte_index]
+            if byte == 0xFF:
+                continue
+            base = byte_index * 8
+            for bit in range(min(8, total_chunks - base)):
+                if not byte >> bit & 1:
+                    missing.append(base + bit + 1)
+        return missing
     
     def mark_as_completed(self, final_file_url: str, file_checksum: Optional[str] = None) -> None:
         """Marcar la sesión como completada."""
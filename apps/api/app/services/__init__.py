@@ -9,6 +9,13 @@ from .llm_service import LLMService
 from .chunk_service import chunk_service
 from .whisper_service import whisper_service
 from .diarization_service import diarization_service
+from .inference_executor import InferenceExecutor, inference_executor
+from .audio_normalization_service import AudioNormalizationService, audio_normalization_service
+from .incremental_asr_service import IncrementalASRService, incremental_asr_service
+from .result_cache_service import ResultCacheService, result_cache_service
+from .speaker_fusion_service import SpeakerFusionService, speaker_fusion_service
+from .transcript_store_service import TranscriptStoreService, transcript_store_service
+from .terminology_index_service import TerminologyIndexService, terminology_index_service
 from .post_processing_service import PostProcessingService
 from .ocr_service import OCRService, ocr_service
 from .micro_memo_service import MicroMemoService, micro_memo_service
@@ -20,14 +27,28 @@ __all__ = [
     "NotionService", 
     "LLMService",
     "PostProcessingService",
+    "TerminologyIndexService",
     "OCRService",
     "MicroMemoService",
     "ExportService",
     "TTSService",
+    "InferenceExecutor",
+    "AudioNormalizationService",
+    "IncrementalASRService",
+    "ResultCacheService",
+    "SpeakerFusionService",
+    "TranscriptStoreService",
     "minio_service",
     "chunk_service",
     "whisper_service",
     "diarization_service",
+    "inference_executor",
+    "audio_normalization_service",
+    "incremental_asr_service",
+    "result_cache_service",
+    "speaker_fusion_service",
+    "transcript_store_service",
+    "terminology_index_service",
     "ocr_service",
     "micro_memo_service",
     "export_service",
@@ -0,0 +1,214 @@
+"""
+Buffer de audio PCM compartido respaldado por memory-mapping.
+Permite a análisis, embeddings y procesamiento por segmentos leer el
+audio normalizado sin cargarlo completo en memoria.
+"""
+
+import os
+import struct
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+
+# Códigos de formato WAV soportados
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class AudioBuffer:
+    """
+    Vista de solo lectura sobre las muestras de un WAV PCM mapeado en memoria.
+
+    El sistema operativo pagina el archivo bajo demanda y comparte las páginas
+    entre todos los consumidores del mismo proceso (y entre procesos vía page
+    cache). Los cortes por tiempo son vistas sin copia sobre el memmap.
+    """
+
+    def __init__(self, ruta: str, muestras: np.memmap, sample_rate: int, canales: int):
+        self.ruta = ruta
+        self.muestras = muestras
+        self.sample_rate = sample_rate
+        self.canales = canales
+
+    @classmethod
+    def abrir(cls, ruta: str) -> "AudioBuffer":
+        """
+        Mapear en memoria el bloque de datos de un WAV int16 o float32.
+
+        Args:
+            ruta: Ruta al archivo WAV (p.ej. el artefacto normalizado)
+
+        Returns:
+            AudioBuffer listo para cortes por tiempo
+
+        Raises:
+            ValueError: Si el archivo no es un WAV PCM int16/float32
+        """
+        formato, canales, sample_rate, bits, offset, tamano = cls._leer_cabecera_riff(ruta)
+
+        if formato == WAVE_FORMAT_PCM and bits == 16:
+            dtype = np.dtype("<i2")
+        elif formato == WAVE_FORMAT_IEEE_FLOAT and bits == 32:
+            dtype = np.dtype("<f4")
+        else:
+            raise ValueError(
+                f"Formato WAV no soportado para memmap (formato={formato}, bits={bits}): {ruta}"
+            )
+
+        # Tolerar WAV truncados o con tamaño de datos sin cerrar (streaming)
+        tamano_real = os.path.getsize(ruta) - offset
+        if tamano <= 0 or tamano > tamano_real:
+            tamano = tamano_real
+        num_frames = tamano // (dtype.itemsize * canales)
+
+        forma = (num_frames,) if canales == 1 else (num_frames, canales)
+        if num_frames == 0:
+            muestras = np.zeros(forma, dtype=dtype)
+        else:
+            muestras = np.memmap(ruta, dtype=dtype, mode="r", offset=offset, shape=forma)
+
+        return cls(ruta, muestras, sample_rate, canales)
+
+    @staticmethod
+    def _leer_cabecera_riff(ruta: str) -> Tuple[int, int, int, int, int, int]:
+        """
+        Recorrer los chunks RIFF hasta ``fmt `` y ``data``.
+
+        Returns:
+            (formato, canales, sample_rate, bits_por_muestra, offset_datos, tamano_datos)
+        """
+        with open(ruta, "rb") as f:
+            cabecera = f.read(12)
+            if len(cabecera) < 12 or cabecera[:4] != b"RIFF" or cabecera[8:12] != b"WAVE":
+                raise ValueError(f"No es un archivo WAV RIFF: {ruta}")
+
+            formato = canales = sample_rate = bits = None
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    raise ValueError(f"WAV sin bloque de datos: {ruta}")
+                chunk_id, chunk_size = struct.unpack("<4sI", chunk)
+
+                if chunk_id == b"fmt ":
+                    fmt = f.read(chunk_size)
+                    formato, canales, sample_rate, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+                    if formato == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+                        formato = struct.unpack("<H", fmt[24:26])[0]
+                    if chunk_size % 2:
+                        f.seek(1, os.SEEK_CUR)
+                elif chunk_id == b"data":
+                    if formato is None:
+                        raise ValueError(f"Bloque 'data' antes de 'fmt ' en WAV: {ruta}")
+                    return formato, canales, sample_rate, bits, f.tell(), chunk_size
+                else:
+                    f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+
+    @property
+    def num_frames(self) -> int:
+        """Número de frames (muestras por canal)."""
+        return int(self.muestras.shape[0])
+
+    @property
+    def duracion_sec(self) -> float:
+        """Duración total del audio en segundos."""
+        return self.num_frames / float(self.sample_rate) if self.sample_rate else 0.0
+
+    def _indices(self, start: float, end: Optional[float]) -> Tuple[int, int]:
+        """Convertir un rango en segundos a índices de frame acotados."""
+        inicio = max(0, int(round(start * self.sample_rate)))
+        fin = self.num_frames if end is None else int(round(end * self.sample_rate))
+        fin = max(inicio, min(self.num_frames, fin))
+        return inicio, fin
+
+    def segmento(self, start: float, end: Optional[float] = None) -> np.ndarray:
+        """
+        Vista sin copia de las muestras entre ``start`` y ``end`` segundos.
+
+        El dtype es el del archivo (int16 o float32).
+        """
+        inicio, fin = self._indices(start, end)
+        return self.muestras[inicio:fin]
+
+    def segmento_float32(self, start: float, end: Optional[float] = None, mono: bool = True) -> np.ndarray:
+        """
+        Copia float32 en [-1, 1] de un segmento (solo se materializa la ventana).
+
+        Args:
+            start: Inicio en segundos
+            end: Fin en segundos (None = hasta el final)
+            mono: Promediar canales si el audio es multicanal
+        """
+        vista = self.segmento(start, end)
+        if vista.dtype == np.int16:
+            datos = vista.astype(np.float32) / 32768.0
+        else:
+            datos = np.array(vista, dtype=np.float32)
+
+        if mono and datos.ndim > 1:
+            datos = datos.mean(axis=1, dtype=np.float32)
+        return datos
+
+    def iterar_ventanas(
+        self,
+        duracion_ventana_sec: float,
+        salto_sec: Optional[float] = None
+    ) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Recorrer el audio en ventanas (vistas sin copia) con memoria constante.
+
+        Yields:
+            Tuplas (inicio_sec, vista_de_muestras)
+        """
+        salto_sec = salto_sec or duracion_ventana_sec
+        tamano = max(1, int(duracion_ventana_sec * self.sample_rate))
+        paso = max(1, int(salto_sec * self.sample_rate))
+
+        for inicio in range(0, self.num_frames, paso):
+            yield inicio / float(self.sample_rate), self.muestras[inicio:inicio + tamano]
+
+    def cerrar(self) -> None:
+        """Liberar el mapeo del archivo."""
+        mmap_obj = getattr(self.muestras, "_mmap", None)
+        self.muestras = np.zeros((0,), dtype=self.muestras.dtype)
+        if mmap_obj is not None:
+            try:
+                mmap_obj.close()
+            except (BufferError, ValueError):
+                # Aún hay vistas vivas: el mapeo se libera al recolectarlas
+                pass
+
+    def __enter__(self) -> "AudioBuffer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.cerrar()
+
+
+_buffers_compartidos: Dict[Tuple[str, float, int], AudioBuffer] = {}
+_buffers_lock = threading.Lock()
+_MAX_BUFFERS_COMPARTIDOS = 8
+
+
+def get_audio_buffer(ruta: str) -> AudioBuffer:
+    """
+    Obtener un AudioBuffer compartido para ``ruta``.
+
+    Los consumidores del mismo proceso (análisis, embeddings, segmentos)
+    reutilizan el mismo mapeo mientras el archivo no cambie.
+    No cerrar el buffer devuelto: su ciclo de vida lo gestiona este registro.
+    """
+    stat = os.stat(ruta)
+    clave = (os.path.abspath(ruta), stat.st_mtime, stat.st_size)
+
+    with _buffers_lock:
+        buffer = _buffers_compartidos.get(clave)
+        if buffer is None:
+            if len(_buffers_compartidos) >= _MAX_BUFFERS_COMPARTIDOS:
+                # Descartar el más antiguo; su mmap se libera al perder referencias
+                _buffers_compartidos.pop(next(iter(_buffers_compartidos)))
+            buffer = AudioBuffer.abrir(ruta)
+            _buffers_compartidos[clave] = buffer
+        return buffer
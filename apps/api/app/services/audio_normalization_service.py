@@ -0,0 +1,280 @@
+"""
+Servicio de normalización de audio con ffmpeg.
+Decodifica cada grabación una sola vez a PCM 16 kHz mono y cachea el
+resultado en MinIO indexado por el hash SHA-256 del contenido original.
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+import wave
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.core import settings
+from app.services.base import BaseService, ServiceNotAvailableError
+from app.services.minio_service import minio_service
+
+
+class ResultadoNormalizacion(BaseModel):
+    """Artefacto de audio normalizado listo para ASR, diarización y embeddings."""
+    ruta_local: str
+    object_name: Optional[str] = None
+    audio_sha256: str
+    sample_rate: int
+    canales: int
+    duracion_sec: float
+    tamano_bytes: int
+    cache_hit: bool
+    tiempo_procesamiento_sec: float
+
+
+class AudioNormalizationService(BaseService):
+    """
+    Normaliza grabaciones a WAV PCM s16le, 16 kHz, mono.
+
+    Todos los consumidores (Whisper, pyannote, embeddings) leen el mismo
+    artefacto decodificado, de modo que el coste de decodificar el archivo
+    comprimido se paga una sola vez por grabación.
+    """
+
+    HASH_BLOCK_SIZE = 1024 * 1024  # 1MB
+    CACHE_PREFIX = "normalized"
+
+    def __init__(self):
+        super().__init__("AudioNormalizationService")
+        self.cache_dir = Path(tempfile.gettempdir()) / "axonote_audio"
+        self.sample_rate = settings.AUDIO_SAMPLE_RATE
+        self.canales = settings.AUDIO_CHANNELS
+
+        self.estadisticas = {
+            "normalizaciones_completadas": 0,
+            "cache_hits_local": 0,
+            "cache_hits_minio": 0,
+            "tiempo_total_decodificacion_sec": 0.0
+        }
+
+    async def normalizar(self, ruta_origen: str) -> ResultadoNormalizacion:
+        """
+        Obtener el audio normalizado de una grabación, decodificándolo si hace falta.
+
+        Args:
+            ruta_origen: Ruta local o URL de MinIO del audio original
+
+        Returns:
+            ResultadoNormalizacion con la ruta local del WAV normalizado
+        """
+        inicio = time.time()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        ruta_local_origen, es_temporal = await self._resolver_origen(ruta_origen)
+        try:
+            audio_sha256 = await self._calcular_sha256(ruta_local_origen)
+            object_name = f"{self.CACHE_PREFIX}/{audio_sha256}_{self.sample_rate}hz_{self.canales}ch.wav"
+            ruta_normalizada = self.cache_dir / Path(object_name).name
+
+            cache_hit = True
+            if ruta_normalizada.exists():
+                self.estadisticas["cache_hits_local"] += 1
+            elif await self._descargar_de_cache(object_name, ruta_normalizada):
+                self.estadisticas["cache_hits_minio"] += 1
+            else:
+                cache_hit = False
+                await self._decodificar_ffmpeg(ruta_local_origen, ruta_normalizada)
+                await self._subir_a_cache(ruta_normalizada, object_name, audio_sha256)
+        finally:
+            if es_temporal:
+                Path(ruta_local_origen).unlink(missing_ok=True)
+
+        info = self._leer_cabecera_wav(ruta_normalizada)
+        tiempo = time.time() - inicio
+
+        if not cache_hit:
+            self.estadisticas["normalizaciones_completadas"] += 1
+            self.estadisticas["tiempo_total_decodificacion_sec"] += tiempo
+
+        self.logger.info(
+            "Audio normalizado disponible",
+            extra={
+                "audio_sha256": audio_sha256,
+                "cache_hit": cache_hit,
+                "duracion_sec": info["duracion_sec"],
+                "tiempo_sec": round(tiempo, 3)
+            }
+        )
+
+        return ResultadoNormalizacion(
+            ruta_local=str(ruta_normalizada),
+            object_name=object_name,
+            audio_sha256=audio_sha256,
+            sample_rate=info["sample_rate"],
+            canales=info["canales"],
+            duracion_sec=info["duracion_sec"],
+            tamano_bytes=ruta_normalizada.stat().st_size,
+            cache_hit=cache_hit,
+            tiempo_procesamiento_sec=tiempo
+        )
+
+    async def _resolver_origen(self, ruta_origen: str) -> Tuple[str, bool]:
+        """
+        Obtener una ruta local legible del audio original.
+
+        Returns:
+            Tupla (ruta_local, es_temporal). Los objetos de MinIO se descargan
+            por partes a disco una única vez.
+        """
+        if os.path.exists(ruta_origen):
+            return ruta_origen, False
+
+        object_name = minio_service.object_name_from_url(ruta_origen) or ruta_origen
+        fd, ruta_temporal = tempfile.mkstemp(prefix="original_", dir=self.cache_dir)
+        os.close(fd)
+        try:
+            await minio_service.download_to_file(object_name, ruta_temporal)
+        except Exception:
+            Path(ruta_temporal).unlink(missing_ok=True)
+            raise
+        return ruta_temporal, True
+
+    async def _calcular_sha256(self, ruta: str) -> str:
+        """Calcular SHA-256 del archivo por bloques, fuera del event loop."""
+        def calcular() -> str:
+            sha256 = hashlib.sha256()
+            with open(ruta, "rb") as f:
+                for bloque in iter(lambda: f.read(self.HASH_BLOCK_SIZE), b""):
+                    sha256.update(bloque)
+            return sha256.hexdigest()
+
+        return await asyncio.get_event_loop().run_in_executor(None, calcular)
+
+    async def decodificar(self, ruta_origen: str, ruta_destino: Path, permitir_truncado: bool = False) -> None:
+        """
+        Decodificar a PCM normalizado sin pasar por la cache de MinIO.
+        
+        Args:
+            ruta_origen: Ruta local del audio (puede ser un prefijo de upload)
+            ruta_destino: Ruta del WAV resultante
+            permitir_truncado: Aceptar la salida parcial si el origen está cortado
+        """
+        await self._decodificar_ffmpeg(ruta_origen, Path(ruta_destino), permitir_truncado)
+
+    async def _decodificar_ffmpeg(
+        self,
+        ruta_origen: str,
+        ruta_destino: Path,
+        permitir_truncado: bool = False
+    ) -> None:
+        """Decodificar en streaming a PCM s16le con ffmpeg (escritura atómica)."""
+        ruta_tmp = ruta_destino.with_suffix(".wav.part")
+        cmd = [
+            settings.FFMPEG_BIN,
+            "-nostdin", "-hide_banner", "-loglevel", "error", "-y",
+            "-i", ruta_origen,
+            "-vn",
+            "-ac", str(self.canales),
+            "-ar", str(self.sample_rate),
+            "-c:a", "pcm_s16le",
+            "-f", "wav",
+            str(ruta_tmp)
+        ]
+
+        try:
+            proceso = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError as e:
+            raise ServiceNotAvailableError(f"ffmpeg no disponible: {settings.FFMPEG_BIN}") from e
+
+        _, stderr = await proceso.communicate()
+        # Un prefijo de upload termina a mitad de frame: basta con lo decodificado
+        salida_parcial = permitir_truncado and ruta_tmp.exists() and ruta_tmp.stat().st_size > 44
+        if proceso.returncode != 0 and not salida_parcial:
+            ruta_tmp.unlink(missing_ok=True)
+            raise RuntimeError(
+                f"ffmpeg falló normalizando audio ({proceso.returncode}): "
+                f"{stderr.decode(errors='replace').strip()[:500]}"
+            )
+
+        os.replace(ruta_tmp, ruta_destino)
+
+    async def _descargar_de_cache(self, object_name: str, ruta_destino: Path) -> bool:
+        """Intentar recuperar el artefacto normalizado desde MinIO."""
+        try:
+            if not await minio_service.object_exists(object_name):
+                return False
+            ruta_tmp = ruta_destino.with_suffix(".wav.part")
+            await minio_service.download_to_file(object_name, str(ruta_tmp))
+            os.replace(ruta_tmp, ruta_destino)
+            return True
+        except Exception as e:
+            self.logger.warning(
+                "Cache MinIO de audio normalizado no disponible",
+                extra={"object_name": object_name, "error": str(e)}
+            )
+            return False
+
+    async def _subir_a_cache(self, ruta: Path, object_name: str, audio_sha256: str) -> None:
+        """Publicar el artefacto normalizado en MinIO (best-effort)."""
+        try:
+            await minio_service.upload_from_file(
+                str(ruta),
+                object_name,
+                content_type="audio/wav",
+                metadata={
+                    "audio_sha256": audio_sha256,
+                    "sample_rate": str(self.sample_rate),
+                    "canales": str(self.canales)
+                }
+            )
+        except Exception as e:
+            self.logger.warning(
+                "No se pudo cachear audio normalizado en MinIO",
+                extra={"object_name": object_name, "error": str(e)}
+            )
+
+    @staticmethod
+    def _leer_cabecera_wav(ruta: Path) -> Dict[str, Any]:
+        """Leer duración y formato desde la cabecera WAV (sin decodificar)."""
+        with wave.open(str(ruta), "rb") as wav:
+            frames = wav.getnframes()
+            sample_rate = wav.getframerate()
+            return {
+                "sample_rate": sample_rate,
+                "canales": wav.getnchannels(),
+                "duracion_sec": frames / float(sample_rate) if sample_rate else 0.0
+            }
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Verificar disponibilidad de ffmpeg y del directorio de cache."""
+        try:
+            proceso = await asyncio.create_subprocess_exec(
+                settings.FFMPEG_BIN, "-version",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await proceso.communicate()
+            version = stdout.decode(errors="replace").splitlines()[0] if stdout else "unknown"
+
+            return {
+                "service": "AudioNormalizationService",
+                "status": "healthy" if proceso.returncode == 0 else "degraded",
+                "ffmpeg_version": version,
+                "cache_dir": str(self.cache_dir),
+                "estadisticas": self.estadisticas.copy()
+            }
+        except Exception as e:
+            return {
+                "service": "AudioNormalizationService",
+                "status": "unhealthy",
+                "error": str(e)
+            }
+
+
+# Instancia global del servicio
+audio_normalization_service = AudioNormalizationService()
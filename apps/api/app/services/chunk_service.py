@@ -4,17 +4,19 @@ Maneja el ciclo completo de upload chunked con recovery y validación.
 """
 
 import asyncio
+import base64
 import hashlib
 import os
 import shutil
 import tempfile
 from datetime import datetime, timedelta
 from io import BytesIO
-from typing import Dict, Any, Optional, List, Tuple
+from typing import BinaryIO, Dict, Any, Optional, List, Tuple, Union
 from pathlib import Path
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import UploadFile
 
 from app.core import settings, api_logger
@@ -22,6 +24,22 @@ from app.core.security import sanitize_filename
 from app.models import UploadSession, ChunkUpload, ClassSession, EstadoUpload
 from app.services.base import BaseService, ServiceConfigurationError, ServiceNotAvailableError
 from app.services.minio_service import minio_service
+from app.workers.celery_app import celery_app
+
+
+class _LectorConHash:
+    """Envoltorio de lectura que calcula el MD5 de los bytes a medida que pasan."""
+    
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+        self.md5 = hashlib.md5()
+        self.bytes_leidos = 0
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        self.md5.update(data)
+        self.bytes_leidos += len(data)
+        return data
 
 
 class ChunkService(BaseService):
@@ -137,6 +155,7 @@ class ChunkService(BaseService):
                 total_chunks_expected=total_chunks_expected,
                 file_checksum_expected=file_checksum,
                 storage_path_chunks=storage_path_chunks,
+                chunks_bitmap=UploadSession.empty_chunks_bitmap(total_chunks_expected),
                 expires_at=UploadSession.default_expiration()
             )
             
@@ -172,17 +191,21 @@ class ChunkService(BaseService):
         db: AsyncSession,
         upload_session_id: str,
         chunk_number: int,
-        chunk_data: bytes,
+        chunk_data: Union[bytes, BinaryIO],
         total_chunks: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Subir un chunk individual.
         
+        El chunk se lee una sola vez: el MD5 se calcula mientras los bytes
+        van a MinIO. Solo si MinIO falla se escribe en el spool local, que
+        se sube al ensamblar.
+        
         Args:
             db: Sesión de base de datos
             upload_session_id: ID de la sesión de upload
             chunk_number: Número del chunk (1-based)
-            chunk_data: Datos del chunk
+            chunk_data: Datos del chunk o stream posicionable con ellos
             total_chunks: Total de chunks esperados (para actualizar si es necesario)
         
         Returns:
@@ -207,7 +230,10 @@ class ChunkService(BaseService):
                 raise ValueError("Sesión de upload expirada")
             
             # Validar chunk
-            chunk_size = len(chunk_data)
+            chunk_stream = BytesIO(chunk_data) if isinstance(chunk_data, (bytes, bytearray)) else chunk_data
+            chunk_stream.seek(0, os.SEEK_END)
+            chunk_size = chunk_stream.tell()
+            chunk_stream.seek(0)
             if chunk_size > self.max_chunk_size:
                 raise ValueError(f"Chunk demasiado grande: {chunk_size} bytes")
             
@@ -215,40 +241,24 @@ class ChunkService(BaseService):
             if upload_session.is_chunk_received(chunk_number):
                 self.logger.warning(
                     "Chunk duplicado recibido",
-                    upload_session_id=upload_session_id,
-                    chunk_number=chunk_number
+                    extra={
+                        "upload_session_id": upload_session_id,
+                        "chunk_number": chunk_number
+                    }
                 )
-                return {
-                    "status": "duplicate",
-                    "message": "Chunk ya fue recibido anteriormente"
-                }
-            
-            # Calcular checksum del chunk
-            chunk_checksum = hashlib.md5(chunk_data).hexdigest()
-            
-            # Guardar chunk en storage temporal
-            chunk_path = await self._store_chunk_temporarily(
-                upload_session_id, chunk_number, chunk_data
-            )
+                return self._duplicate_chunk_response(upload_session, chunk_number)
             
-            # Subir chunk a MinIO
+            # Subir chunk a MinIO calculando el checksum en la misma pasada
             object_name = f"{upload_session.storage_path_chunks}/chunk_{chunk_number:06d}"
-            chunk_file = BytesIO(chunk_data)
-            
-            await minio_service.upload_file(
-                chunk_file,
-                object_name,
-                content_type="application/octet-stream",
-                metadata={
-                    "upload_session_id": upload_session_id,
-                    "chunk_number": str(chunk_number),
-                    "chunk_size": str(chunk_size),
-                    "chunk_checksum": chunk_checksum
-                }
+            chunk_checksum = await self._ingest_chunk(
+                upload_session_id, chunk_number, chunk_stream, chunk_size, object_name
             )
             
-            # Actualizar metadata de la sesión
-            upload_session.add_chunk_metadata(chunk_number, chunk_size, chunk_checksum)
+            # Marcar el chunk en el bitmap con un UPDATE atómico
+            prefijo_anterior = upload_session.contiguous_chunks_received
+            if not await self._mark_chunk_received(db, upload_session, chunk_number, chunk_size):
+                # Otra petición registró el mismo chunk mientras se subía
+                return self._duplicate_chunk_response(upload_session, chunk_number)
             
             # Actualizar total de chunks si se proporciona
             if total_chunks and upload_session.total_chunks_expected != total_chunks:
@@ -273,10 +283,12 @@ class ChunkService(BaseService):
             
             self.logger.info(
                 "Chunk subido exitosamente",
-                upload_session_id=upload_session_id,
-                chunk_number=chunk_number,
-                chunk_size=chunk_size,
-                progress=f"{upload_session.chunks_received}/{upload_session.total_chunks_expected or '?'}"
+                extra={
+                    "upload_session_id": upload_session_id,
+                    "chunk_number": chunk_number,
+                    "chunk_size": chunk_size,
+                    "progress": f"{upload_session.chunks_received}/{upload_session.total_chunks_expected or '?'}"
+                }
             )
             
             # Verificar si todos los chunks están completos
@@ -285,6 +297,12 @@ class ChunkService(BaseService):
                 upload_session.chunks_received >= upload_session.total_chunks_expected
             )
             
+            # Transcribir el prefijo contiguo mientras sigue el upload
+            if not is_complete:
+                self._encolar_asr_incremental(
+                    upload_session_id, prefijo_anterior, upload_session.contiguous_chunks_received
+                )
+            
             return {
                 "status": "received",
                 "chunk_number": chunk_number,
@@ -300,9 +318,11 @@ class ChunkService(BaseService):
         except Exception as e:
             self.logger.error(
                 "Error subiendo chunk",
-                upload_session_id=upload_session_id,
-                chunk_number=chunk_number,
-                error=str(e)
+                extra={
+                    "upload_session_id": upload_session_id,
+                    "chunk_number": chunk_number,
+                    "error": str(e)
+                }
             )
             
             # Marcar sesión como error si es crítico
@@ -327,6 +347,9 @@ class ChunkService(BaseService):
         """
         Ensamblar archivo final a partir de los chunks.
         
+        El objeto final se compone en MinIO a partir de los objetos chunk;
+        el archivo no se descarga ni se escribe en disco local.
+        
         Args:
             db: Sesión de base de datos
             upload_session_id: ID de la sesión de upload
@@ -363,22 +386,25 @@ class ChunkService(BaseService):
                 filename=upload_session.filename_sanitized
             )
             
-            # Crear archivo temporal para ensamblado
-            temp_file_path = self.temp_dir / f"assembly_{upload_session_id}.tmp"
+            # Chunks que no llegaron a MinIO durante el upload
+            await self._upload_spooled_chunks(upload_session)
             
-            # Ensamblar chunks en orden
-            with open(temp_file_path, 'wb') as final_file:
-                for chunk_num in range(1, upload_session.total_chunks_expected + 1):
-                    chunk_object = f"{upload_session.storage_path_chunks}/chunk_{chunk_num:06d}"
-                    
-                    # Descargar chunk de MinIO
-                    chunk_data = await minio_service.download_file(chunk_object)
-                    final_file.write(chunk_data)
+            chunk_numbers = range(1, upload_session.total_chunks_expected + 1)
+            chunk_objects = [
+                f"{upload_session.storage_path_chunks}/chunk_{chunk_num:06d}"
+                for chunk_num in chunk_numbers
+            ]
+            result = await db.execute(
+                select(ChunkUpload.chunk_number, ChunkUpload.chunk_size)
+                .where(ChunkUpload.upload_session_id == upload_session.id)
+            )
+            sizes_by_chunk = dict(result.all())
+            chunk_sizes = [sizes_by_chunk[chunk_num] for chunk_num in chunk_numbers]
             
-            # Validar checksum si está disponible
+            # Validar checksum chunk a chunk, sin materializar el archivo
             final_checksum = None
             if validate_checksum or upload_session.file_checksum_expected:
-                final_checksum = await self._calculate_file_checksum(temp_file_path)
+                final_checksum = await self._calculate_chunks_checksum(upload_session_id, chunk_objects)
                 
                 if upload_session.file_checksum_expected:
                     if final_checksum != upload_session.file_checksum_expected:
@@ -387,25 +413,22 @@ class ChunkService(BaseService):
                             f"Actual: {final_checksum}"
                         )
             
-            # Subir archivo final a MinIO
+            # Componer archivo final en MinIO a partir de los chunks
             final_object_name = f"recordings/{upload_session.class_session_id}/{upload_session.filename_sanitized}"
             
-            with open(temp_file_path, 'rb') as final_file:
-                final_url = await minio_service.upload_file(
-                    final_file,
-                    final_object_name,
-                    content_type=upload_session.content_type,
-                    metadata={
-                        "upload_session_id": upload_session_id,
-                        "original_filename": upload_session.filename_original,
-                        "total_chunks": str(upload_session.total_chunks_expected),
-                        "file_checksum": final_checksum or "",
-                        "assembled_at": datetime.utcnow().isoformat()
-                    }
-                )
-            
-            # Limpiar archivo temporal
-            temp_file_path.unlink()
+            final_url = await minio_service.compose_file(
+                chunk_objects,
+                final_object_name,
+                source_sizes=chunk_sizes,
+                content_type=upload_session.content_type,
+                metadata={
+                    "upload_session_id": upload_session_id,
+                    "original_filename": upload_session.filename_original,
+                    "total_chunks": str(upload_session.total_chunks_expected),
+                    "file_checksum": final_checksum or "",
+                    "assembled_at": datetime.utcnow().isoformat()
+                }
+            )
             
             # Actualizar sesión como completada
             upload_session.mark_as_completed(final_url, final_checksum)
@@ -487,6 +510,7 @@ class ChunkService(BaseService):
                 "upload_speed_mbps": upload_session.upload_speed_mbps,
                 "eta_seconds": upload_session.eta_seconds,
                 "missing_chunks": upload_session.chunks_missing_list,
+                "chunks_bitmap": base64.b64encode(upload_session.chunks_bitmap or b"").decode("ascii"),
                 "started_at": upload_session.started_at,
                 "last_chunk_at": upload_session.last_chunk_at,
                 "expires_at": upload_session.expires_at,
@@ -569,30 +593,204 @@ class ChunkService(BaseService):
             )
             return 0
     
-    async def _store_chunk_temporarily(
+    def _encolar_asr_incremental(self, upload_session_id: str, prefijo_anterior: int, prefijo_actual: int) -> None:
+        """Encolar una pasada de ASR incremental cada N chunks contiguos nuevos."""
+        if not settings.ASR_INCREMENTAL_ENABLED:
+            return
+        
+        cada = max(1, settings.ASR_INCREMENTAL_EVERY_CHUNKS)
+        if prefijo_actual // cada <= prefijo_anterior // cada:
+            return
+        
+        try:
+            celery_app.send_task("transcribe_incremental", args=[upload_session_id])
+        except Exception as e:
+            # El ASR incremental es una optimización: nunca bloquea el upload
+            self.logger.warning(
+                "No se pudo encolar ASR incremental",
+                extra={
+                    "upload_session_id": upload_session_id,
+                    "error": str(e)
+                }
+            )
+    
+    @staticmethod
+    def _duplicate_chunk_response(upload_session: UploadSession, chunk_number: int) -> Dict[str, Any]:
+        """Respuesta para un chunk que ya estaba registrado."""
+        return {
+            "status": "duplicate",
+            "message": "Chunk ya fue recibido anteriormente",
+            "chunk_number": chunk_number,
+            "chunks_received": upload_session.chunks_received,
+            "total_chunks": upload_session.total_chunks_expected
+        }
+    
+    async def _mark_chunk_received(
+        self,
+        db: AsyncSession,
+        upload_session: UploadSession,
+        chunk_number: int,
+        chunk_size: int
+    ) -> bool:
+        """
+        Poner a 1 el bit del chunk y actualizar contadores en un solo UPDATE.
+        
+        El bit se fija con set_bit en PostgreSQL bajo el lock de la fila, así
+        que cada chunk escribe O(1) columnas en lugar de reescribir la lista
+        de chunks. El bitmap crece si el chunk cae fuera de su tamaño actual.
+        
+        Returns:
+            False si el chunk ya estaba marcado
+        """
+        bit_index = chunk_number - 1
+        byte_index = bit_index >> 3
+        bitmap = UploadSession.chunks_bitmap
+        bitmap_length = func.length(bitmap)
+        
+        bitmap_ampliado = case(
+            (bitmap_length > byte_index, bitmap),
+            else_=bitmap.op("||")(func.decode(func.repeat("00", byte_index + 1 - bitmap_length), "hex"))
+        )
+        bit_actual = case(
+            (bitmap_length > byte_index, func.get_bit(bitmap, bit_index)),
+            else_=0
+        )
+        
+        result = await db.execute(
+            update(UploadSession)
+            .where(UploadSession.id == upload_session.id, bit_actual == 0)
+            .values(
+                chunks_bitmap=func.set_bit(bitmap_ampliado, bit_index, 1),
+                chunks_received=UploadSession.chunks_received + 1,
+                bytes_uploaded=UploadSession.bytes_uploaded + chunk_size,
+                last_chunk_at=datetime.utcnow()
+            )
+            .returning(
+                UploadSession.chunks_bitmap,
+                UploadSession.chunks_received,
+                UploadSession.bytes_uploaded,
+                UploadSession.last_chunk_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+        row = result.first()
+        if row is None:
+            return False
+        
+        # Reflejar los valores en la instancia sin marcarlos como modificados,
+        # para que el commit no reescriba el bitmap
+        for key in ("chunks_bitmap", "chunks_received", "bytes_uploaded", "last_chunk_at"):
+            set_committed_value(upload_session, key, getattr(row, key))
+        return True
+    
+    async def _ingest_chunk(
         self,
         upload_session_id: str,
         chunk_number: int,
-        chunk_data: bytes
+        chunk_stream: BinaryIO,
+        chunk_size: int,
+        object_name: str
     ) -> str:
-        """Guardar chunk temporalmente en disco local."""
+        """
+        Enviar el chunk a MinIO, o al spool local si MinIO no responde.
+        
+        Returns:
+            Checksum MD5 del chunk
+        """
+        reader = _LectorConHash(chunk_stream)
+        try:
+            await minio_service.upload_stream(
+                reader,
+                object_name,
+                length=chunk_size,
+                content_type="application/octet-stream",
+                metadata={
+                    "upload_session_id": upload_session_id,
+                    "chunk_number": str(chunk_number),
+                    "chunk_size": str(chunk_size)
+                }
+            )
+            if reader.bytes_leidos != chunk_size:
+                raise ValueError(f"Chunk incompleto: {reader.bytes_leidos} de {chunk_size} bytes")
+            return reader.md5.hexdigest()
+        
+        except ValueError:
+            raise
+        except Exception as e:
+            self.logger.warning(
+                "MinIO no disponible, chunk guardado en spool local",
+                extra={
+                    "upload_session_id": upload_session_id,
+                    "chunk_number": chunk_number,
+                    "error": str(e)
+                }
+            )
+            chunk_stream.seek(0)
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(
+                None, self._spool_chunk_sync, upload_session_id, chunk_number, chunk_stream
+            )
+    
+    def _spool_chunk_sync(self, upload_session_id: str, chunk_number: int, chunk_stream: BinaryIO) -> str:
+        """Copiar el chunk al spool local calculando su MD5; devuelve el checksum."""
         chunk_dir = self.temp_dir / upload_session_id
         chunk_dir.mkdir(parents=True, exist_ok=True)
         
-        chunk_path = chunk_dir / f"chunk_{chunk_number:06d}"
+        reader = _LectorConHash(chunk_stream)
+        with open(chunk_dir / f"chunk_{chunk_number:06d}", 'wb') as f:
+            shutil.copyfileobj(reader, f, 1024 * 1024)
         
-        with open(chunk_path, 'wb') as f:
-            f.write(chunk_data)
+        return reader.md5.hexdigest()
+    
+    async def _upload_spooled_chunks(self, upload_session: UploadSession) -> int:
+        """
+        Subir a MinIO los chunks que quedaron en el spool local.
         
-        return str(chunk_path)
+        Returns:
+            Número de chunks subidos
+        """
+        chunk_dir = self.temp_dir / str(upload_session.id)
+        if not chunk_dir.exists():
+            return 0
+        
+        spooled = sorted(chunk_dir.glob("chunk_*"))
+        if spooled:
+            await minio_service.upload_many(
+                [(str(path), f"{upload_session.storage_path_chunks}/{path.name}") for path in spooled],
+                content_type="application/octet-stream"
+            )
+            self.logger.info(
+                "Chunks del spool local subidos a MinIO",
+                extra={
+                    "upload_session_id": str(upload_session.id),
+                    "chunks": len(spooled)
+                }
+            )
+        return len(spooled)
     
-    async def _calculate_file_checksum(self, file_path: Path) -> str:
-        """Calcular checksum MD5 de un archivo."""
+    async def _calculate_chunks_checksum(self, upload_session_id: str, chunk_objects: List[str]) -> str:
+        """
+        Calcular el MD5 del archivo final recorriendo los chunks en orden.
+        
+        Cada chunk se lee de la copia local si está en este nodo y de MinIO
+        en otro caso, por bloques de tamaño fijo.
+        """
         hash_md5 = hashlib.md5()
+        loop = asyncio.get_event_loop()
+        chunk_dir = self.temp_dir / upload_session_id
+        
+        def hash_local_file(path: Path) -> None:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    hash_md5.update(block)
         
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
+        for chunk_object in chunk_objects:
+            local_path = chunk_dir / chunk_object.rsplit("/", 1)[-1]
+            if local_path.exists():
+                await loop.run_in_executor(None, hash_local_file, local_path)
+            else:
+                async for block in minio_service.iter_object(chunk_object):
+                    await loop.run_in_executor(None, hash_md5.update, block)
         
         return hash_md5.hexdigest()
     
@@ -12,7 +12,9 @@ import torch
 from pydantic import BaseModel
 
 from app.core import api_logger, settings
+from app.services.audio_buffer import get_audio_buffer
 from app.services.base import BaseService, ServiceNotAvailableError
+from app.services.inference_executor import InferenceCancelledError, inference_executor
 
 
 class SegmentoDiarizacion(BaseModel):
@@ -183,15 +185,21 @@ class DiarizationService(BaseService):
             
             self.logger.info("Cargando pipeline de diarización pyannote")
             
-            # Cargar pipeline pre-entrenado
-            self.pipeline_diarizacion = Pipeline.from_pretrained(
-                "pyannote/speaker-diarization-3.1",
-                use_auth_token=settings.HF_TOKEN
-            )
+            def cargar_pipeline():
+                pipeline = Pipeline.from_pretrained(
+                    "pyannote/speaker-diarization-3.1",
+                    use_auth_token=settings.HF_TOKEN
+                )
+                # Mover a GPU si está disponible
+                if self.device.type == "cuda":
+                    pipeline = pipeline.to(self.device)
+                return pipeline
             
-            # Mover a GPU si está disponible
-            if self.device.type == "cuda":
-                self.pipeline_diarizacion = self.pipeline_diarizacion.to(self.device)
+            # Cargar pipeline pre-entrenado sin bloquear el event loop
+            self.pipeline_diarizacion = await inference_executor.ejecutar(
+                cargar_pipeline,
+                descripcion="pyannote_carga"
+            )
             
             self.logger.info("Pipeline de diarización cargado exitosamente")
             
@@ -204,7 +212,8 @@ class DiarizationService(BaseService):
         ruta_audio: str,
         configuracion: str = "MEDICAL_CLASS_STANDARD",
         num_speakers: Optional[int] = None,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        job_id: Optional[str] = None
     ) -> ResultadoDiarizacion:
         """
         Realizar diarización de speakers en archivo de audio.
@@ -214,6 +223,7 @@ class DiarizationService(BaseService):
             configuracion: Nombre de configuración predefinida
             num_speakers: Número exacto de speakers si se conoce
             progress_callback: Función para reportar progreso
+            job_id: ID del ProcessingJob, permite cancelar la inferencia
             
         Returns:
             ResultadoDiarizacion con speakers identificados y análisis
@@ -241,9 +251,15 @@ class DiarizationService(BaseService):
             if progress_callback:
                 await progress_callback({"stage": "configuracion_completada", "progress": 10.0})
             
-            # Ejecutar diarización
+            # Ejecutar diarización en el executor de inferencia
             self.logger.info("Ejecutando diarización con pyannote")
-            diarizacion_raw = self.pipeline_diarizacion(ruta_audio)
+            diarizacion_raw = await inference_executor.ejecutar(
+                self.pipeline_diarizacion,
+                ruta_audio,
+                hook=self._hook_cancelacion,
+                job_id=job_id,
+                descripcion="pyannote_diarizacion"
+            )
             
             if progress_callback:
                 await progress_callback({"stage": "diarizacion_completada", "progress": 60.0})
@@ -256,7 +272,7 @@ class DiarizationService(BaseService):
             
             # Extraer embeddings de speakers
             embeddings_speakers = await self._extraer_embeddings_speakers(
-                ruta_audio, segmentos_procesados
+                ruta_audio, segmentos_procesados, job_id=job_id
             )
             
             # Clasificar speakers en roles médicos
@@ -318,6 +334,11 @@ class DiarizationService(BaseService):
             )
             raise
 
+    @staticmethod
+    def _hook_cancelacion(*args: Any, **kwargs: Any) -> None:
+        """Hook de pyannote llamado entre pasos: punto de control de cancelación."""
+        inference_executor.verificar_cancelacion()
+
     async def _configurar_pipeline(
         self, 
         config: ConfiguracionDiarizacion, 
@@ -392,82 +413,174 @@ class DiarizationService(BaseService):
     async def _extraer_embeddings_speakers(
         self, 
         ruta_audio: str, 
-        segmentos: List[SegmentoDiarizacion]
+        segmentos: List[SegmentoDiarizacion],
+        job_id: Optional[str] = None
     ) -> Dict[str, List[float]]:
         """Extraer embeddings promedio para cada speaker."""
         try:
-            from pyannote.audio import Model
-            from pyannote.audio.core.inference import Inference
-            import soundfile as sf
-            
-            # Cargar modelo de embeddings
-            if not self.embedding_model:
-                self.embedding_model = Model.from_pretrained(
-                    "pyannote/embedding",
-                    use_auth_token=settings.HF_TOKEN
-                )
-                if self.device.type == "cuda":
-                    self.embedding_model = self.embedding_model.to(self.device)
-            
-            # Cargar audio
-            audio, sample_rate = sf.read(ruta_audio)
-            if len(audio.shape) > 1:
-                audio = audio.mean(axis=1)  # Convertir a mono
-            
-            embeddings_speakers = {}
-            
-            # Agrupar segmentos por speaker
-            segmentos_por_speaker = {}
-            for segmento in segmentos:
-                if segmento.speaker_id not in segmentos_por_speaker:
-                    segmentos_por_speaker[segmento.speaker_id] = []
-                segmentos_por_speaker[segmento.speaker_id].append(segmento)
-            
-            # Extraer embeddings para cada speaker
-            inference = Inference(self.embedding_model, window="whole")
-            
-            for speaker_id, speaker_segmentos in segmentos_por_speaker.items():
-                embeddings_segmentos = []
-                
-                for segmento in speaker_segmentos[:10]:  # Limitar a 10 segmentos por speaker
-                    try:
-                        start_sample = int(segmento.start * sample_rate)
-                        end_sample = int(segmento.end * sample_rate)
-                        
-                        # Extraer segmento de audio
-                        audio_segmento = audio[start_sample:end_sample]
-                        
-                        if len(audio_segmento) > sample_rate * 0.5:  # Mínimo 0.5 segundos
-                            # Obtener embedding
-                            embedding = inference({"audio": audio_segmento, "sample_rate": sample_rate})
-                            embeddings_segmentos.append(embedding)
-                            
-                    except Exception as e:
-                        self.logger.warning(f"Error extrayendo embedding para segmento: {e}")
-                        continue
-                
-                # Promedio de embeddings
-                if embeddings_segmentos:
-                    embedding_promedio = np.mean(embeddings_segmentos, axis=0)
-                    embeddings_speakers[speaker_id] = embedding_promedio.tolist()
-                else:
-                    # Embedding dummy si no se pudo extraer
-                    embeddings_speakers[speaker_id] = [0.0] * 512
+            embeddings_speakers = await inference_executor.ejecutar(
+                self._extraer_embeddings_sync,
+                ruta_audio,
+                segmentos,
+                job_id=job_id,
+                descripcion="pyannote_embeddings"
+            )
             
             self.logger.info(
                 "Embeddings extraídos",
-                num_speakers=len(embeddings_speakers),
-                embedding_dimension=len(next(iter(embeddings_speakers.values())))
+                extra={
+                    "num_speakers": len(embeddings_speakers),
+                    "embedding_dimension": len(next(iter(embeddings_speakers.values())))
+                }
             )
             
             return embeddings_speakers
             
+        except InferenceCancelledError:
+            raise
         except Exception as e:
-            self.logger.error("Error extrayendo embeddings", error=str(e))
+            self.logger.error(f"Error extrayendo embeddings: {str(e)}")
             # Retornar embeddings dummy
             speakers_unicos = list(set(s.speaker_id for s in segmentos))
             return {speaker_id: [0.0] * 512 for speaker_id in speakers_unicos}
 
+    def _extraer_embeddings_sync(
+        self,
+        ruta_audio: str,
+        segmentos: List[SegmentoDiarizacion]
+    ) -> Dict[str, List[float]]:
+        """
+        Calcular embeddings por speaker (ejecutado en el executor de inferencia).
+        
+        Los recortes de todos los speakers se agrupan en lotes ordenados por
+        duración, se rellenan con ceros hasta el más largo del lote y pasan
+        por el modelo en una única pasada. El relleno se excluye del pooling
+        mediante una máscara de pesos.
+        """
+        # Cargar modelo de embeddings
+        if not self.embedding_model:
+            from pyannote.audio import Model
+            
+            self.embedding_model = Model.from_pretrained(
+                "pyannote/embedding",
+                use_auth_token=settings.HF_TOKEN
+            )
+            if self.device.type == "cuda":
+                self.embedding_model = self.embedding_model.to(self.device)
+            self.embedding_model.eval()
+        
+        # Audio mapeado en memoria: solo se materializa cada recorte
+        buffer = get_audio_buffer(ruta_audio)
+        
+        speakers = sorted(set(s.speaker_id for s in segmentos))
+        recortes = self._seleccionar_recortes(segmentos, speakers)
+        
+        # Ordenar por longitud minimiza el relleno dentro de cada lote
+        recortes.sort(key=lambda r: r[2] - r[1])
+        tamano_lote = max(1, settings.DIARIZATION_EMBEDDING_BATCH_SIZE)
+        
+        embeddings_recortes = []
+        indices_speaker = []
+        for inicio_lote in range(0, len(recortes), tamano_lote):
+            inference_executor.verificar_cancelacion()
+            lote = recortes[inicio_lote:inicio_lote + tamano_lote]
+            
+            try:
+                audios = [buffer.segmento_float32(start, end) for _, start, end in lote]
+                embeddings_recortes.append(self._embeddings_lote(audios))
+                indices_speaker.extend(indice for indice, _, _ in lote)
+            except InferenceCancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning(
+                    "Error extrayendo embeddings de un lote",
+                    extra={"num_recortes": len(lote), "error": str(e)}
+                )
+        
+        if not embeddings_recortes:
+            return {speaker_id: [0.0] * 512 for speaker_id in speakers}
+        
+        embeddings = np.concatenate(embeddings_recortes, axis=0)
+        indices = np.asarray(indices_speaker, dtype=np.int64)
+        
+        # Promedio por speaker vectorizado
+        sumas = np.zeros((len(speakers), embeddings.shape[1]), dtype=np.float64)
+        np.add.at(sumas, indices, embeddings)
+        conteos = np.bincount(indices, minlength=len(speakers))
+        promedios = sumas / np.maximum(conteos, 1)[:, None]
+        
+        self.logger.info(
+            "Embeddings por lotes calculados",
+            extra={
+                "num_recortes": len(indices),
+                "num_lotes": len(embeddings_recortes),
+                "speakers_sin_embedding": int(np.sum(conteos == 0))
+            }
+        )
+        
+        # Speakers sin recortes válidos quedan con embedding nulo
+        return {speaker_id: promedios[i].tolist() for i, speaker_id in enumerate(speakers)}
+
+    @staticmethod
+    def _seleccionar_recortes(
+        segmentos: List[SegmentoDiarizacion],
+        speakers: List[str]
+    ) -> List[Tuple[int, float, float]]:
+        """
+        Elegir los recortes que alimentan el embedding de cada speaker.
+        
+        Se toman los segmentos más largos de cada speaker (mínimo 0.5 s),
+        acotados a ``DIARIZATION_EMBEDDING_MAX_CROP_SEC`` para limitar el relleno.
+        
+        Returns:
+            Lista de (índice de speaker, inicio, fin)
+        """
+        max_segmentos = settings.DIARIZATION_EMBEDDING_MAX_SEGMENTS_PER_SPEAKER
+        max_recorte = settings.DIARIZATION_EMBEDDING_MAX_CROP_SEC
+        indice_speaker = {speaker_id: i for i, speaker_id in enumerate(speakers)}
+        
+        por_speaker: Dict[str, List[SegmentoDiarizacion]] = {}
+        for segmento in segmentos:
+            if segmento.end - segmento.start >= 0.5:  # Mínimo 0.5 segundos
+                por_speaker.setdefault(segmento.speaker_id, []).append(segmento)
+        
+        recortes = []
+        for speaker_id, speaker_segmentos in por_speaker.items():
+            speaker_segmentos.sort(key=lambda s: s.end - s.start, reverse=True)
+            for segmento in speaker_segmentos[:max_segmentos]:
+                # Recorte centrado en segmentos más largos que el máximo
+                exceso = max(0.0, (segmento.end - segmento.start) - max_recorte) / 2
+                recortes.append((
+                    indice_speaker[speaker_id],
+                    segmento.start + exceso,
+                    segmento.end - exceso
+                ))
+        return recortes
+
+    def _embeddings_lote(self, audios: List[np.ndarray]) -> np.ndarray:
+        """
+        Ejecutar una pasada del modelo de embeddings sobre un lote de recortes.
+        
+        Args:
+            audios: Recortes float32 mono de longitud variable
+        
+        Returns:
+            Matriz (num_recortes, dimension) de embeddings
+        """
+        longitud = max(len(audio) for audio in audios)
+        waveforms = np.zeros((len(audios), 1, longitud), dtype=np.float32)
+        pesos = np.zeros((len(audios), longitud), dtype=np.float32)
+        for i, audio in enumerate(audios):
+            waveforms[i, 0, :len(audio)] = audio
+            pesos[i, :len(audio)] = 1.0
+        
+        with torch.inference_mode():
+            embeddings = self.embedding_model(
+                torch.from_numpy(waveforms).to(self.device),
+                weights=torch.from_numpy(pesos).to(self.device)
+            )
+        return embeddings.float().cpu().numpy()
+
     async def _clasificar_speakers_medicos(
         self,
         segmentos: List[SegmentoDiarizacion],
@@ -0,0 +1,327 @@
+"""
+Servicio de ASR incremental durante el upload por chunks.
+Transcribe los prefijos de audio ya recibidos mientras la grabación
+sigue subiendo, de modo que al completar el upload solo queda la cola.
+"""
+
+import json
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import settings
+from app.models import ProcessingJob, TranscriptionResult, UploadSession
+from app.models.processing_job import EstadoProcesamiento, EtapaProcesamiento, TipoProcesamiento
+from app.services.audio_buffer import AudioBuffer
+from app.services.audio_normalization_service import audio_normalization_service
+from app.services.base import BaseService
+from app.services.chunk_service import chunk_service
+from app.services.minio_service import minio_service
+from app.services.whisper_service import SegmentoTranscripcion, whisper_service
+
+
+class IncrementalASRService(BaseService):
+    """
+    Transcripción incremental de grabaciones que aún se están subiendo.
+
+    En cada pasada se concatena el prefijo contiguo de chunks recibidos, se
+    decodifica y se transcribe solo el audio posterior a la última frontera
+    definitiva. Los segmentos que terminan dentro del margen de cola se
+    descartan y se retranscriben en la siguiente pasada, cuando ya hay
+    contexto a ambos lados.
+    """
+
+    def __init__(self):
+        super().__init__("IncrementalASRService")
+        self.work_dir = Path(tempfile.gettempdir()) / "axonote_incremental"
+        self.margen_cola_sec = settings.ASR_INCREMENTAL_TAIL_MARGIN_SEC
+        self.min_audio_nuevo_sec = settings.ASR_INCREMENTAL_MIN_NEW_AUDIO_SEC
+        self.preset = settings.ASR_INCREMENTAL_PRESET
+
+    async def procesar(
+        self,
+        db: AsyncSession,
+        upload_session_id: str,
+        final: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Ejecutar una pasada incremental sobre el prefijo recibido.
+
+        Args:
+            db: Sesión de base de datos
+            upload_session_id: ID de la sesión de upload
+            final: El upload está completo; transcribir hasta el final
+
+        Returns:
+            Resumen de la pasada (estado, frontera definitiva, segmentos nuevos)
+        """
+        inicio_tiempo = time.time()
+
+        result = await db.execute(
+            select(UploadSession).where(UploadSession.id == upload_session_id)
+        )
+        upload_session = result.scalar_one_or_none()
+        if not upload_session:
+            raise ValueError(f"UploadSession {upload_session_id} no encontrada")
+
+        num_chunks = upload_session.contiguous_chunks_received
+        if num_chunks == 0:
+            return {"status": "sin_audio", "upload_session_id": upload_session_id}
+
+        job, transcripcion = await self._obtener_estado(db, upload_session)
+        if transcripcion is not None and not transcripcion.es_parcial:
+            return {"status": "completado", "transcription_id": str(transcripcion.id)}
+
+        directorio = self.work_dir / upload_session_id
+        ruta_prefijo = await self._actualizar_prefijo(upload_session, num_chunks, directorio)
+
+        ruta_wav = directorio / "prefijo.wav"
+        await audio_normalization_service.decodificar(
+            str(ruta_prefijo), ruta_wav, permitir_truncado=not final
+        )
+
+        procesado_hasta = (transcripcion.audio_procesado_hasta_sec or 0.0) if transcripcion else 0.0
+
+        with AudioBuffer.abrir(str(ruta_wav)) as buffer:
+            duracion = buffer.duracion_sec
+            frontera = duracion if final else duracion - self.margen_cola_sec
+
+            if not final and frontera - procesado_hasta < self.min_audio_nuevo_sec:
+                return {
+                    "status": "esperando_audio",
+                    "audio_procesado_hasta_sec": procesado_hasta,
+                    "duracion_prefijo_sec": duracion
+                }
+
+            audio = buffer.segmento_float32(procesado_hasta, duracion)
+
+        segmentos, idioma = await whisper_service.transcribir_fragmento(
+            audio,
+            offset_sec=procesado_hasta,
+            configuracion=self.preset,
+            idioma="it",
+            job_id=str(job.id)
+        )
+        definitivos, nueva_frontera = self._separar_definitivos(
+            segmentos, procesado_hasta, frontera, final
+        )
+
+        transcripcion = self._acumular(
+            db, job, transcripcion, definitivos, idioma,
+            duracion=duracion,
+            procesado_hasta=nueva_frontera,
+            tiempo_pasada=time.time() - inicio_tiempo,
+            final=final
+        )
+
+        if final:
+            job.ruta_audio_original = upload_session.final_file_url or job.ruta_audio_original
+            job.estado = EstadoProcesamiento.COMPLETADO
+            job.progreso_porcentaje = 100.0
+            job.tiempo_fin = datetime.utcnow()
+        else:
+            job.progreso_porcentaje = upload_session.progress_percentage
+        job.etapa_actual = EtapaProcesamiento.ASR
+        job.duracion_audio_sec = duracion
+        job.updated_at = datetime.utcnow()
+
+        await db.commit()
+
+        if final:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+        self.logger.info(
+            "Pasada de ASR incremental completada",
+            extra={
+                "upload_session_id": upload_session_id,
+                "chunks_prefijo": num_chunks,
+                "segmentos_nuevos": len(definitivos),
+                "audio_procesado_hasta_sec": round(nueva_frontera, 2),
+                "final": final
+            }
+        )
+
+        return {
+            "status": "completado" if final else "parcial",
+            "processing_job_id": str(job.id),
+            "transcription_id": str(transcripcion.id),
+            "segmentos_nuevos": len(definitivos),
+            "audio_procesado_hasta_sec": nueva_frontera,
+            "duracion_prefijo_sec": duracion
+        }
+
+    async def _obtener_estado(
+        self,
+        db: AsyncSession,
+        upload_session: UploadSession
+    ) -> Tuple[ProcessingJob, Optional[TranscriptionResult]]:
+        """Obtener (o crear) el ProcessingJob incremental y su transcripción parcial."""
+        job = None
+        if upload_session.processing_job_id:
+            job = await db.get(ProcessingJob, upload_session.processing_job_id)
+
+        if job is None:
+            job = ProcessingJob(
+                class_session_id=upload_session.class_session_id,
+                tipo_procesamiento=TipoProcesamiento.ASR_ONLY,
+                estado=EstadoProcesamiento.PROCESANDO,
+                etapa_actual=EtapaProcesamiento.ASR,
+                progreso_porcentaje=0.0,
+                config_whisper={
+                    "preset": self.preset,
+                    "incremental": True,
+                    "upload_session_id": str(upload_session.id)
+                },
+                config_diarizacion={},
+                ruta_audio_original=upload_session.storage_path_chunks,
+                tiempo_inicio=datetime.utcnow(),
+                max_reintentos=3,
+                expires_at=datetime.utcnow() + timedelta(hours=24)
+            )
+            db.add(job)
+            await db.flush()
+            upload_session.processing_job_id = job.id
+            await db.commit()
+            return job, None
+
+        result = await db.execute(
+            select(TranscriptionResult)
+            .where(TranscriptionResult.processing_job_id == job.id)
+            .order_by(TranscriptionResult.created_at.desc())
+        )
+        return job, result.scalars().first()
+
+    async def _actualizar_prefijo(
+        self,
+        upload_session: UploadSession,
+        num_chunks: int,
+        directorio: Path
+    ) -> Path:
+        """
+        Extender el archivo de prefijo local con los chunks nuevos.
+
+        El prefijo es append-only: cada pasada solo copia los chunks que
+        faltan. Los chunks se leen del almacenamiento temporal del
+        ChunkService si está en este nodo, y de MinIO en otro caso.
+        """
+        directorio.mkdir(parents=True, exist_ok=True)
+        ruta_prefijo = directorio / "prefijo.bin"
+        ruta_estado = directorio / "estado.json"
+
+        chunks_en_prefijo = 0
+        if ruta_prefijo.exists() and ruta_estado.exists():
+            chunks_en_prefijo = json.loads(ruta_estado.read_text()).get("chunks", 0)
+        else:
+            ruta_prefijo.write_bytes(b"")
+
+        with open(ruta_prefijo, "ab") as prefijo:
+            for chunk_number in range(chunks_en_prefijo + 1, num_chunks + 1):
+                ruta_local = chunk_service.temp_dir / str(upload_session.id) / f"chunk_{chunk_number:06d}"
+                if ruta_local.exists():
+                    with open(ruta_local, "rb") as chunk:
+                        shutil.copyfileobj(chunk, prefijo)
+                else:
+                    await minio_service.download_to_stream(
+                        f"{upload_session.storage_path_chunks}/chunk_{chunk_number:06d}",
+                        prefijo
+                    )
+
+        ruta_estado.write_text(json.dumps({"chunks": num_chunks}))
+        return ruta_prefijo
+
+    @staticmethod
+    def _separar_definitivos(
+        segmentos: List[SegmentoTranscripcion],
+        procesado_hasta: float,
+        frontera: float,
+        final: bool
+    ) -> Tuple[List[SegmentoTranscripcion], float]:
+        """
+        Conservar los segmentos que terminan antes de la frontera estable.
+
+        Returns:
+            Tupla (segmentos definitivos, nueva frontera definitiva)
+        """
+        if final:
+            fin = max((s.end for s in segmentos), default=frontera)
+            return segmentos, max(frontera, fin)
+
+        definitivos = [s for s in segmentos if s.end <= frontera]
+        if len(definitivos) == len(segmentos):
+            # Nada cruza la frontera: el tramo hasta ella es definitivo
+            return definitivos, max(procesado_hasta, frontera)
+
+        # Retomar justo después del último segmento completo
+        nueva_frontera = definitivos[-1].end if definitivos else procesado_hasta
+        return definitivos, nueva_frontera
+
+    def _acumular(
+        self,
+        db: AsyncSession,
+        job: ProcessingJob,
+        transcripcion: Optional[TranscriptionResult],
+        nuevos: List[SegmentoTranscripcion],
+        idioma: str,
+        duracion: float,
+        procesado_hasta: float,
+        tiempo_pasada: float,
+        final: bool
+    ) -> TranscriptionResult:
+        """Añadir los segmentos definitivos a la transcripción parcial persistida."""
+        segmentos = list(transcripcion.segmentos or []) if transcripcion else []
+        segmentos.extend(s.dict() for s in nuevos)
+
+        texto_completo = " ".join(s["text"] for s in segmentos if s.get("text")).strip()
+        num_palabras = len(texto_completo.split())
+        confianza = float(np.mean([s["confidence"] for s in segmentos])) if segmentos else 0.0
+        duracion_transcrita = procesado_hasta if not final else duracion
+
+        if transcripcion is None:
+            modelo_usado = whisper_service.modelo_para_preset(self.preset)
+            transcripcion = TranscriptionResult(
+                processing_job_id=job.id,
+                modelo_whisper_usado=modelo_usado,
+                compute_type_usado=modelo_usado.rsplit("-", 1)[-1],
+                configuracion_whisper={"preset": self.preset, "incremental": True},
+                vad_aplicado=True,
+                alineacion_temporal_aplicada=True,
+                tiempo_procesamiento_sec=0.0
+            )
+            db.add(transcripcion)
+
+        transcripcion.texto_completo = texto_completo
+        transcripcion.texto_raw = texto_completo
+        transcripcion.idioma_detectado = idioma or "it"
+        transcripcion.confianza_global = confianza
+        transcripcion.segmentos = segmentos
+        transcripcion.num_palabras = num_palabras
+        transcripcion.num_segmentos = len(segmentos)
+        transcripcion.duracion_audio_sec = duracion
+        transcripcion.palabras_por_minuto = (
+            num_palabras / duracion_transcrita * 60 if duracion_transcrita > 0 else 0.0
+        )
+        transcripcion.tiempo_procesamiento_sec = (transcripcion.tiempo_procesamiento_sec or 0.0) + tiempo_pasada
+        transcripcion.audio_procesado_hasta_sec = procesado_hasta
+        transcripcion.es_parcial = not final
+        return transcripcion
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Verificar estado del servicio."""
+        return {
+            "service": "IncrementalASRService",
+            "status": "healthy",
+            "enabled": settings.ASR_INCREMENTAL_ENABLED,
+            "work_dir": str(self.work_dir),
+            "sesiones_en_curso": len(list(self.work_dir.glob("*"))) if self.work_dir.exists() else 0
+        }
+
+
+# Instancia global del servicio
+incremental_asr_service = IncrementalASRService()
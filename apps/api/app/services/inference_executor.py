@@ -0,0 +1,264 @@
+"""
+Executor dedicado para inferencia de modelos de IA (Whisper, pyannote).
+Ejecuta las llamadas bloqueantes fuera del event loop con un pool acotado,
+cancelación por job y métricas de cola.
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set
+
+from app.core import settings
+from app.services.base import BaseService
+
+
+class InferenceCancelledError(Exception):
+    """Excepción lanzada cuando un trabajo de inferencia es cancelado."""
+    pass
+
+
+class _TrabajoInferencia:
+    """Estado interno de un trabajo enviado al executor."""
+
+    def __init__(self, trabajo_id: int, job_id: Optional[str], descripcion: str):
+        self.trabajo_id = trabajo_id
+        self.job_id = job_id
+        self.descripcion = descripcion
+        self.cancel_event = threading.Event()
+        self.future: Optional[Future] = None
+        self.enviado_en = time.time()
+        self.iniciado_en: Optional[float] = None
+
+
+class InferenceExecutor(BaseService):
+    """
+    Pool acotado de threads que ejecuta la inferencia de modelos.
+
+    Los modelos cargados (Whisper, pyannote) liberan el GIL durante el cómputo
+    pesado, por lo que un pool de threads permite que el worker siga atendiendo
+    callbacks de progreso, heartbeats de BD y cancelaciones mientras el modelo
+    trabaja.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: Optional[int] = None):
+        super().__init__("InferenceExecutor")
+        self.max_workers = max_workers or settings.INFERENCE_MAX_WORKERS
+        self.max_queue = max_queue or settings.INFERENCE_MAX_QUEUE
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._contador = itertools.count(1)
+        self._trabajos: Dict[int, _TrabajoInferencia] = {}
+        self._local = threading.local()
+
+        # El semáforo de admisión se crea por event loop (asyncio.run por tarea Celery)
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._semaforo_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.estadisticas = {
+            "trabajos_enviados": 0,
+            "trabajos_completados": 0,
+            "trabajos_cancelados": 0,
+            "trabajos_con_error": 0,
+            "tiempo_total_espera_sec": 0.0,
+            "tiempo_total_ejecucion_sec": 0.0,
+            "max_profundidad_cola": 0
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Obtener (o crear) el pool de threads de inferencia."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="axonote-inference"
+                )
+            return self._executor
+
+    def _get_semaforo(self) -> asyncio.Semaphore:
+        """Obtener el semáforo de admisión del event loop actual."""
+        loop = asyncio.get_running_loop()
+        if self._semaforo is None or self._semaforo_loop is not loop:
+            self._semaforo = asyncio.Semaphore(self.max_workers + self.max_queue)
+            self._semaforo_loop = loop
+        return self._semaforo
+
+    async def ejecutar(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        job_id: Optional[str] = None,
+        descripcion: str = "inferencia",
+        **kwargs: Any
+    ) -> Any:
+        """
+        Ejecutar una función de inferencia en el pool y esperar su resultado.
+
+        Args:
+            func: Función síncrona a ejecutar (p.ej. ``modelo.transcribe``)
+            *args: Argumentos posicionales de la función
+            job_id: ID del ProcessingJob asociado, para cancelación por job
+            descripcion: Descripción corta para logs y métricas
+            **kwargs: Argumentos nombrados de la función
+
+        Returns:
+            Resultado devuelto por la función
+
+        Raises:
+            InferenceCancelledError: Si el trabajo fue cancelado
+        """
+        semaforo = self._get_semaforo()
+        await semaforo.acquire()
+
+        trabajo = _TrabajoInferencia(next(self._contador), job_id, descripcion)
+        with self._lock:
+            self._trabajos[trabajo.trabajo_id] = trabajo
+            self.estadisticas["trabajos_enviados"] += 1
+            self.estadisticas["max_profundidad_cola"] = max(
+                self.estadisticas["max_profundidad_cola"],
+                self._profundidad_cola()
+            )
+
+        try:
+            trabajo.future = self._get_executor().submit(
+                self._ejecutar_en_thread, trabajo, func, args, kwargs
+            )
+            try:
+                resultado = await asyncio.wrap_future(trabajo.future)
+            except asyncio.CancelledError:
+                # La corrutina fue cancelada: propagar al thread de inferencia
+                trabajo.cancel_event.set()
+                trabajo.future.cancel()
+                raise
+
+            with self._lock:
+                self.estadisticas["trabajos_completados"] += 1
+            return resultado
+
+        except (InferenceCancelledError, asyncio.CancelledError):
+            with self._lock:
+                self.estadisticas["trabajos_cancelados"] += 1
+            self.logger.info(
+                "Trabajo de inferencia cancelado",
+                extra={"job_id": job_id, "descripcion": descripcion}
+            )
+            raise
+        except Exception:
+            with self._lock:
+                self.estadisticas["trabajos_con_error"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._trabajos.pop(trabajo.trabajo_id, None)
+                if trabajo.iniciado_en is not None:
+                    self.estadisticas["tiempo_total_ejecucion_sec"] += time.time() - trabajo.iniciado_en
+            semaforo.release()
+
+    def _ejecutar_en_thread(
+        self,
+        trabajo: _TrabajoInferencia,
+        func: Callable[..., Any],
+        args: tuple,
+        kwargs: Dict[str, Any]
+    ) -> Any:
+        """Wrapper ejecutado dentro del thread de inferencia."""
+        trabajo.iniciado_en = time.time()
+        with self._lock:
+            self.estadisticas["tiempo_total_espera_sec"] += trabajo.iniciado_en - trabajo.enviado_en
+
+        if trabajo.cancel_event.is_set():
+            raise InferenceCancelledError(f"Trabajo {trabajo.descripcion} cancelado antes de iniciar")
+
+        self._local.trabajo = trabajo
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._local.trabajo = None
+
+    def verificar_cancelacion(self) -> None:
+        """
+        Punto de control cooperativo para código que corre en el pool.
+
+        Las funciones de inferencia que iteran (segmentos de Whisper, pasos de
+        pyannote) deben llamarlo periódicamente para respetar cancelaciones.
+
+        Raises:
+            InferenceCancelledError: Si el trabajo actual fue cancelado
+        """
+        trabajo: Optional[_TrabajoInferencia] = getattr(self._local, "trabajo", None)
+        if trabajo is not None and trabajo.cancel_event.is_set():
+            raise InferenceCancelledError(f"Trabajo {trabajo.descripcion} cancelado")
+
+    def cancelar(self, job_id: str) -> int:
+        """
+        Cancelar todos los trabajos de inferencia de un job.
+
+        Los trabajos en cola se descartan; los que están en ejecución se
+        detienen en su próximo punto de control.
+
+        Args:
+            job_id: ID del ProcessingJob
+
+        Returns:
+            Número de trabajos marcados para cancelación
+        """
+        cancelados = 0
+        with self._lock:
+            for trabajo in self._trabajos.values():
+                if trabajo.job_id == job_id:
+                    trabajo.cancel_event.set()
+                    cancelados += 1
+
+        if cancelados:
+            self.logger.info(
+                "Cancelación de inferencia solicitada",
+                extra={"job_id": job_id, "trabajos": cancelados}
+            )
+        return cancelados
+
+    def _profundidad_cola(self) -> int:
+        """Trabajos enviados que aún no han empezado (requiere ``_lock``)."""
+        return sum(1 for t in self._trabajos.values() if t.iniciado_en is None)
+
+    def get_metricas(self) -> Dict[str, Any]:
+        """Obtener métricas de cola y ejecución del executor."""
+        with self._lock:
+            en_cola = self._profundidad_cola()
+            en_ejecucion = len(self._trabajos) - en_cola
+            jobs_activos: Set[str] = {t.job_id for t in self._trabajos.values() if t.job_id}
+            metricas = self.estadisticas.copy()
+
+        metricas.update({
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "profundidad_cola": en_cola,
+            "en_ejecucion": en_ejecucion,
+            "jobs_activos": sorted(jobs_activos)
+        })
+        return metricas
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Verificar estado del executor."""
+        metricas = self.get_metricas()
+        saturado = metricas["profundidad_cola"] >= self.max_queue
+        return {
+            "service": "InferenceExecutor",
+            "status": "degraded" if saturado else "healthy",
+            "metricas": metricas
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancelar trabajos pendientes y cerrar el pool."""
+        with self._lock:
+            for trabajo in self._trabajos.values():
+                trabajo.cancel_event.set()
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# Instancia global del executor
+inference_executor = InferenceExecutor()
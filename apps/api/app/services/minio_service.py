@@ -4,33 +4,169 @@ Maneja subida, descarga y gestión de archivos de audio e imágenes.
 """
 
 import asyncio
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
-from typing import Any, Dict, Optional, BinaryIO
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, BinaryIO, Sequence, Tuple, Union
 from urllib.parse import urlparse
 
+import certifi
+import urllib3
 from minio import Minio
+from minio.commonconfig import ComposeSource
 from minio.error import S3Error
 
 from app.core import settings
 from app.services.base import BaseService, ServiceNotAvailableError, ServiceConfigurationError
 
 
+# Límites de compose_object (multipart copy de S3)
+MIN_COMPOSE_PART_SIZE = 5 * 1024 * 1024
+MAX_COMPOSE_SOURCES = 10000
+
+
+class _LectorObjetosConcatenados:
+    """
+    Lector tipo archivo que encadena varios objetos de MinIO en orden.
+    
+    Abre cada objeto solo cuando se agota el anterior, de modo que
+    ``put_object`` lo consume por partes sin que el total pase por disco
+    ni por memoria.
+    """
+    
+    def __init__(self, client: Minio, bucket_name: str, object_names: List[str]):
+        self._client = client
+        self._bucket_name = bucket_name
+        self._pendientes = list(reversed(object_names))
+        self._actual = None
+    
+    def read(self, size: int = -1) -> bytes:
+        while True:
+            if self._actual is None:
+                if not self._pendientes:
+                    return b""
+                self._actual = self._client.get_object(self._bucket_name, self._pendientes.pop())
+            
+            data = self._actual.read(size if size and size > 0 else None)
+            if data:
+                return data
+            self._cerrar_actual()
+    
+    def _cerrar_actual(self) -> None:
+        self._actual.close()
+        self._actual.release_conn()
+        self._actual = None
+    
+    def close(self) -> None:
+        if self._actual is not None:
+            self._cerrar_actual()
+        self._pendientes.clear()
+
+
+class _LectorIteradorAsync:
+    """
+    Lector tipo archivo, usado desde un thread del executor, sobre un
+    iterador asíncrono de bloques de bytes.
+    
+    Cada bloque se pide al event loop solo cuando el anterior se ha
+    consumido, así que en memoria hay como mucho un bloque más la parte
+    que esté acumulando ``put_object``.
+    """
+    
+    def __init__(self, iterador: AsyncIterator[bytes], loop: asyncio.AbstractEventLoop):
+        self._iterador = iterador.__aiter__()
+        self._loop = loop
+        self._pendiente = memoryview(b"")
+        self._agotado = False
+    
+    def read(self, size: int = -1) -> bytes:
+        while not self._pendiente and not self._agotado:
+            try:
+                bloque = asyncio.run_coroutine_threadsafe(self._iterador.__anext__(), self._loop).result()
+                self._pendiente = memoryview(bloque)
+            except StopAsyncIteration:
+                self._agotado = True
+        
+        if size is None or size < 0 or size >= len(self._pendiente):
+            data, self._pendiente = self._pendiente, memoryview(b"")
+        else:
+            data, self._pendiente = self._pendiente[:size], self._pendiente[size:]
+        return bytes(data)
+
+
+def _longitud_restante(stream: BinaryIO) -> Optional[int]:
+    """Bytes que quedan por leer de un stream posicionable, o None si no lo es."""
+    try:
+        posicion = stream.tell()
+        fin = stream.seek(0, io.SEEK_END)
+        stream.seek(posicion)
+        return fin - posicion
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
 class MinioService(BaseService):
-    """Servicio para gestión de almacenamiento con MinIO."""
+    """
+    Servicio para gestión de almacenamiento con MinIO.
+    
+    Las llamadas bloqueantes del SDK se ejecutan en un pool de threads
+    propio, separado del executor por defecto del loop, para que una ráfaga
+    de uploads no bloquee otras operaciones del proceso. El pool de
+    conexiones HTTP se dimensiona para que cada thread tenga su conexión.
+    """
     
     def __init__(self):
         super().__init__("MinioService")
         self.client: Optional[Minio] = None
         self.bucket_name = settings.MINIO_BUCKET
+        # Tamaño de parte para uploads sin longitud conocida y lecturas por streaming
+        self.part_size = max(settings.MINIO_STREAM_PART_SIZE_MB, 5) * 1024 * 1024
+        
+        self.max_workers = settings.MINIO_IO_MAX_WORKERS
+        # put_object sube hasta 3 partes en paralelo por operación
+        self.http_pool_size = max(settings.MINIO_HTTP_POOL_SIZE, self.max_workers)
+        self._http: Optional[urllib3.PoolManager] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._en_vuelo = 0
+        
+        self.estadisticas = {
+            "operaciones": 0,
+            "operaciones_con_error": 0,
+            "operaciones_en_cola": 0,
+            "max_en_vuelo": 0,
+            "tiempo_total_espera_sec": 0.0,
+            "tiempo_total_ejecucion_sec": 0.0
+        }
     
     async def _setup(self) -> None:
         """Configurar cliente MinIO."""
         try:
+            self._http = urllib3.PoolManager(
+                num_pools=4,
+                maxsize=self.http_pool_size,
+                timeout=urllib3.Timeout(
+                    connect=settings.MINIO_HTTP_CONNECT_TIMEOUT_SEC,
+                    read=settings.MINIO_HTTP_READ_TIMEOUT_SEC
+                ),
+                cert_reqs="CERT_REQUIRED",
+                ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+                retries=urllib3.Retry(
+                    total=5,
+                    backoff_factor=0.2,
+                    status_forcelist=[500, 502, 503, 504]
+                )
+            )
+            
             self.client = Minio(
                 settings.MINIO_ENDPOINT,
                 access_key=settings.MINIO_ACCESS_KEY,
                 secret_key=settings.MINIO_SECRET_KEY,
-                secure=settings.MINIO_SECURE
+                secure=settings.MINIO_SECURE,
+                http_client=self._http
             )
             
             # Verificar y crear bucket si no existe
@@ -42,21 +178,87 @@ class MinioService(BaseService):
                 f"Error configurando cliente MinIO: {str(e)}"
             )
     
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Obtener (o crear) el pool de threads de I/O de MinIO."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="axonote-minio"
+                )
+            return self._executor
+    
+    async def _ejecutar(self, funcion: Callable[..., Any], *args: Any) -> Any:
+        """
+        Ejecutar una llamada bloqueante del SDK en el pool de MinIO.
+        
+        Registra operaciones en vuelo, en cola (enviadas con todos los
+        threads ocupados) y tiempos de espera y ejecución.
+        """
+        enviado_en = time.monotonic()
+        with self._lock:
+            self._en_vuelo += 1
+            self.estadisticas["operaciones"] += 1
+            self.estadisticas["max_en_vuelo"] = max(self.estadisticas["max_en_vuelo"], self._en_vuelo)
+            if self._en_vuelo > self.max_workers:
+                self.estadisticas["operaciones_en_cola"] += 1
+        
+        def ejecutar() -> Any:
+            iniciado_en = time.monotonic()
+            try:
+                return funcion(*args)
+            finally:
+                with self._lock:
+                    self.estadisticas["tiempo_total_espera_sec"] += iniciado_en - enviado_en
+                    self.estadisticas["tiempo_total_ejecucion_sec"] += time.monotonic() - iniciado_en
+        
+        try:
+            return await asyncio.get_event_loop().run_in_executor(self._get_executor(), ejecutar)
+        except Exception:
+            with self._lock:
+                self.estadisticas["operaciones_con_error"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._en_vuelo -= 1
+    
+    def metricas(self) -> Dict[str, Any]:
+        """Estado del pool de threads y del pool de conexiones HTTP."""
+        with self._lock:
+            metricas = dict(self.estadisticas)
+            en_vuelo = self._en_vuelo
+        
+        metricas.update({
+            "max_workers": self.max_workers,
+            "en_vuelo": en_vuelo,
+            "en_cola": max(0, en_vuelo - self.max_workers),
+            "saturacion_pool": round(min(en_vuelo, self.max_workers) / self.max_workers, 3),
+            "http_pool_size": self.http_pool_size
+        })
+        
+        if self._http is not None:
+            pools = [pool for pool in map(self._http.pools.get, self._http.pools.keys()) if pool is not None]
+            conexiones_abiertas = sum(pool.num_connections for pool in pools)
+            conexiones_libres = sum(pool.pool.qsize() for pool in pools if pool.pool is not None)
+            metricas.update({
+                "http_conexiones_abiertas": conexiones_abiertas,
+                "http_conexiones_libres": conexiones_libres,
+                "http_peticiones": sum(pool.num_requests for pool in pools)
+            })
+        
+        return metricas
+    
     async def _ensure_bucket_exists(self) -> None:
         """Asegurar que el bucket existe, crearlo si no."""
         try:
-            # Ejecutar en thread pool ya que minio es síncrono
-            loop = asyncio.get_event_loop()
-            
-            bucket_exists = await loop.run_in_executor(
-                None, 
+            # Ejecutar en el pool de I/O ya que minio es síncrono
+            bucket_exists = await self._ejecutar(
                 self.client.bucket_exists, 
                 self.bucket_name
             )
             
             if not bucket_exists:
-                await loop.run_in_executor(
-                    None,
+                await self._ejecutar(
                     self.client.make_bucket,
                     self.bucket_name
                 )
@@ -71,11 +273,8 @@ class MinioService(BaseService):
     async def health_check(self) -> Dict[str, Any]:
         """Verificar salud del servicio MinIO."""
         try:
-            loop = asyncio.get_event_loop()
-            
             # Verificar que el bucket existe
-            bucket_exists = await loop.run_in_executor(
-                None,
+            bucket_exists = await self._ejecutar(
                 self.client.bucket_exists,
                 self.bucket_name
             )
@@ -84,7 +283,8 @@ class MinioService(BaseService):
                 "status": "healthy",
                 "bucket_exists": bucket_exists,
                 "bucket_name": self.bucket_name,
-                "endpoint": settings.MINIO_ENDPOINT
+                "endpoint": settings.MINIO_ENDPOINT,
+                "io": self.metricas()
             }
             
         except Exception as e:
@@ -111,6 +311,38 @@ class MinioService(BaseService):
             content_type: Tipo MIME del archivo
             metadata: Metadatos adicionales
         
+        Returns:
+            URL del archivo subido
+        """
+        return await self.upload_stream(
+            file_data,
+            object_name,
+            content_type=content_type,
+            metadata=metadata
+        )
+    
+    async def upload_stream(
+        self,
+        source: Union[BinaryIO, AsyncIterator[bytes]],
+        object_name: str,
+        length: Optional[int] = None,
+        content_type: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Subir a MinIO desde un objeto tipo archivo o un iterador asíncrono.
+        
+        Si la longitud se conoce (indicada o por ser el stream posicionable)
+        se sube con ella; si no, en multipart de ``part_size`` bytes. En
+        ningún caso se lee el contenido completo en memoria.
+        
+        Args:
+            source: Objeto tipo archivo o iterador asíncrono de bloques
+            object_name: Nombre del objeto en MinIO
+            length: Tamaño total en bytes, si se conoce
+            content_type: Tipo MIME del archivo
+            metadata: Metadatos adicionales
+        
         Returns:
             URL del archivo subido
         """
@@ -120,16 +352,23 @@ class MinioService(BaseService):
             
             loop = asyncio.get_event_loop()
             
-            # Subir archivo
-            await loop.run_in_executor(
-                None,
-                self.client.put_object,
-                self.bucket_name,
-                object_name,
-                file_data,
-                -1,  # length (auto-detect)
-                content_type,
-                metadata
+            if hasattr(source, "__aiter__"):
+                reader = _LectorIteradorAsync(source, loop)
+            else:
+                reader = source
+                if length is None:
+                    length = _longitud_restante(source)
+            
+            await self._ejecutar(
+                lambda: self.client.put_object(
+                    self.bucket_name,
+                    object_name,
+                    reader,
+                    length if length is not None else -1,
+                    content_type=content_type or "application/octet-stream",
+                    metadata=metadata,
+                    part_size=0 if length is not None else self.part_size
+                )
             )
             
             # Generar URL del archivo
@@ -139,6 +378,7 @@ class MinioService(BaseService):
                 "Archivo subido a MinIO",
                 object_name=object_name,
                 content_type=content_type,
+                size_bytes=length,
                 url=file_url
             )
             
@@ -157,7 +397,10 @@ class MinioService(BaseService):
     
     async def download_file(self, object_name: str) -> bytes:
         """
-        Descargar archivo de MinIO.
+        Descargar archivo de MinIO completo en memoria.
+        
+        Pensado para objetos pequeños; para objetos grandes usar
+        ``iter_object``, ``download_to_stream`` o ``download_to_file``.
         
         Args:
             object_name: Nombre del objeto en MinIO
@@ -169,11 +412,8 @@ class MinioService(BaseService):
             if not self.client:
                 await self.initialize()
             
-            loop = asyncio.get_event_loop()
-            
             # Descargar archivo
-            response = await loop.run_in_executor(
-                None,
+            response = await self._ejecutar(
                 self.client.get_object,
                 self.bucket_name,
                 object_name
@@ -202,6 +442,403 @@ class MinioService(BaseService):
                 f"Error descargando archivo: {str(e)}"
             )
     
+    async def iter_object(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        part_size: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Leer un objeto (o un rango) de MinIO en bloques de tamaño fijo.
+        
+        Args:
+            object_name: Nombre del objeto en MinIO
+            offset: Byte inicial del rango
+            length: Bytes a leer desde ``offset`` (None = hasta el final)
+            part_size: Tamaño máximo de cada bloque (por defecto ``part_size``)
+        
+        Yields:
+            Bloques de bytes en orden
+        """
+        if not self.client:
+            await self.initialize()
+        
+        part_size = part_size or self.part_size
+        
+        try:
+            response = await self._ejecutar(
+                lambda: self.client.get_object(
+                    self.bucket_name,
+                    object_name,
+                    offset=offset,
+                    length=length or 0
+                )
+            )
+        except S3Error as e:
+            self.logger.error(
+                "Error leyendo objeto de MinIO",
+                extra={
+                    "object_name": object_name,
+                    "offset": offset,
+                    "length": length,
+                    "error": str(e)
+                }
+            )
+            raise ServiceNotAvailableError(
+                "MinIO",
+                f"Error descargando archivo: {str(e)}"
+            ) from e
+        
+        try:
+            while True:
+                block = await self._ejecutar(response.read, part_size)
+                if not block:
+                    break
+                yield block
+        finally:
+            response.close()
+            response.release_conn()
+    
+    async def download_range(self, object_name: str, offset: int, length: int) -> bytes:
+        """
+        Descargar un rango de bytes de un objeto con un GET por rango.
+        
+        Args:
+            object_name: Nombre del objeto en MinIO
+            offset: Byte inicial
+            length: Número de bytes
+        
+        Returns:
+            Contenido del rango
+        """
+        return b"".join([block async for block in self.iter_object(object_name, offset, length)])
+    
+    async def download_to_stream(
+        self,
+        object_name: str,
+        destination: BinaryIO,
+        offset: int = 0,
+        length: Optional[int] = None
+    ) -> int:
+        """
+        Copiar un objeto (o un rango) a un objeto tipo archivo por bloques.
+        
+        Args:
+            object_name: Nombre del objeto en MinIO
+            destination: Objeto tipo archivo de destino
+            offset: Byte inicial del rango
+            length: Bytes a copiar desde ``offset`` (None = hasta el final)
+        
+        Returns:
+            Bytes escritos
+        """
+        written = 0
+        async for block in self.iter_object(object_name, offset, length):
+            await self._ejecutar(destination.write, block)
+            written += len(block)
+        return written
+    
+    async def download_to_file(self, object_name: str, file_path: str) -> int:
+        """
+        Descargar objeto de MinIO directamente a un archivo local.
+        
+        El SDK escribe por partes en disco, sin cargar el objeto en memoria.
+        
+        Args:
+            object_name: Nombre del objeto en MinIO
+            file_path: Ruta local de destino
+        
+        Returns:
+            Tamaño descargado en bytes
+        """
+        try:
+            if not self.client:
+                await self.initialize()
+            
+            stat = await self._ejecutar(
+                self.client.fget_object,
+                self.bucket_name,
+                object_name,
+                file_path
+            )
+            
+            self.logger.info(
+                "Archivo descargado de MinIO a disco",
+                extra={
+                    "object_name": object_name,
+                    "file_path": file_path,
+                    "size_bytes": stat.size
+                }
+            )
+            
+            return stat.size
+            
+        except S3Error as e:
+            self.logger.error(
+                "Error descargando archivo de MinIO a disco",
+                extra={
+                    "object_name": object_name,
+                    "error": str(e)
+                }
+            )
+            raise ServiceNotAvailableError(
+                "MinIO",
+                f"Error descargando archivo: {str(e)}"
+            ) from e
+    
+    async def upload_from_file(
+        self,
+        file_path: str,
+        object_name: str,
+        content_type: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Subir un archivo local a MinIO con tamaño conocido.
+        
+        Args:
+            file_path: Ruta local del archivo
+            object_name: Nombre del objeto en MinIO
+            content_type: Tipo MIME del archivo
+            metadata: Metadatos adicionales
+        
+        Returns:
+            URL del archivo subido
+        """
+        try:
+            if not self.client:
+                await self.initialize()
+            
+            await self._ejecutar(
+                lambda: self.client.fput_object(
+                    self.bucket_name,
+                    object_name,
+                    file_path,
+                    content_type=content_type or "application/octet-stream",
+                    metadata=metadata
+                )
+            )
+            
+            file_url = f"{'https' if settings.MINIO_SECURE else 'http'}://{settings.MINIO_ENDPOINT}/{self.bucket_name}/{object_name}"
+            
+            self.logger.info(
+                "Archivo local subido a MinIO",
+                extra={
+                    "object_name": object_name,
+                    "file_path": file_path,
+                    "url": file_url
+                }
+            )
+            
+            return file_url
+            
+        except S3Error as e:
+            self.logger.error(
+                "Error subiendo archivo local a MinIO",
+                extra={
+                    "object_name": object_name,
+                    "error": str(e)
+                }
+            )
+            raise ServiceNotAvailableError(
+                "MinIO",
+                f"Error subiendo archivo: {str(e)}"
+            ) from e
+    
+    async def compose_file(
+        self,
+        source_names: List[str],
+        object_name: str,
+        source_sizes: Optional[List[int]] = None,
+        content_type: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Crear un objeto concatenando otros objetos del bucket.
+        
+        Si los tamaños lo permiten (todas las fuentes salvo la última de al
+        menos 5 MiB, hasta 10000 fuentes) el objeto se compone en el
+        servidor con ``compose_object`` y ningún byte sale de MinIO. Si no,
+        las fuentes se leen en orden y se suben como un único multipart de
+        longitud conocida, sin pasar por disco local.
+        
+        Args:
+            source_names: Objetos fuente, en orden
+            object_name: Nombre del objeto resultante
+            source_sizes: Tamaño de cada fuente (se consulta si no se indica)
+            content_type: Tipo MIME del objeto resultante
+            metadata: Metadatos adicionales
+        
+        Returns:
+            URL del objeto resultante
+        """
+        try:
+            if not self.client:
+                await self.initialize()
+            
+            if source_sizes is None:
+                stats = await asyncio.gather(*(
+                    self._ejecutar(self.client.stat_object, self.bucket_name, name)
+                    for name in source_names
+                ))
+                source_sizes = [stat.size for stat in stats]
+            
+            server_side = (
+                0 < len(source_names) <= MAX_COMPOSE_SOURCES
+                and all(size >= MIN_COMPOSE_PART_SIZE for size in source_sizes[:-1])
+            )
+            
+            if server_side:
+                headers = dict(metadata or {})
+                headers["Content-Type"] = content_type or "application/octet-stream"
+                await self._ejecutar(
+                    lambda: self.client.compose_object(
+                        self.bucket_name,
+                        object_name,
+                        [ComposeSource(self.bucket_name, name) for name in source_names],
+                        metadata=headers
+                    )
+                )
+            else:
+                def stream_sync():
+                    reader = _LectorObjetosConcatenados(self.client, self.bucket_name, source_names)
+                    try:
+                        self.client.put_object(
+                            self.bucket_name,
+                            object_name,
+                            reader,
+                            sum(source_sizes),
+                            content_type=content_type or "application/octet-stream",
+                            metadata=metadata
+                        )
+                    finally:
+                        reader.close()
+                
+                await self._ejecutar(stream_sync)
+            
+            file_url = f"{'https' if settings.MINIO_SECURE else 'http'}://{settings.MINIO_ENDPOINT}/{self.bucket_name}/{object_name}"
+            
+            self.logger.info(
+                "Objeto compuesto en MinIO",
+                extra={
+                    "object_name": object_name,
+                    "sources": len(source_names),
+                    "size_bytes": sum(source_sizes),
+                    "server_side": server_side,
+                    "url": file_url
+                }
+            )
+            
+            return file_url
+            
+        except S3Error as e:
+            self.logger.error(
+                "Error componiendo objeto en MinIO",
+                extra={
+                    "object_name": object_name,
+                    "error": str(e)
+                }
+            )
+            raise ServiceNotAvailableError(
+                "MinIO",
+                f"Error componiendo objeto: {str(e)}"
+            ) from e
+    
+    async def upload_many(
+        self,
+        uploads: Sequence[Tuple[Union[str, BinaryIO], str]],
+        content_type: Optional[str] = None,
+        concurrency: Optional[int] = None
+    ) -> List[str]:
+        """
+        Subir varios archivos con concurrencia acotada.
+        
+        Args:
+            uploads: Pares (ruta local o stream, nombre del objeto)
+            content_type: Tipo MIME común
+            concurrency: Subidas simultáneas (por defecto MINIO_BATCH_CONCURRENCY)
+        
+        Returns:
+            URLs de los objetos, en el orden de ``uploads``
+        """
+        semaforo = asyncio.Semaphore(concurrency or settings.MINIO_BATCH_CONCURRENCY)
+        
+        async def subir(source: Union[str, BinaryIO], object_name: str) -> str:
+            async with semaforo:
+                if isinstance(source, str):
+                    return await self.upload_from_file(source, object_name, content_type=content_type)
+                return await self.upload_stream(source, object_name, content_type=content_type)
+        
+        return list(await asyncio.gather(*(subir(source, name) for source, name in uploads)))
+    
+    async def download_many(
+        self,
+        downloads: Sequence[Tuple[str, str]],
+        concurrency: Optional[int] = None
+    ) -> List[int]:
+        """
+        Descargar varios objetos a disco con concurrencia acotada.
+        
+        Args:
+            downloads: Pares (nombre del objeto, ruta local de destino)
+            concurrency: Descargas simultáneas (por defecto MINIO_BATCH_CONCURRENCY)
+        
+        Returns:
+            Bytes descargados por objeto, en el orden de ``downloads``
+        """
+        semaforo = asyncio.Semaphore(concurrency or settings.MINIO_BATCH_CONCURRENCY)
+        
+        async def descargar(object_name: str, file_path: str) -> int:
+            async with semaforo:
+                return await self.download_to_file(object_name, file_path)
+        
+        return list(await asyncio.gather(*(descargar(name, path) for name, path in downloads)))
+    
+    async def object_exists(self, object_name: str) -> bool:
+        """
+        Verificar si un objeto existe en el bucket.
+        
+        Args:
+            object_name: Nombre del objeto en MinIO
+        
+        Returns:
+            True si el objeto existe
+        """
+        if not self.client:
+            await self.initialize()
+        
+        try:
+            await self._ejecutar(
+                self.client.stat_object,
+                self.bucket_name,
+                object_name
+            )
+            return True
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return False
+            raise ServiceNotAvailableError(
+                "MinIO",
+                f"Error consultando objeto: {str(e)}"
+            ) from e
+    
+    def object_name_from_url(self, file_url: str) -> Optional[str]:
+        """
+        Extraer el nombre de objeto a partir de una URL generada por ``upload_file``.
+        
+        Args:
+            file_url: URL del objeto en MinIO
+        
+        Returns:
+            Nombre del objeto, o None si la URL no pertenece al bucket
+        """
+        path = urlparse(file_url).path.lstrip("/")
+        prefix = f"{self.bucket_name}/"
+        if not path.startswith(prefix):
+            return None
+        return path[len(prefix):]
+    
     async def delete_file(self, object_name: str) -> None:
         """
         Eliminar archivo de MinIO.
@@ -213,10 +850,7 @@ class MinioService(BaseService):
             if not self.client:
                 await self.initialize()
             
-            loop = asyncio.get_event_loop()
-            
-            await loop.run_in_executor(
-                None,
+            await self._ejecutar(
                 self.client.remove_object,
                 self.bucket_name,
                 object_name
@@ -257,10 +891,7 @@ class MinioService(BaseService):
             if not self.client:
                 await self.initialize()
             
-            loop = asyncio.get_event_loop()
-            
-            url = await loop.run_in_executor(
-                None,
+            url = await self._ejecutar(
                 self.client.presigned_get_object,
                 self.bucket_name,
                 object_name,
@@ -300,10 +931,7 @@ class MinioService(BaseService):
             if not self.client:
                 await self.initialize()
             
-            loop = asyncio.get_event_loop()
-            
-            objects = await loop.run_in_executor(
-                None,
+            objects = await self._ejecutar(
                 lambda: list(self.client.list_objects(self.bucket_name, prefix=prefix))
             )
             
@@ -14,6 +14,7 @@ from sqlalchemy.orm import Session
 
 from app.models.analytics import KnowledgeConcept, ConceptMastery
 from app.models.user import User
+from app.services.terminology_index_service import terminology_index_service
 
 logger = logging.getLogger(__name__)
 
@@ -76,6 +77,8 @@ class DifficultyEstimator:
         logger.info(f"Estimating difficulty for content: {content.get('title', 'Unknown')}")
         
         try:
+            await self._ensure_terminology_index()
+            
             text = content.get("text", "")
             if not text:
                 return self._default_difficulty_analysis()
@@ -400,8 +403,20 @@ class DifficultyEstimator:
         }
     
     # Métodos auxiliares
+    async def _ensure_terminology_index(self) -> None:
+        """Cargar el índice de terminología compartido (si falla se usa el respaldo)."""
+        try:
+            await terminology_index_service.obtener_indice()
+        except Exception as e:
+            logger.warning(f"Terminology index unavailable, using built-in terms: {e}")
+    
     def _load_medical_terms_database(self) -> Dict[str, Dict]:
-        """Carga base de datos de términos médicos."""
+        """
+        Carga base de datos de términos médicos.
+        
+        Solo se usa como respaldo cuando el índice de terminología compartido
+        no está cargado en el proceso.
+        """
         
         # Base de datos simplificada de términos médicos
         return {
@@ -434,6 +449,11 @@ class DifficultyEstimator:
     
     def _count_medical_terms(self, text: str) -> int:
         """Cuenta términos médicos en el texto."""
+        # Índice de terminología compartido: una pasada con el autómata
+        index = terminology_index_service.indice_actual()
+        if index is not None and index.terminos:
+            return len(index.buscar(text))
+        
         count = 0
         text_lower = text.lower()
         
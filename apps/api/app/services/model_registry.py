@@ -0,0 +1,228 @@
+"""
+Registro de modelos de IA residentes en memoria.
+Carga modelos bajo demanda por clave (p.ej. tamaño y compute_type de Whisper),
+los mantiene calientes dentro de un presupuesto de memoria y desaloja por LRU.
+"""
+
+import gc
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import torch
+
+from app.core import settings
+from app.services.base import BaseService
+
+
+class _EntradaModelo:
+    """Modelo residente y sus métricas de uso."""
+
+    def __init__(self, modelo: Any, memoria_mb: float, tiempo_carga_sec: float):
+        self.modelo = modelo
+        self.memoria_mb = memoria_mb
+        self.tiempo_carga_sec = tiempo_carga_sec
+        self.cargado_en = time.time()
+        self.ultimo_uso = self.cargado_en
+        self.usos = 0
+
+
+class ModelRegistry(BaseService):
+    """
+    Pool de modelos calientes con desalojo LRU.
+
+    Permite que jobs con presets distintos compartan un mismo worker sin
+    recargar el modelo en cada cambio: cada combinación se carga una sola
+    vez y se conserva mientras quepa en el presupuesto de memoria.
+    La carga se hace en el thread que pide el modelo (normalmente el del
+    executor de inferencia); dos peticiones de la misma clave esperan a
+    una única carga.
+    """
+
+    def __init__(self, nombre: str, presupuesto_mb: float, max_modelos: int):
+        super().__init__(nombre)
+        self.presupuesto_mb = presupuesto_mb
+        self.max_modelos = max(1, max_modelos)
+        self._modelos: "OrderedDict[Hashable, _EntradaModelo]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._locks_carga: Dict[Hashable, threading.Lock] = {}
+
+        self.estadisticas = {
+            "hits": 0,
+            "misses": 0,
+            "cargas": 0,
+            "desalojos": 0,
+            "errores_carga": 0,
+            "tiempo_total_carga_sec": 0.0
+        }
+
+    def obtener(
+        self,
+        clave: Hashable,
+        cargador: Callable[[], Any],
+        memoria_estimada_mb: float
+    ) -> Any:
+        """
+        Obtener un modelo, cargándolo si no está residente.
+
+        Llamada bloqueante: usar desde el executor de inferencia.
+
+        Args:
+            clave: Identificador del modelo (p.ej. ``("large-v3", "float16")``)
+            cargador: Función que construye el modelo
+            memoria_estimada_mb: Memoria estimada del modelo para el presupuesto
+
+        Returns:
+            Modelo listo para inferencia
+        """
+        with self._lock:
+            entrada = self._tomar(clave)
+            if entrada is not None:
+                self.estadisticas["hits"] += 1
+                return entrada.modelo
+            lock_carga = self._locks_carga.setdefault(clave, threading.Lock())
+
+        with lock_carga:
+            # Otro thread pudo cargarlo mientras esperábamos
+            with self._lock:
+                entrada = self._tomar(clave)
+                if entrada is not None:
+                    self.estadisticas["hits"] += 1
+                    return entrada.modelo
+                self.estadisticas["misses"] += 1
+                desalojados = self._hacer_espacio(memoria_estimada_mb)
+
+            if desalojados:
+                self._liberar_memoria()
+
+            inicio = time.time()
+            try:
+                modelo = cargador()
+            except Exception:
+                with self._lock:
+                    self.estadisticas["errores_carga"] += 1
+                raise
+            tiempo_carga = time.time() - inicio
+
+            with self._lock:
+                entrada = _EntradaModelo(modelo, memoria_estimada_mb, tiempo_carga)
+                entrada.usos = 1
+                self._modelos[clave] = entrada
+                self.estadisticas["cargas"] += 1
+                self.estadisticas["tiempo_total_carga_sec"] += tiempo_carga
+
+        self.logger.info(
+            "Modelo cargado en registro",
+            extra={
+                "registro": self.service_name,
+                "clave": str(clave),
+                "memoria_estimada_mb": memoria_estimada_mb,
+                "tiempo_carga_sec": round(tiempo_carga, 2),
+                "desalojados": [str(c) for c in desalojados]
+            }
+        )
+        return modelo
+
+    def _tomar(self, clave: Hashable) -> Optional[_EntradaModelo]:
+        """Marcar un modelo como usado recientemente (requiere ``_lock``)."""
+        entrada = self._modelos.get(clave)
+        if entrada is not None:
+            self._modelos.move_to_end(clave)
+            entrada.ultimo_uso = time.time()
+            entrada.usos += 1
+        return entrada
+
+    def _hacer_espacio(self, memoria_necesaria_mb: float) -> list:
+        """
+        Desalojar modelos LRU hasta que quepa el nuevo (requiere ``_lock``).
+
+        Un modelo mayor que el presupuesto completo se admite igualmente
+        tras vaciar el registro.
+        """
+        desalojados = []
+        while self._modelos and (
+            len(self._modelos) >= self.max_modelos
+            or self.memoria_usada_mb + memoria_necesaria_mb > self.presupuesto_mb
+        ):
+            clave, _ = self._modelos.popitem(last=False)
+            desalojados.append(clave)
+            self.estadisticas["desalojos"] += 1
+        return desalojados
+
+    @staticmethod
+    def _liberar_memoria() -> None:
+        """Devolver al sistema la memoria de los modelos desalojados."""
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    @property
+    def memoria_usada_mb(self) -> float:
+        """Memoria estimada de los modelos residentes."""
+        return sum(entrada.memoria_mb for entrada in self._modelos.values())
+
+    def esta_cargado(self, clave: Hashable) -> bool:
+        """Verificar si un modelo está residente (sin alterar el orden LRU)."""
+        with self._lock:
+            return clave in self._modelos
+
+    def desalojar(self, clave: Optional[Hashable] = None) -> int:
+        """
+        Desalojar un modelo concreto o todo el registro.
+
+        Returns:
+            Número de modelos desalojados
+        """
+        with self._lock:
+            if clave is None:
+                desalojados = len(self._modelos)
+                self._modelos.clear()
+            else:
+                desalojados = 1 if self._modelos.pop(clave, None) is not None else 0
+            self.estadisticas["desalojos"] += desalojados
+
+        if desalojados:
+            self._liberar_memoria()
+        return desalojados
+
+    def get_estadisticas(self) -> Dict[str, Any]:
+        """Estadísticas de carga, aciertos y modelos residentes."""
+        with self._lock:
+            estadisticas = self.estadisticas.copy()
+            consultas = estadisticas["hits"] + estadisticas["misses"]
+            estadisticas.update({
+                "hit_rate": round(estadisticas["hits"] / consultas, 3) if consultas else 0.0,
+                "presupuesto_mb": self.presupuesto_mb,
+                "max_modelos": self.max_modelos,
+                "memoria_usada_mb": self.memoria_usada_mb,
+                "modelos_residentes": [
+                    {
+                        "clave": str(clave),
+                        "memoria_mb": entrada.memoria_mb,
+                        "usos": entrada.usos,
+                        "tiempo_carga_sec": round(entrada.tiempo_carga_sec, 2),
+                        "inactivo_sec": round(time.time() - entrada.ultimo_uso, 1)
+                    }
+                    # De más a menos reciente
+                    for clave, entrada in reversed(self._modelos.items())
+                ]
+            })
+        return estadisticas
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Verificar estado del registro."""
+        estadisticas = self.get_estadisticas()
+        return {
+            "service": self.service_name,
+            "status": "healthy",
+            "estadisticas": estadisticas
+        }
+
+
+# Registro global de modelos Whisper (clave: tamaño, compute_type)
+whisper_model_registry = ModelRegistry(
+    "WhisperModelRegistry",
+    presupuesto_mb=settings.WHISPER_MODEL_POOL_BUDGET_MB,
+    max_modelos=settings.WHISPER_MODEL_POOL_MAX_MODELS
+)
@@ -6,19 +6,23 @@ Utiliza Tesseract con configuraciones optimizadas para contenido médico italian
 import asyncio
 import hashlib
 import logging
+import multiprocessing
 import os
+import re
 import tempfile
+import threading
 import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from io import BytesIO
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, Union
 from uuid import UUID, uuid4
 
 import cv2
 import numpy as np
 import pytesseract
 from PIL import Image, ImageEnhance, ImageFilter
-from pdf2image import convert_from_bytes
+from pdf2image import convert_from_path, pdfinfo_from_path
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
@@ -26,9 +30,156 @@ from app.core.database import get_db
 from app.models import ClassSession, OCRResult, MedicalTerminology
 from app.services.base import BaseService, ServiceNotAvailableError, ServiceConfigurationError
 from app.services.minio_service import MinioService
+from app.services.terminology_index_service import IndiceTerminologia, terminology_index_service
 
 logger = logging.getLogger(__name__)
 
+# Correcciones de palabras completas frecuentes en OCR médico italiano
+_OCR_WORD_CORRECTIONS = {
+    "cuora": "cuore",
+    "polmoni": "polmone",
+    "muscoli": "muscolo",
+    "ossa": "osso",
+    "malattio": "malattia",
+    "sindroma": "sindrome",
+    "terapio": "terapia",
+    "medicino": "medicina"
+}
+
+# Confusiones de caracteres típicas de OCR; solo se aplican dentro de una
+# palabra cuando el resultado es un término conocido
+_OCR_CHAR_CONFUSIONS = {"rn": "m", "cl": "d", "u'": "o", "i'": "l"}
+_OCR_CONFUSION_RE = re.compile("|".join(re.escape(k) for k in _OCR_CHAR_CONFUSIONS))
+
+# Palabra con apóstrofos internos o finales (p. ej. "dell'arteria", "pu'")
+_OCR_WORD_RE = re.compile(r"\w+(?:'\w*)*")
+
+# Callback de progreso por página: (páginas completadas, total de páginas)
+ProgresoPaginas = Callable[[int, int], None]
+
+# Trabajo de OCR de una página: función de módulo y sus argumentos
+TareaPagina = Tuple[Callable[..., Dict[str, Any]], Tuple[Any, ...]]
+
+
+def _enhance_image_sync(image: Image.Image) -> Image.Image:
+    """Contraste, nitidez y filtro de ruido previos al OCR."""
+    # Convertir a RGB si es necesario
+    if image.mode != 'RGB':
+        enhanced = image.convert('RGB')
+    else:
+        enhanced = image.copy()
+    
+    # Mejorar contraste
+    enhancer = ImageEnhance.Contrast(enhanced)
+    enhanced = enhancer.enhance(1.2)
+    
+    # Mejorar nitidez
+    enhancer = ImageEnhance.Sharpness(enhanced)
+    enhanced = enhancer.enhance(1.1)
+    
+    # Filtro para reducir ruido
+    enhanced = enhanced.filter(ImageFilter.MedianFilter(size=3))
+    
+    return enhanced
+
+
+def _ocr_image_sync(image: Image.Image, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Texto, confianza media y cajas de palabras de una imagen con Tesseract."""
+    tesseract_config = config.get("tesseract_config", "--oem 3 --psm 6")
+    languages = config.get("languages", "ita+eng")
+    
+    # Extraer texto
+    text = pytesseract.image_to_string(
+        image,
+        lang=languages,
+        config=tesseract_config
+    )
+    
+    # Obtener datos detallados con confianza
+    data = pytesseract.image_to_data(
+        image,
+        lang=languages,
+        config=tesseract_config,
+        output_type=pytesseract.Output.DICT
+    )
+    
+    # Calcular confianza promedio
+    confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
+    avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+    
+    # Extraer cajas de palabras
+    word_boxes = []
+    for i in range(len(data['text'])):
+        if int(data['conf'][i]) > config.get("confidence_threshold", 0.7) * 100:
+            word_boxes.append({
+                "text": data['text'][i],
+                "confidence": int(data['conf'][i]),
+                "bbox": [
+                    data['left'][i],
+                    data['top'][i],
+                    data['left'][i] + data['width'][i],
+                    data['top'][i] + data['height'][i]
+                ]
+            })
+    
+    return {
+        "text": text.strip(),
+        "confidence": avg_confidence / 100.0,  # Normalizar a 0-1
+        "word_boxes": word_boxes,
+        "raw_data": data,
+        "processing_time": 0  # Se calculará a nivel superior
+    }
+
+
+def _ocr_page_sync(page_num: int, image: Image.Image, config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Mejora y OCR de una página completa.
+    
+    Se ejecuta en el pool de páginas (proceso o thread), por lo que debe
+    ser una función de módulo serializable y sin estado del servicio.
+    """
+    start_time = time.time()
+    
+    # Pre-procesamiento de imagen si está habilitado
+    if config.get("enhance_image", True):
+        try:
+            image = _enhance_image_sync(image)
+        except Exception as e:
+            logger.warning(f"Error mejorando página {page_num}: {str(e)}")
+    
+    page_result = _ocr_image_sync(image, config)
+    
+    return {
+        "page": page_num,
+        "text": page_result["text"],
+        "confidence": page_result["confidence"],
+        "word_boxes": page_result.get("word_boxes", []),
+        "processing_time": time.time() - start_time
+    }
+
+
+def _ocr_pdf_page_sync(pdf_path: str, page_num: int, config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Rasterizar una sola página del PDF y procesarla.
+    
+    El bitmap vive solo dentro del worker mientras se hace el OCR, así que
+    la memoria pico depende de las páginas en vuelo y no del documento.
+    """
+    images = convert_from_path(pdf_path, dpi=config["dpi"], first_page=page_num, last_page=page_num)
+    if not images:
+        return {"page": page_num, "text": "", "confidence": 0.0, "word_boxes": [], "processing_time": 0}
+    
+    image = images.pop()
+    try:
+        return _ocr_page_sync(page_num, image, config)
+    finally:
+        image.close()
+
+
+def _init_ocr_page_worker() -> None:
+    """Limitar Tesseract a un thread por página: el paralelismo lo da el pool."""
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
 
 class ConfiguracionOCR:
     """Configuración para procesamiento OCR."""
@@ -93,11 +244,17 @@ class OCRService(BaseService):
     específico para terminología médica.
     """
     
+    # Pool de páginas compartido por todas las instancias del proceso
+    _page_pool: Optional[Executor] = None
+    _page_pool_workers = 0
+    _page_pool_lock = threading.Lock()
+    
     def __init__(self):
         super().__init__("ocr_service")
         self.settings = get_settings()
         self.minio_service: Optional[MinioService] = None
         self.medical_terms_cache: Dict[str, Any] = {}
+        self.fallback_terms_index: Optional[IndiceTerminologia] = None
         self.is_initialized = False
         
         # Configuraciones Tesseract para diferentes tipos de contenido
@@ -191,10 +348,27 @@ class OCRService(BaseService):
             )
     
     async def _load_medical_terms_cache(self) -> None:
-        """Cargar cache de terminología médica para validación."""
+        """
+        Cargar terminología médica para validación desde el índice compartido.
+        
+        Si la tabla de terminología está vacía o no es accesible se usa un
+        cache básico integrado.
+        """
+        try:
+            indice = await terminology_index_service.obtener_indice()
+            if indice.terminos:
+                terms_by_category: Dict[str, set] = {}
+                for info in indice.terminos.values():
+                    terms_by_category.setdefault(info["categoria"], set()).add(info["original"])
+                self.medical_terms_cache = {
+                    category: sorted(terms) for category, terms in terms_by_category.items()
+                }
+                logger.info(f"Terminología médica cargada desde índice compartido (versión {indice.version})")
+                return
+        except Exception as e:
+            logger.warning(f"Índice de terminología no disponible, usando cache básico: {str(e)}")
+        
         try:
-            # En el futuro, cargar desde base de datos
-            # Por ahora, cache básico
             self.medical_terms_cache = {
                 "anatomia_terms": [
                     "cuore", "polmone", "fegato", "rene", "stomaco",
@@ -210,12 +384,41 @@ class OCRService(BaseService):
                 ]
             }
             
+            self.fallback_terms_index = self._build_terms_index(self.medical_terms_cache)
+            
             logger.info("Cache terminología médica cargado")
             
         except Exception as e:
             logger.warning(f"Error cargando cache terminología médica: {str(e)}")
             self.medical_terms_cache = {}
     
+    @staticmethod
+    def _build_terms_index(terms_by_category: Dict[str, List[str]]) -> IndiceTerminologia:
+        """Índice local sobre el cache básico, con la misma búsqueda que el compartido."""
+        terminos = {
+            term.lower(): {"term_id": term, "original": term, "categoria": category}
+            for category, terms in terms_by_category.items()
+            for term in terms
+        }
+        return IndiceTerminologia(terminos, {}, (len(terminos), None))
+    
+    async def _terms_index(self) -> Optional[IndiceTerminologia]:
+        """
+        Índice compartido vigente o, si no tiene términos, el del cache básico.
+        
+        Se pide en cada llamada (barato mientras la versión está fresca) para
+        que las ediciones de terminología lleguen también a workers de
+        larga vida.
+        """
+        try:
+            indice = await terminology_index_service.obtener_indice()
+        except Exception as e:
+            logger.warning(f"Índice de terminología no disponible: {e}")
+            indice = terminology_index_service.indice_actual()
+        if indice is not None and indice.terminos:
+            return indice
+        return self.fallback_terms_index
+    
     async def health_check(self) -> Dict[str, Any]:
         """Verificar salud del servicio OCR."""
         try:
@@ -248,7 +451,8 @@ class OCRService(BaseService):
         self,
         file_key: str,
         class_session_id: UUID,
-        config: Optional[ConfiguracionOCR] = None
+        config: Optional[ConfiguracionOCR] = None,
+        progress_callback: Optional[ProgresoPaginas] = None
     ) -> OCRResult:
         """
         Procesa un documento completo con OCR.
@@ -257,6 +461,8 @@ class OCRService(BaseService):
             file_key: Clave del archivo en MinIO
             class_session_id: ID de la sesión de clase
             config: Configuración OCR opcional
+            progress_callback: Llamado tras cada página de un PDF con
+                (páginas completadas, total de páginas)
             
         Returns:
             OCRResult con el texto extraído y metadatos
@@ -265,14 +471,15 @@ class OCRService(BaseService):
             await self._setup()
         
         start_time = time.time()
+        file_path = None
         
         try:
             # 1. Obtener archivo desde MinIO
             logger.info(f"Obteniendo archivo {file_key} desde MinIO")
-            file_data = await self._get_file_from_minio(file_key)
+            file_path = await self._get_file_from_minio(file_key)
             
             # 2. Detectar tipo de contenido
-            content_type = await self._detect_content_type(file_data, file_key)
+            content_type = await self._detect_content_type(file_path, file_key)
             logger.info(f"Tipo de contenido detectado: {content_type.tipo}")
             
             # 3. Preparar configuración OCR
@@ -281,9 +488,9 @@ class OCRService(BaseService):
             
             # 4. Ejecutar OCR según tipo de archivo
             if file_key.lower().endswith('.pdf'):
-                ocr_data = await self._process_pdf(file_data, ocr_config)
+                ocr_data = await self._process_pdf(file_path, ocr_config, progress_callback)
             elif any(file_key.lower().endswith(ext) for ext in ['.png', '.jpg', '.jpeg', '.tiff', '.bmp']):
-                ocr_data = await self._process_image(file_data, ocr_config)
+                ocr_data = await self._process_image(file_path, ocr_config)
             else:
                 raise ValueError(f"Formato de archivo no soportado: {file_key}")
             
@@ -306,19 +513,34 @@ class OCRService(BaseService):
         except Exception as e:
             logger.error(f"Error procesando OCR para {file_key}: {str(e)}")
             raise
+        finally:
+            if file_path:
+                os.unlink(file_path)
     
-    async def _get_file_from_minio(self, file_key: str) -> bytes:
-        """Obtiene archivo desde MinIO."""
+    async def _get_file_from_minio(self, file_key: str) -> str:
+        """
+        Descarga el archivo desde MinIO a un archivo temporal local.
+        
+        La descarga va por partes a disco, sin cargar el documento en
+        memoria; los workers de páginas leen el PDF de esta ruta.
+        
+        Returns:
+            Ruta del archivo temporal (la elimina ``process_document``)
+        """
+        suffix = os.path.splitext(file_key)[1]
+        fd, file_path = tempfile.mkstemp(prefix="axonote_ocr_", suffix=suffix)
+        os.close(fd)
         try:
-            file_data = await self.minio_service.get_file(file_key)
-            return file_data
+            await self.minio_service.download_to_file(file_key, file_path)
+            return file_path
         except Exception as e:
+            os.unlink(file_path)
             raise ServiceNotAvailableError(
                 "MinIO",
                 f"Error obteniendo archivo {file_key}: {str(e)}"
             )
     
-    async def _detect_content_type(self, file_data: bytes, filename: str) -> TipoContenidoDetectado:
+    async def _detect_content_type(self, file_path: str, filename: str) -> TipoContenidoDetectado:
         """Detecta el tipo de contenido del documento."""
         
         # Análisis básico por extensión
@@ -330,7 +552,7 @@ class OCRService(BaseService):
                 # Convertir primera página para análisis
                 images = await asyncio.get_event_loop().run_in_executor(
                     None,
-                    lambda: convert_from_bytes(file_data, first_page=1, last_page=1, dpi=150)
+                    lambda: convert_from_path(file_path, first_page=1, last_page=1, dpi=150)
                 )
                 
                 if images:
@@ -450,51 +672,58 @@ class OCRService(BaseService):
         
         return config
     
-    async def _process_pdf(self, file_data: bytes, config: Dict[str, Any]) -> ResultadoOCR:
-        """Procesa PDF con OCR."""
+    async def _process_pdf(
+        self,
+        pdf_path: str,
+        config: Dict[str, Any],
+        progress_callback: Optional[ProgresoPaginas] = None
+    ) -> ResultadoOCR:
+        """
+        Procesa PDF con OCR, página a página en el pool de páginas.
+        
+        En modo streaming (OCR_PDF_STREAMING) cada worker rasteriza solo su
+        página desde ``pdf_path``; si no, se convierten todas las páginas a
+        imágenes antes de empezar.
+        """
         try:
             start_time = time.time()
-            
-            # Convertir PDF a imágenes
-            logger.info("Convirtiendo PDF a imágenes...")
             loop = asyncio.get_event_loop()
             
-            images = await loop.run_in_executor(
-                None,
-                lambda: convert_from_bytes(
-                    file_data,
-                    dpi=config["dpi"],
-                    thread_count=2
+            if self.settings.OCR_PDF_STREAMING:
+                info = await loop.run_in_executor(None, pdfinfo_from_path, pdf_path)
+                total_pages = int(info["Pages"])
+                page_tasks: Iterable[TareaPagina] = (
+                    (_ocr_pdf_page_sync, (pdf_path, page_num, config))
+                    for page_num in range(1, total_pages + 1)
                 )
-            )
-            
-            logger.info(f"PDF convertido a {len(images)} imágenes")
+                logger.info(f"PDF de {total_pages} páginas, rasterizado por página")
+            else:
+                # Convertir PDF a imágenes
+                logger.info("Convirtiendo PDF a imágenes...")
+                images = await loop.run_in_executor(
+                    None,
+                    lambda: convert_from_path(
+                        pdf_path,
+                        dpi=config["dpi"],
+                        thread_count=2
+                    )
+                )
+                total_pages = len(images)
+                page_tasks = (
+                    (_ocr_page_sync, (page_num, image, config))
+                    for page_num, image in enumerate(images, start=1)
+                )
+                logger.info(f"PDF convertido a {total_pages} imágenes")
             
-            # Procesar cada página
+            # Procesar páginas en paralelo, recibiendo resultados en orden
             all_text = []
             all_confidence = []
             pages_data = []
             
-            for page_num, image in enumerate(images):
-                logger.info(f"Procesando página {page_num + 1}/{len(images)}")
-                
-                # Pre-procesamiento de imagen si está habilitado
-                if config.get("enhance_image", True):
-                    image = await self._enhance_image(image, config)
-                
-                # OCR de la página
-                page_result = await self._ocr_image(image, config)
-                
-                pages_data.append({
-                    "page": page_num + 1,
-                    "text": page_result["text"],
-                    "confidence": page_result["confidence"],
-                    "word_boxes": page_result.get("word_boxes", []),
-                    "processing_time": page_result.get("processing_time", 0)
-                })
-                
-                all_text.append(page_result["text"])
-                all_confidence.append(page_result["confidence"])
+            async for page_data in self._ocr_pages_in_order(page_tasks, total_pages, progress_callback):
+                pages_data.append(page_data)
+                all_text.append(page_data["text"])
+                all_confidence.append(page_data["confidence"])
             
             # Combinar resultados
             full_text = "\n\n".join(filter(None, all_text))
@@ -505,7 +734,7 @@ class OCRService(BaseService):
                 confidence_promedio=avg_confidence,
                 datos_por_pagina=pages_data,
                 metadatos={
-                    "total_pages": len(images),
+                    "total_pages": total_pages,
                     "processing_config": config,
                     "file_type": "pdf"
                 },
@@ -516,13 +745,90 @@ class OCRService(BaseService):
             logger.error(f"Error procesando PDF: {str(e)}")
             raise
     
-    async def _process_image(self, file_data: bytes, config: Dict[str, Any]) -> ResultadoOCR:
+    @classmethod
+    def _get_page_pool(cls) -> Tuple[Optional[Executor], int]:
+        """
+        Obtener el pool de páginas y su número de workers.
+        
+        Con OCR_PAGE_PARALLEL desactivado devuelve (None, 1): el executor por
+        defecto del loop y una página cada vez. Un proceso daemon no puede
+        crear hijos; en ese caso se usa un pool de threads, que también
+        paraleliza porque Tesseract corre como proceso externo.
+        """
+        settings = get_settings()
+        if not settings.OCR_PAGE_PARALLEL:
+            return None, 1
+        
+        with cls._page_pool_lock:
+            if cls._page_pool is None:
+                workers = settings.OCR_PAGE_WORKERS or os.cpu_count() or 1
+                if multiprocessing.current_process().daemon:
+                    cls._page_pool = ThreadPoolExecutor(
+                        max_workers=workers,
+                        thread_name_prefix="axonote-ocr-page",
+                        initializer=_init_ocr_page_worker
+                    )
+                else:
+                    cls._page_pool = ProcessPoolExecutor(
+                        max_workers=workers,
+                        initializer=_init_ocr_page_worker
+                    )
+                cls._page_pool_workers = workers
+                logger.info(f"Pool de páginas OCR creado: {type(cls._page_pool).__name__} con {workers} workers")
+            return cls._page_pool, cls._page_pool_workers
+    
+    async def _ocr_pages_in_order(
+        self,
+        page_tasks: Iterable[TareaPagina],
+        total_pages: int,
+        progress_callback: Optional[ProgresoPaginas] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Ejecutar las tareas de página en el pool, entregadas en orden de página.
+        
+        Como mucho hay 2 x workers páginas en vuelo: se espera siempre la más
+        antigua antes de enviar otra, de modo que los resultados salen en
+        orden, el pool nunca se queda sin trabajo y las tareas (que pueden
+        producir bitmaps) se consumen solo a medida que hay hueco.
+        """
+        loop = asyncio.get_event_loop()
+        pool, workers = self._get_page_pool()
+        window = workers * 2 if pool is not None else 1
+        pending: deque = deque()
+        completed = 0
+        
+        try:
+            for function, args in page_tasks:
+                pending.append(loop.run_in_executor(pool, function, *args))
+                if len(pending) < window:
+                    continue
+                
+                page_data = await pending.popleft()
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed, total_pages)
+                logger.info(f"Página {page_data['page']}/{total_pages} procesada")
+                yield page_data
+            
+            while pending:
+                page_data = await pending.popleft()
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed, total_pages)
+                logger.info(f"Página {page_data['page']}/{total_pages} procesada")
+                yield page_data
+        finally:
+            # Error o consumidor abandonado: no dejar páginas en cola del pool
+            for future in pending:
+                future.cancel()
+    
+    async def _process_image(self, file_path: str, config: Dict[str, Any]) -> ResultadoOCR:
         """Procesa imagen individual con OCR."""
         try:
             start_time = time.time()
             
             # Cargar imagen
-            image = Image.open(BytesIO(file_data))
+            image = Image.open(file_path)
             logger.info(f"Imagen cargada: {image.size}, modo: {image.mode}")
             
             # Pre-procesamiento si está habilitado
@@ -553,28 +859,7 @@ class OCRService(BaseService):
         """Pre-procesamiento de imagen para mejorar OCR."""
         try:
             loop = asyncio.get_event_loop()
-            
-            def enhance_sync():
-                # Convertir a RGB si es necesario
-                if image.mode != 'RGB':
-                    enhanced = image.convert('RGB')
-                else:
-                    enhanced = image.copy()
-                
-                # Mejorar contraste
-                enhancer = ImageEnhance.Contrast(enhanced)
-                enhanced = enhancer.enhance(1.2)
-                
-                # Mejorar nitidez
-                enhancer = ImageEnhance.Sharpness(enhanced)
-                enhanced = enhancer.enhance(1.1)
-                
-                # Filtro para reducir ruido
-                enhanced = enhanced.filter(ImageFilter.MedianFilter(size=3))
-                
-                return enhanced
-            
-            enhanced_image = await loop.run_in_executor(None, enhance_sync)
+            enhanced_image = await loop.run_in_executor(None, _enhance_image_sync, image)
             return enhanced_image
             
         except Exception as e:
@@ -585,57 +870,7 @@ class OCRService(BaseService):
         """Ejecuta OCR en una imagen individual."""
         try:
             loop = asyncio.get_event_loop()
-            
-            # Configuración Tesseract
-            tesseract_config = config.get("tesseract_config", "--oem 3 --psm 6")
-            languages = config.get("languages", "ita+eng")
-            
-            def ocr_sync():
-                # Extraer texto
-                text = pytesseract.image_to_string(
-                    image,
-                    lang=languages,
-                    config=tesseract_config
-                )
-                
-                # Obtener datos detallados con confianza
-                data = pytesseract.image_to_data(
-                    image,
-                    lang=languages,
-                    config=tesseract_config,
-                    output_type=pytesseract.Output.DICT
-                )
-                
-                return text, data
-            
-            text, data = await loop.run_in_executor(None, ocr_sync)
-            
-            # Calcular confianza promedio
-            confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-            
-            # Extraer cajas de palabras
-            word_boxes = []
-            for i in range(len(data['text'])):
-                if int(data['conf'][i]) > config.get("confidence_threshold", 0.7) * 100:
-                    word_boxes.append({
-                        "text": data['text'][i],
-                        "confidence": int(data['conf'][i]),
-                        "bbox": [
-                            data['left'][i],
-                            data['top'][i],
-                            data['left'][i] + data['width'][i],
-                            data['top'][i] + data['height'][i]
-                        ]
-                    })
-            
-            return {
-                "text": text.strip(),
-                "confidence": avg_confidence / 100.0,  # Normalizar a 0-1
-                "word_boxes": word_boxes,
-                "raw_data": data,
-                "processing_time": 0  # Se calculará a nivel superior
-            }
+            return await loop.run_in_executor(None, _ocr_image_sync, image, config)
             
         except Exception as e:
             logger.error(f"Error ejecutando OCR: {str(e)}")
@@ -692,48 +927,63 @@ class OCRService(BaseService):
             }
     
     async def _correct_medical_terms(self, text: str) -> str:
-        """Corrige términos médicos usando el cache de terminología."""
-        corrected = text
-        
-        # Correcciones básicas comunes en OCR médico
-        medical_corrections = {
-            # Correcciones específicas para texto médico italiano
-            "cuora": "cuore",
-            "polmoni": "polmone",
-            "muscoli": "muscolo",
-            "ossa": "osso",
-            "malattio": "malattia",
-            "sindroma": "sindrome",
-            "terapio": "terapia",
-            "medicino": "medicina",
-            # Correcciones comunes OCR
-            "rn": "m",
-            "cl": "d",
-            "u'": "o",
-            "i'": "l"
-        }
+        """
+        Corrige términos médicos palabra a palabra en una sola pasada.
+        
+        Las correcciones de palabras completas se aplican siempre; las
+        confusiones de caracteres ("rn"→"m", "cl"→"d"...) solo cuando la
+        palabra no es un término conocido y la corregida sí lo es, para no
+        alterar palabras válidas como "interno" o "clinico".
+        """
+        indice = await self._terms_index()
+        known_terms = indice.terminos if indice is not None else {}
         
-        for wrong, correct in medical_corrections.items():
-            corrected = corrected.replace(wrong, correct)
+        def correct_word(match: "re.Match[str]") -> str:
+            word = match.group(0)
+            word_lower = word.lower()
+            
+            corrected = _OCR_WORD_CORRECTIONS.get(word_lower)
+            if corrected is None:
+                if word_lower in known_terms:
+                    return word
+                candidate = _OCR_CONFUSION_RE.sub(lambda m: _OCR_CHAR_CONFUSIONS[m.group(0)], word_lower)
+                if candidate == word_lower or candidate not in known_terms:
+                    return word
+                corrected = candidate
+            
+            # Conservar mayúsculas de la palabra original
+            if word.isupper() and len(word) > 1:
+                return corrected.upper()
+            if word[0].isupper():
+                return corrected[0].upper() + corrected[1:]
+            return corrected
         
-        return corrected
+        return _OCR_WORD_RE.sub(correct_word, text)
     
     async def _detect_medical_terminology(self, text: str) -> List[Dict[str, Any]]:
-        """Detecta terminología médica en el texto."""
-        medical_terms = []
-        text_lower = text.lower()
+        """
+        Detecta terminología médica en el texto.
+        
+        Una sola pasada del autómata sobre el texto devuelve todas las
+        apariciones como palabras completas; se agrupan por término en
+        orden de primera aparición.
+        """
+        indice = await self._terms_index()
+        if indice is None:
+            return []
+        
+        medical_terms: Dict[str, Dict[str, Any]] = {}
+        for start, _, _, info in indice.buscar(text):
+            entry = medical_terms.get(info["original"])
+            if entry is None:
+                entry = medical_terms[info["original"]] = {
+                    "term": info["original"],
+                    "category": info["categoria"],
+                    "positions": []
+                }
+            entry["positions"].append(start)
         
-        # Buscar términos en cache
-        for category, terms in self.medical_terms_cache.items():
-            for term in terms:
-                if term.lower() in text_lower:
-                    medical_terms.append({
-                        "term": term,
-                        "category": category,
-                        "positions": [i for i in range(len(text_lower)) if text_lower.startswith(term.lower(), i)]
-                    })
-        
-        return medical_terms
+        return list(medical_terms.values())
     
     async def _calculate_text_quality(self, text: str, confidence: float) -> Dict[str, Any]:
         """Calcula métricas de calidad del texto extraído."""
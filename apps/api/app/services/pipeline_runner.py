@@ -0,0 +1,199 @@
+"""
+Ejecutor de pipelines en forma de DAG para ProcessingJob.
+Lanza en paralelo las etapas cuyas dependencias ya están resueltas
+y registra los tiempos de cada etapa.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from app.core import api_logger
+
+
+class EtapaPipeline:
+    """
+    Etapa individual del pipeline.
+
+    La función recibe un diccionario con los resultados de las etapas
+    ya completadas (indexado por nombre) y devuelve el resultado propio.
+    """
+
+    def __init__(
+        self,
+        nombre: str,
+        funcion: Callable[[Dict[str, Any]], Awaitable[Any]],
+        depende_de: Iterable[str] = ()
+    ):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.depende_de = tuple(depende_de)
+
+
+class PipelineRunner:
+    """
+    Ejecuta un conjunto de etapas respetando sus dependencias.
+
+    Las etapas independientes (p.ej. ASR y diarización sobre el audio
+    normalizado) corren de forma concurrente; una etapa con dependencias
+    espera a que todas terminen (join) antes de iniciarse.
+
+    ``on_etapa_completada(nombre, tiempos, resultado)`` se invoca tras cada
+    etapa, lo que permite persistir checkpoints para reanudar el pipeline.
+    """
+
+    def __init__(
+        self,
+        etapas: List[EtapaPipeline],
+        on_etapa_completada: Optional[Callable[[str, Dict[str, float], Any], Awaitable[None]]] = None
+    ):
+        self.etapas = {etapa.nombre: etapa for etapa in etapas}
+        self.on_etapa_completada = on_etapa_completada
+        self.resultados: Dict[str, Any] = {}
+        self.tiempos: Dict[str, Dict[str, float]] = {}
+        self._validar()
+
+    def _validar(self) -> None:
+        """Verificar que las dependencias existen y que no hay ciclos."""
+        for etapa in self.etapas.values():
+            for dependencia in etapa.depende_de:
+                if dependencia not in self.etapas:
+                    raise ValueError(
+                        f"Etapa '{etapa.nombre}' depende de etapa desconocida '{dependencia}'"
+                    )
+
+        visitadas: Dict[str, int] = {}  # 1 = en curso, 2 = terminada
+
+        def visitar(nombre: str) -> None:
+            estado = visitadas.get(nombre)
+            if estado == 2:
+                return
+            if estado == 1:
+                raise ValueError(f"Ciclo detectado en el pipeline en etapa '{nombre}'")
+            visitadas[nombre] = 1
+            for dependencia in self.etapas[nombre].depende_de:
+                visitar(dependencia)
+            visitadas[nombre] = 2
+
+        for nombre in self.etapas:
+            visitar(nombre)
+
+    async def ejecutar(self, resultados_previos: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Ejecutar el pipeline completo.
+
+        Args:
+            resultados_previos: Resultados de etapas ya completadas que no
+                deben re-ejecutarse
+
+        Returns:
+            Diccionario con el resultado de cada etapa
+        """
+        self.resultados = dict(resultados_previos or {})
+        pendientes = {
+            nombre: etapa for nombre, etapa in self.etapas.items()
+            if nombre not in self.resultados and not self._consumida(nombre)
+        }
+        en_curso: Dict[asyncio.Task, str] = {}
+        inicio_pipeline = time.time()
+
+        try:
+            while pendientes or en_curso:
+                # Lanzar todas las etapas cuyas dependencias están resueltas
+                listas = [
+                    nombre for nombre, etapa in pendientes.items()
+                    if all(dep in self.resultados for dep in etapa.depende_de)
+                ]
+                for nombre in listas:
+                    etapa = pendientes.pop(nombre)
+                    self.tiempos[nombre] = {"inicio_offset_sec": time.time() - inicio_pipeline}
+                    tarea = asyncio.create_task(self._ejecutar_etapa(etapa))
+                    en_curso[tarea] = nombre
+
+                if not en_curso:
+                    raise RuntimeError(
+                        f"Etapas sin dependencias resolubles: {sorted(pendientes)}"
+                    )
+
+                completadas, _ = await asyncio.wait(
+                    en_curso.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                # Registrar primero todas las etapas exitosas de esta tanda: si
+                # una hermana falló a la vez, su checkpoint no debe perderse
+                fallidas = []
+                for tarea in completadas:
+                    nombre = en_curso.pop(tarea)
+                    if tarea.cancelled() or tarea.exception() is not None:
+                        fallidas.append(tarea)
+                        continue
+                    self.resultados[nombre] = tarea.result()
+
+                    if self.on_etapa_completada:
+                        await self.on_etapa_completada(
+                            nombre, self.tiempos[nombre], self.resultados[nombre]
+                        )
+
+                if fallidas:
+                    # Propaga la excepción de la primera etapa fallida
+                    fallidas[0].result()
+
+        except BaseException:
+            for tarea in en_curso:
+                tarea.cancel()
+            if en_curso:
+                await asyncio.gather(*en_curso, return_exceptions=True)
+            raise
+
+        return self.resultados
+
+    def _consumida(self, nombre: str) -> bool:
+        """
+        Una etapa intermedia cuyo resultado ya no necesita nadie.
+
+        Al reanudar, si todas las etapas que dependen de ella ya tienen
+        resultado, no hace falta re-ejecutarla.
+        """
+        dependientes = [
+            etapa.nombre for etapa in self.etapas.values() if nombre in etapa.depende_de
+        ]
+        return bool(dependientes) and all(d in self.resultados for d in dependientes)
+
+    async def _ejecutar_etapa(self, etapa: EtapaPipeline) -> Any:
+        """Ejecutar una etapa midiendo su duración."""
+        inicio = time.time()
+        api_logger.info("Iniciando etapa de pipeline", etapa=etapa.nombre)
+        try:
+            return await etapa.funcion(self.resultados)
+        finally:
+            duracion = time.time() - inicio
+            self.tiempos[etapa.nombre]["duracion_sec"] = duracion
+            api_logger.info(
+                "Etapa de pipeline finalizada",
+                etapa=etapa.nombre,
+                duracion_sec=round(duracion, 3)
+            )
+
+    def get_metricas_tiempos(self, tiempo_total_sec: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Resumen de tiempos por etapa para ``ProcessingJob.metricas_calidad``.
+
+        Args:
+            tiempo_total_sec: Tiempo de pared del pipeline completo
+
+        Returns:
+            Diccionario con duraciones por etapa y ahorro por paralelismo
+        """
+        duraciones = {
+            nombre: round(tiempos.get("duracion_sec", 0.0), 3)
+            for nombre, tiempos in self.tiempos.items()
+        }
+        metricas: Dict[str, Any] = {
+            "tiempos_etapas_sec": duraciones,
+            "tiempo_secuencial_estimado_sec": round(sum(duraciones.values()), 3)
+        }
+        if tiempo_total_sec is not None:
+            metricas["tiempo_pared_sec"] = round(tiempo_total_sec, 3)
+            metricas["ahorro_paralelismo_sec"] = round(
+                max(0.0, metricas["tiempo_secuencial_estimado_sec"] - tiempo_total_sec), 3
+            )
+        return metricas
@@ -3,17 +3,93 @@ Servicio de post-procesamiento de transcripciones médicas.
 Incluye corrección ASR, NER médico y análisis de estructura pedagógica.
 """
 
+import bisect
 import re
 import time
 from typing import Any, Dict, List, Optional, Tuple
-from collections import defaultdict
 
 import ahocorasick
-from sqlalchemy.orm import Session
+import numpy as np
 
-from app.core.database import get_db
-from app.models.medical_terminology import MedicalTerminology
 from app.services.base import BaseService
+from app.services.terminology_index_service import IndiceTerminologia, terminology_index_service
+
+
+# Patrones para identificar tipos de actividad pedagógica
+_ACTIVITY_PATTERNS: Dict[str, List[str]] = {
+    "introduccion": [
+        "bienvenidos", "oggi", "argomento", "iniziamo", "parleremo", 
+        "studieremo", "vedremo", "obiettivo"
+    ],
+    "explicacion": [
+        "quindi", "per esempio", "importante", "ricordate", "come sapete",
+        "infatti", "inoltre", "dunque", "cioè"
+    ],
+    "pregunta": [
+        "domanda", "chi sa", "qualcuno", "cosa pensate", "secondo voi",
+        "come", "perché", "quando", "dove", "?"
+    ],
+    "respuesta": [
+        "esatto", "corretto", "bene", "perfetto", "giusto", "bravo",
+        "no", "sbagliato", "attenzione"
+    ],
+    "interaccion": [
+        "studente", "professore", "dottore", "scusi", "prego",
+        "grazie", "capisce", "chiaro"
+    ],
+    "resumen": [
+        "riassumendo", "concludendo", "importante ricordare", 
+        "in sintesi", "quindi"
+    ],
+    "cierre": [
+        "fine", "prossima volta", "arrivederci", "grazie", "finito",
+        "basta", "stop"
+    ]
+}
+
+# Patrones que indican momentos importantes de aprendizaje
+_IMPORTANT_PATTERNS = [
+    "importante", "fondamentale", "ricordate", "attenzione",
+    "chiave", "essenziale", "cruciale", "significativo"
+]
+_QUESTION_PATTERNS = ["?", "domanda", "perché", "come", "cosa"]
+
+_ACTIVITY_NAMES = list(_ACTIVITY_PATTERNS)
+_INTERACTIVE_ACTIVITY_CODES = [
+    _ACTIVITY_NAMES.index(activity) for activity in ("pregunta", "respuesta", "interaccion")
+]
+
+# Vocabulario único de palabras clave (columnas de la matriz de aciertos)
+_STRUCTURE_KEYWORDS = list(dict.fromkeys(
+    [p for patterns in _ACTIVITY_PATTERNS.values() for p in patterns]
+    + _IMPORTANT_PATTERNS + _QUESTION_PATTERNS
+))
+_KEYWORD_INDEX = {keyword: i for i, keyword in enumerate(_STRUCTURE_KEYWORDS)}
+
+# Pertenencia palabra clave x actividad y tamaño de cada lista de patrones
+_ACTIVITY_MEMBERSHIP = np.zeros((len(_STRUCTURE_KEYWORDS), len(_ACTIVITY_NAMES)), dtype=np.int64)
+for _code, _patterns in enumerate(_ACTIVITY_PATTERNS.values()):
+    _ACTIVITY_MEMBERSHIP[[_KEYWORD_INDEX[p] for p in _patterns], _code] = 1
+_ACTIVITY_SIZES = np.array([len(p) for p in _ACTIVITY_PATTERNS.values()], dtype=np.float64)
+
+_IMPORTANCE_WEIGHTS = np.zeros(len(_STRUCTURE_KEYWORDS), dtype=np.int64)
+np.add.at(_IMPORTANCE_WEIGHTS, [_KEYWORD_INDEX[p] for p in _IMPORTANT_PATTERNS], 2)
+np.add.at(_IMPORTANCE_WEIGHTS, [_KEYWORD_INDEX[p] for p in _QUESTION_PATTERNS], 1)
+
+# Ningún patrón contiene el separador, así que no hay aciertos entre segmentos
+_SEGMENT_SEPARATOR = "\x00"
+
+
+def _build_structure_automaton() -> ahocorasick.Automaton:
+    """Autómata de subcadenas con el índice de columna de cada palabra clave."""
+    automaton = ahocorasick.Automaton()
+    for index, keyword in enumerate(_STRUCTURE_KEYWORDS):
+        automaton.add_word(keyword, index)
+    automaton.make_automaton()
+    return automaton
+
+
+_STRUCTURE_AUTOMATON = _build_structure_automaton()
 
 
 class PostProcessingService(BaseService):
@@ -26,72 +102,29 @@ class PostProcessingService(BaseService):
     
     def __init__(self):
         super().__init__()
-        self.medical_dict: Dict[str, Dict] = {}
-        self.aho_corasick: Optional[ahocorasick.Automaton] = None
         self.correction_patterns: List[Tuple[str, str]] = []
+        self._compiled_patterns: List[Tuple[re.Pattern, str]] = []
         self.is_initialized = False
         
     async def _setup(self) -> None:
-        """Configurar diccionario médico y algoritmos de búsqueda."""
-        await self._load_medical_dictionary()
-        await self._setup_aho_corasick()
+        """Configurar patrones de corrección."""
         await self._setup_correction_patterns()
         self.is_initialized = True
         
-    async def _load_medical_dictionary(self) -> None:
-        """Cargar diccionario médico desde base de datos."""
-        try:
-            db: Session = next(get_db())
-            
-            # Cargar términos médicos activos
-            terms = db.query(MedicalTerminology).filter(
-                MedicalTerminology.activo == True
-            ).all()
-            
-            self.medical_dict = {}
-            for term in terms:
-                # Término principal
-                self.medical_dict[term.termino_normalizado.lower()] = {
-                    "original": term.termino_original,
-                    "categoria": term.categoria,
-                    "definicion_italiana": term.definicion_italiana,
-                    "definicion_espanola": term.definicion_espanola,
-                    "especialidad": term.especialidad_medica,
-                    "sinonimos": term.sinonimos,
-                    "variantes_asr": term.variantes_asr,
-                    "confianza": term.confianza_correccion
-                }
-                
-                # Agregar sinónimos
-                for sinonimo in term.sinonimos:
-                    if sinonimo:
-                        self.medical_dict[sinonimo.lower()] = self.medical_dict[term.termino_normalizado.lower()]
-                
-                # Agregar variantes ASR
-                for variante in term.variantes_asr:
-                    if variante:
-                        self.medical_dict[variante.lower()] = self.medical_dict[term.termino_normalizado.lower()]
-            
-            self.logger.info(f"Diccionario médico cargado: {len(self.medical_dict)} términos")
-            
-        except Exception as e:
-            self.logger.error(f"Error cargando diccionario médico: {e}")
-            self.medical_dict = {}
-    
-    async def _setup_aho_corasick(self) -> None:
-        """Configurar algoritmo Aho-Corasick para búsqueda rápida."""
+    async def _terms_index(self) -> Optional[IndiceTerminologia]:
+        """
+        Índice de terminología compartido vigente.
+        
+        Se pide en cada llamada (es barato mientras la versión está fresca)
+        para que las ediciones de terminología lleguen a workers de larga
+        vida. Devuelve None si el índice no está disponible o está vacío.
+        """
         try:
-            self.aho_corasick = ahocorasick.Automaton()
-            
-            for i, term in enumerate(self.medical_dict.keys()):
-                self.aho_corasick.add_word(term, (i, term))
-            
-            self.aho_corasick.make_automaton()
-            self.logger.info("Algoritmo Aho-Corasick configurado")
-            
+            indice = await terminology_index_service.obtener_indice()
         except Exception as e:
-            self.logger.error(f"Error configurando Aho-Corasick: {e}")
-            self.aho_corasick = None
+            self.logger.error(f"Error obteniendo índice de terminología: {e}")
+            return None
+        return indice if indice.terminos else None
     
     async def _setup_correction_patterns(self) -> None:
         """Configurar patrones de corrección comunes para ASR italiano."""
@@ -117,6 +150,10 @@ class PostProcessingService(BaseService):
             (r'\bmicro grammi\b', 'microgrammi'),
             (r'\bchilo grammi\b', 'chilogrammi'),
         ]
+        self._compiled_patterns = [
+            (re.compile(pattern, re.IGNORECASE), replacement)
+            for pattern, replacement in self.correction_patterns
+        ]
     
     async def correct_asr_errors(
         self,
@@ -126,6 +163,13 @@ class PostProcessingService(BaseService):
         """
         Corregir errores comunes de ASR en terminología médica italiana.
         
+        Todas las correcciones candidatas (patrones y diccionario) se buscan
+        sobre el texto original; los solapes se resuelven por prioridad
+        (diccionario médico sobre patrones) y después por la coincidencia más
+        larga, y el texto corregido se construye con un único join.
+        Cada corrección conserva su posición en el texto original y en el
+        corregido, de modo que los timestamps por palabra siguen alineados.
+        
         Args:
             transcription: Texto de la transcripción original
             confidence_threshold: Umbral de confianza para aplicar correcciones
@@ -137,66 +181,18 @@ class PostProcessingService(BaseService):
             await self._setup()
         
         start_time = time.time()
-        corrected_text = transcription
-        corrections = []
         
         try:
-            # 1. Aplicar patrones de corrección generales
-            for pattern, replacement in self.correction_patterns:
-                matches = list(re.finditer(pattern, corrected_text, re.IGNORECASE))
-                for match in reversed(matches):  # Reverse para mantener posiciones
-                    original = match.group()
-                    corrected = re.sub(pattern, replacement, original, flags=re.IGNORECASE)
-                    
-                    if original.lower() != corrected.lower():
-                        corrected_text = (
-                            corrected_text[:match.start()] + 
-                            corrected + 
-                            corrected_text[match.end():]
-                        )
-                        corrections.append({
-                            "type": "pattern",
-                            "original": original,
-                            "corrected": corrected,
-                            "position": match.start(),
-                            "confidence": 0.9
-                        })
+            candidates = self._pattern_candidates(transcription)
+            candidates.extend(self._dictionary_candidates(
+                transcription, confidence_threshold, await self._terms_index()
+            ))
             
-            # 2. Aplicar correcciones del diccionario médico
-            if self.aho_corasick:
-                # Buscar términos médicos mal transcritos
-                text_lower = corrected_text.lower()
-                
-                for end_pos, (insert_order, keyword) in self.aho_corasick.iter(text_lower):
-                    start_pos = end_pos - len(keyword) + 1
-                    
-                    # Verificar que es una palabra completa
-                    if (start_pos > 0 and text_lower[start_pos - 1].isalnum()) or \
-                       (end_pos < len(text_lower) - 1 and text_lower[end_pos + 1].isalnum()):
-                        continue
-                    
-                    term_info = self.medical_dict[keyword]
-                    if term_info["confianza"] >= confidence_threshold:
-                        # Aplicar corrección
-                        original_word = corrected_text[start_pos:end_pos + 1]
-                        corrected_word = term_info["original"]
-                        
-                        if original_word.lower() != corrected_word.lower():
-                            corrected_text = (
-                                corrected_text[:start_pos] + 
-                                corrected_word + 
-                                corrected_text[end_pos + 1:]
-                            )
-                            corrections.append({
-                                "type": "medical_term",
-                                "original": original_word,
-                                "corrected": corrected_word,
-                                "position": start_pos,
-                                "confidence": term_info["confianza"],
-                                "categoria": term_info["categoria"]
-                            })
+            corrected_text, corrections = self._apply_corrections(
+                transcription, self._select_non_overlapping(candidates)
+            )
             
-            # 3. Calcular métricas de mejora
+            # Calcular métricas de mejora
             processing_time = time.time() - start_time
             improvement_score = len(corrections) / max(len(transcription.split()), 1)
             
@@ -222,6 +218,153 @@ class PostProcessingService(BaseService):
                 "processing_time": time.time() - start_time
             }
     
+    # Prioridad de cada fuente de correcciones al resolver solapes
+    _PRIORITY_PATTERN = 1
+    _PRIORITY_MEDICAL_TERM = 2
+    
+    def _pattern_candidates(self, text: str) -> List[Dict[str, Any]]:
+        """Correcciones propuestas por los patrones regex sobre el texto original."""
+        candidates = []
+        for regex, replacement in self._compiled_patterns:
+            for match in regex.finditer(text):
+                original = match.group()
+                corrected = match.expand(replacement)
+                if original.lower() != corrected.lower():
+                    candidates.append({
+                        "type": "pattern",
+                        "start": match.start(),
+                        "end": match.end(),
+                        "corrected": corrected,
+                        "confidence": 0.9,
+                        "priority": self._PRIORITY_PATTERN
+                    })
+        return candidates
+    
+    def _dictionary_candidates(
+        self,
+        text: str,
+        confidence_threshold: float,
+        indice: Optional[IndiceTerminologia]
+    ) -> List[Dict[str, Any]]:
+        """Correcciones del diccionario médico (Aho-Corasick sobre el texto original)."""
+        if indice is None:
+            return []
+        
+        text_lower = self._lower_preserving_offsets(text)
+        candidates = []
+        for end_pos, (_, keyword) in indice.automaton.iter(text_lower):
+            start_pos = end_pos - len(keyword) + 1
+            
+            # Verificar que es una palabra completa
+            if (start_pos > 0 and text_lower[start_pos - 1].isalnum()) or \
+               (end_pos < len(text_lower) - 1 and text_lower[end_pos + 1].isalnum()):
+                continue
+            
+            term_info = indice.terminos[keyword]
+            corrected = term_info["original"]
+            if term_info["confianza"] < confidence_threshold or keyword == corrected.lower():
+                continue
+            
+            candidates.append({
+                "type": "medical_term",
+                "start": start_pos,
+                "end": end_pos + 1,
+                "corrected": corrected,
+                "confidence": term_info["confianza"],
+                "categoria": term_info["categoria"],
+                "priority": self._PRIORITY_MEDICAL_TERM
+            })
+        return candidates
+    
+    @staticmethod
+    def _lower_preserving_offsets(text: str) -> str:
+        """Minúsculas sin alterar la longitud (p.ej. 'İ' se expande con lower())."""
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            return lowered
+        return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+    
+    @staticmethod
+    def _select_non_overlapping(candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Elegir un conjunto de correcciones sin solapes.
+        
+        Orden voraz: mayor prioridad, después span más largo, después el
+        más temprano. Los spans aceptados se mantienen ordenados para
+        comprobar solapes con bisect.
+        """
+        candidates.sort(key=lambda c: (-c["priority"], -(c["end"] - c["start"]), c["start"]))
+        starts: List[int] = []
+        accepted: List[Dict[str, Any]] = []
+        for candidate in candidates:
+            i = bisect.bisect_right(starts, candidate["start"])
+            if i > 0 and accepted[i - 1]["end"] > candidate["start"]:
+                continue
+            if i < len(starts) and starts[i] < candidate["end"]:
+                continue
+            starts.insert(i, candidate["start"])
+            accepted.insert(i, candidate)
+        return accepted
+    
+    @staticmethod
+    def _apply_corrections(
+        text: str,
+        selected: List[Dict[str, Any]]
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Construir el texto corregido con un único join.
+        
+        Args:
+            text: Texto original
+            selected: Correcciones sin solapes ordenadas por posición
+        
+        Returns:
+            Tupla (texto corregido, correcciones con posiciones original y corregida)
+        """
+        pieces: List[str] = []
+        corrections = []
+        cursor = 0
+        shift = 0
+        for candidate in selected:
+            start, end = candidate["start"], candidate["end"]
+            pieces.append(text[cursor:start])
+            pieces.append(candidate["corrected"])
+            
+            correction = {
+                "type": candidate["type"],
+                "original": text[start:end],
+                "corrected": candidate["corrected"],
+                "position": start,
+                "original_end": end,
+                "corrected_position": start + shift,
+                "confidence": candidate["confidence"]
+            }
+            if "categoria" in candidate:
+                correction["categoria"] = candidate["categoria"]
+            corrections.append(correction)
+            
+            shift += len(candidate["corrected"]) - (end - start)
+            cursor = end
+        pieces.append(text[cursor:])
+        return "".join(pieces), corrections
+    
+    @staticmethod
+    def map_corrected_offset(corrections: List[Dict[str, Any]], corrected_offset: int) -> int:
+        """
+        Traducir una posición del texto corregido a la del texto original.
+        
+        Dentro de un tramo corregido devuelve el inicio del tramo original.
+        """
+        starts = [c["corrected_position"] for c in corrections]
+        i = bisect.bisect_right(starts, corrected_offset) - 1
+        if i < 0:
+            return corrected_offset
+        correction = corrections[i]
+        corrected_end = correction["corrected_position"] + len(correction["corrected"])
+        if corrected_offset < corrected_end:
+            return correction["position"]
+        return correction["original_end"] + (corrected_offset - corrected_end)
+    
     async def extract_medical_entities(
         self,
         text: str,
@@ -257,9 +400,10 @@ class PostProcessingService(BaseService):
             detected_terms = []
             text_lower = text.lower()
             
-            if self.aho_corasick:
+            indice = await self._terms_index()
+            if indice is not None:
                 # Buscar términos médicos con Aho-Corasick
-                for end_pos, (insert_order, keyword) in self.aho_corasick.iter(text_lower):
+                for end_pos, (insert_order, keyword) in indice.automaton.iter(text_lower):
                     start_pos = end_pos - len(keyword) + 1
                     
                     # Verificar que es una palabra completa
@@ -267,7 +411,7 @@ class PostProcessingService(BaseService):
                        (end_pos < len(text_lower) - 1 and text_lower[end_pos + 1].isalnum()):
                         continue
                     
-                    term_info = self.medical_dict[keyword]
+                    term_info = indice.terminos[keyword]
                     original_term = text[start_pos:end_pos + 1]
                     
                     entity = {
@@ -341,6 +485,10 @@ class PostProcessingService(BaseService):
         """
         Analizar estructura pedagógica de la clase médica.
         
+        Los segmentos se reducen a arrays (inicio, fin, código de speaker y
+        matriz de aciertos de palabras clave) y la clasificación, los momentos
+        clave y el flujo se calculan sobre ellos con NumPy.
+        
         Args:
             transcription: Texto de la transcripción
             diarization_data: Datos de diarización con speakers
@@ -353,18 +501,19 @@ class PostProcessingService(BaseService):
         try:
             # 1. Identificar segmentos temporales
             segments = self._identify_temporal_segments(transcription, diarization_data)
+            starts, ends, hits = self._segment_arrays(segments)
             
             # 2. Clasificar tipos de actividad pedagógica
-            activities = self._classify_pedagogical_activities(segments)
+            activities, activity_codes = self._classify_pedagogical_activities(segments, hits)
             
             # 3. Analizar participación de speakers
             participation = self._analyze_speaker_participation(diarization_data)
             
             # 4. Detectar momentos clave de aprendizaje
-            key_moments = self._detect_key_learning_moments(segments)
+            key_moments = self._detect_key_learning_moments(segments, hits, activity_codes)
             
             # 5. Generar flujo de clase
-            class_flow = self._generate_class_flow(activities)
+            class_flow = self._generate_class_flow(activity_codes, starts, ends)
             
             processing_time = time.time() - start_time
             
@@ -376,7 +525,7 @@ class PostProcessingService(BaseService):
                 "key_moments": key_moments,
                 "class_flow": class_flow,
                 "total_segments": len(segments),
-                "activity_distribution": self._calculate_activity_distribution(activities),
+                "activity_distribution": self._calculate_activity_distribution(activity_codes),
                 "processing_time": processing_time
             }
             
@@ -420,198 +569,178 @@ class PostProcessingService(BaseService):
         
         return segments
     
-    def _classify_pedagogical_activities(self, segments: List[Dict]) -> List[Dict]:
-        """Clasificar actividades pedagógicas en cada segmento."""
-        # Patrones para identificar tipos de actividad
-        activity_patterns = {
-            "introduccion": [
-                "bienvenidos", "oggi", "argomento", "iniziamo", "parleremo", 
-                "studieremo", "vedremo", "obiettivo"
-            ],
-            "explicacion": [
-                "quindi", "per esempio", "importante", "ricordate", "come sapete",
-                "infatti", "inoltre", "dunque", "cioè"
-            ],
-            "pregunta": [
-                "domanda", "chi sa", "qualcuno", "cosa pensate", "secondo voi",
-                "come", "perché", "quando", "dove", "?"
-            ],
-            "respuesta": [
-                "esatto", "corretto", "bene", "perfetto", "giusto", "bravo",
-                "no", "sbagliato", "attenzione"
-            ],
-            "interaccion": [
-                "studente", "professore", "dottore", "scusi", "prego",
-                "grazie", "capisce", "chiaro"
-            ],
-            "resumen": [
-                "riassumendo", "concludendo", "importante ricordare", 
-                "in sintesi", "quindi"
-            ],
-            "cierre": [
-                "fine", "prossima volta", "arrivederci", "grazie", "finito",
-                "basta", "stop"
-            ]
-        }
+    @staticmethod
+    def _segment_arrays(segments: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Reducir los segmentos a arrays de tiempos y aciertos de palabras clave.
         
-        classified_segments = []
+        Los textos en minúsculas se unen con un separador que ningún patrón
+        contiene y se recorren una sola vez con el autómata de palabras clave;
+        cada acierto se asigna a su segmento por búsqueda binaria sobre los
+        offsets acumulados. La semántica es la de `pattern in text`.
         
-        for segment in segments:
-            text = segment["text"].lower()
-            scores = {}
-            
-            # Calcular puntuación para cada tipo de actividad
-            for activity, patterns in activity_patterns.items():
-                score = 0
-                for pattern in patterns:
-                    if pattern in text:
-                        score += 1
-                scores[activity] = score / len(patterns)
-            
-            # Determinar actividad principal
-            best_activity = max(scores, key=scores.get) if scores else "explicacion"
-            confidence = scores.get(best_activity, 0.0)
-            
-            classified_segment = {
+        Returns:
+            Tupla (inicios, fines, matriz booleana segmentos x palabras clave)
+        """
+        n = len(segments)
+        starts = np.fromiter((s.get("start_time", 0) for s in segments), dtype=np.float64, count=n)
+        ends = np.fromiter((s.get("end_time", 0) for s in segments), dtype=np.float64, count=n)
+        hits = np.zeros((n, len(_STRUCTURE_KEYWORDS)), dtype=bool)
+        if n == 0:
+            return starts, ends, hits
+        
+        texts = [s["text"].lower() for s in segments]
+        # Offset (exclusivo, separador incluido) donde termina cada segmento
+        offsets = np.cumsum(np.fromiter((len(t) + 1 for t in texts), dtype=np.int64, count=n))
+        found = np.array(list(_STRUCTURE_AUTOMATON.iter(_SEGMENT_SEPARATOR.join(texts))), dtype=np.int64)
+        if found.size:
+            rows = np.searchsorted(offsets, found[:, 0], side="right")
+            hits[rows, found[:, 1]] = True
+        
+        return starts, ends, hits
+    
+    def _classify_pedagogical_activities(
+        self,
+        segments: List[Dict],
+        hits: np.ndarray
+    ) -> Tuple[List[Dict], np.ndarray]:
+        """
+        Clasificar actividades pedagógicas en cada segmento.
+        
+        La puntuación de cada actividad es la fracción de sus patrones
+        presentes en el segmento; en caso de empate gana la primera actividad
+        declarada, igual que `max` sobre el diccionario de puntuaciones.
+        
+        Returns:
+            Tupla (segmentos clasificados, código de actividad por segmento)
+        """
+        scores = (hits.astype(np.int64) @ _ACTIVITY_MEMBERSHIP) / _ACTIVITY_SIZES
+        codes = scores.argmax(axis=1) if len(segments) else np.zeros(0, dtype=np.int64)
+        confidences = scores[np.arange(len(segments)), codes]
+        
+        classified_segments = [
+            {
                 **segment,
-                "activity_type": best_activity,
+                "activity_type": _ACTIVITY_NAMES[code],
                 "activity_confidence": confidence,
-                "activity_scores": scores
+                "activity_scores": dict(zip(_ACTIVITY_NAMES, row, strict=True))
             }
-            
-            classified_segments.append(classified_segment)
+            for segment, code, confidence, row in zip(
+                segments, codes.tolist(), confidences.tolist(), scores.tolist(), strict=True
+            )
+        ]
         
-        return classified_segments
+        return classified_segments, codes
     
     def _analyze_speaker_participation(self, diarization_data: Dict) -> Dict[str, Any]:
         """Analizar participación de cada speaker."""
         if not diarization_data or "segments" not in diarization_data:
             return {"error": "No hay datos de diarización disponibles"}
         
-        speaker_stats = defaultdict(lambda: {
-            "total_time": 0.0,
-            "segment_count": 0,
-            "role": "unknown",
-            "avg_segment_duration": 0.0,
-            "participation_percentage": 0.0
-        })
-        
-        total_time = 0.0
-        
-        for segment in diarization_data["segments"]:
-            speaker = segment.get("speaker", "unknown")
-            duration = segment.get("end", 0) - segment.get("start", 0)
-            
-            speaker_stats[speaker]["total_time"] += duration
-            speaker_stats[speaker]["segment_count"] += 1
-            speaker_stats[speaker]["role"] = segment.get("role", "unknown")
-            
-            total_time += duration
-        
-        # Calcular estadísticas finales
-        for speaker, stats in speaker_stats.items():
-            if stats["segment_count"] > 0:
-                stats["avg_segment_duration"] = stats["total_time"] / stats["segment_count"]
-            if total_time > 0:
-                stats["participation_percentage"] = (stats["total_time"] / total_time) * 100
+        diar_segments = diarization_data["segments"]
+        n = len(diar_segments)
+        speakers = [segment.get("speaker", "unknown") for segment in diar_segments]
+        # Orden de primera aparición y rol del último segmento de cada speaker
+        roles = dict(zip(speakers, (segment.get("role", "unknown") for segment in diar_segments), strict=True))
+        speaker_index = {speaker: i for i, speaker in enumerate(roles)}
+        
+        speaker_codes = np.fromiter((speaker_index[s] for s in speakers), dtype=np.int64, count=n)
+        durations = (
+            np.fromiter((segment.get("end", 0) for segment in diar_segments), dtype=np.float64, count=n)
+            - np.fromiter((segment.get("start", 0) for segment in diar_segments), dtype=np.float64, count=n)
+        )
+        
+        total_times = np.bincount(speaker_codes, weights=durations, minlength=len(roles))
+        segment_counts = np.bincount(speaker_codes, minlength=len(roles))
+        total_time = float(durations.sum())
+        
+        speaker_stats = {}
+        for (speaker, role), speaker_time, count in zip(
+            roles.items(), total_times.tolist(), segment_counts.tolist(), strict=True
+        ):
+            speaker_stats[speaker] = {
+                "total_time": speaker_time,
+                "segment_count": count,
+                "role": role,
+                "avg_segment_duration": speaker_time / count,
+                "participation_percentage": (speaker_time / total_time) * 100 if total_time > 0 else 0.0
+            }
         
         return {
-            "speakers": dict(speaker_stats),
+            "speakers": speaker_stats,
             "total_speakers": len(speaker_stats),
             "total_duration": total_time,
-            "most_active_speaker": max(speaker_stats.keys(), 
-                                     key=lambda x: speaker_stats[x]["total_time"]) if speaker_stats else None
+            "most_active_speaker": list(roles)[int(total_times.argmax())] if speaker_stats else None
         }
     
-    def _detect_key_learning_moments(self, segments: List[Dict]) -> List[Dict]:
-        """Detectar momentos clave de aprendizaje."""
-        key_moments = []
-        
-        # Patrones que indican momentos importantes
-        important_patterns = [
-            "importante", "fondamentale", "ricordate", "attenzione",
-            "chiave", "essenziale", "cruciale", "significativo"
-        ]
+    def _detect_key_learning_moments(
+        self,
+        segments: List[Dict],
+        hits: np.ndarray,
+        activity_codes: np.ndarray
+    ) -> List[Dict]:
+        """
+        Detectar momentos clave de aprendizaje.
         
-        question_patterns = ["?", "domanda", "perché", "come", "cosa"]
+        Cada patrón importante suma 2, cada patrón de pregunta 1 y los
+        segmentos de interacción profesor-estudiante 1 más. Solo se
+        materializan los 10 mejores, con orden estable ante empates.
+        """
+        importance = hits.astype(np.int64) @ _IMPORTANCE_WEIGHTS
+        importance += np.isin(activity_codes, _INTERACTIVE_ACTIVITY_CODES)
         
-        for segment in segments:
-            text = segment["text"].lower()
-            importance_score = 0
-            
-            # Verificar patrones importantes
-            for pattern in important_patterns:
-                if pattern in text:
-                    importance_score += 2
-            
-            # Verificar preguntas
-            for pattern in question_patterns:
-                if pattern in text:
-                    importance_score += 1
-            
-            # Si hay interacción profesor-estudiante
-            if segment.get("activity_type") in ["pregunta", "respuesta", "interaccion"]:
-                importance_score += 1
-            
-            # Si el segmento es suficientemente importante
-            if importance_score >= 2:
-                key_moments.append({
-                    "timestamp": segment.get("start_time", 0),
-                    "duration": segment.get("end_time", 0) - segment.get("start_time", 0),
-                    "text": segment["text"][:200] + "..." if len(segment["text"]) > 200 else segment["text"],
-                    "importance_score": importance_score,
-                    "activity_type": segment.get("activity_type", "unknown"),
-                    "speaker": segment.get("speaker", "unknown")
-                })
+        candidates = np.flatnonzero(importance >= 2)
+        ranked = candidates[np.argsort(-importance[candidates], kind="stable")][:10]
         
-        # Ordenar por importancia
-        key_moments.sort(key=lambda x: x["importance_score"], reverse=True)
+        key_moments = []
+        for index in ranked.tolist():
+            segment = segments[index]
+            key_moments.append({
+                "timestamp": segment.get("start_time", 0),
+                "duration": segment.get("end_time", 0) - segment.get("start_time", 0),
+                "text": segment["text"][:200] + "..." if len(segment["text"]) > 200 else segment["text"],
+                "importance_score": int(importance[index]),
+                "activity_type": _ACTIVITY_NAMES[activity_codes[index]],
+                "speaker": segment.get("speaker", "unknown")
+            })
         
-        return key_moments[:10]  # Top 10 momentos más importantes
+        return key_moments
     
-    def _generate_class_flow(self, activities: List[Dict]) -> Dict[str, Any]:
-        """Generar flujo general de la clase."""
-        if not activities:
+    def _generate_class_flow(
+        self,
+        activity_codes: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray
+    ) -> Dict[str, Any]:
+        """Generar flujo general de la clase agrupando actividades consecutivas."""
+        if activity_codes.size == 0:
             return {"error": "No hay actividades para analizar"}
         
-        # Agrupar actividades consecutivas del mismo tipo
-        flow_segments = []
-        current_activity = None
-        current_start = 0
-        current_duration = 0
-        
-        for activity in activities:
-            activity_type = activity.get("activity_type", "unknown")
-            
-            if activity_type != current_activity:
-                if current_activity:
-                    flow_segments.append({
-                        "activity": current_activity,
-                        "start_time": current_start,
-                        "duration": current_duration,
-                        "percentage": 0  # Se calculará después
-                    })
-                
-                current_activity = activity_type
-                current_start = activity.get("start_time", 0)
-                current_duration = activity.get("end_time", 0) - activity.get("start_time", 0)
-            else:
-                current_duration += activity.get("end_time", 0) - activity.get("start_time", 0)
-        
-        # Agregar último segmento
-        if current_activity:
-            flow_segments.append({
-                "activity": current_activity,
-                "start_time": current_start,
-                "duration": current_duration,
-                "percentage": 0
-            })
+        # Inicio de cada tramo de actividades consecutivas del mismo tipo
+        run_starts = np.concatenate(([0], np.flatnonzero(np.diff(activity_codes)) + 1))
+        run_durations = np.add.reduceat(ends - starts, run_starts)
         
-        # Calcular porcentajes
-        total_duration = sum(seg["duration"] for seg in flow_segments)
+        total_duration = float(run_durations.sum())
         if total_duration > 0:
-            for segment in flow_segments:
-                segment["percentage"] = (segment["duration"] / total_duration) * 100
+            percentages = run_durations / total_duration * 100
+        else:
+            percentages = np.zeros_like(run_durations)
+        
+        flow_segments = [
+            {
+                "activity": _ACTIVITY_NAMES[code],
+                "start_time": start,
+                "duration": duration,
+                "percentage": percentage
+            }
+            for code, start, duration, percentage in zip(
+                activity_codes[run_starts].tolist(),
+                starts[run_starts].tolist(),
+                run_durations.tolist(),
+                percentages.tolist(),
+                strict=True
+            )
+        ]
         
         return {
             "segments": flow_segments,
@@ -619,25 +748,23 @@ class PostProcessingService(BaseService):
             "main_activities": [seg["activity"] for seg in flow_segments if seg["percentage"] > 10]
         }
     
-    def _calculate_activity_distribution(self, activities: List[Dict]) -> Dict[str, float]:
-        """Calcular distribución de tipos de actividad."""
-        activity_counts = defaultdict(int)
-        total_activities = len(activities)
+    @staticmethod
+    def _calculate_activity_distribution(activity_codes: np.ndarray) -> Dict[str, float]:
+        """Calcular distribución de tipos de actividad en orden de aparición."""
+        total_activities = activity_codes.size
+        if total_activities == 0:
+            return {}
         
-        for activity in activities:
-            activity_type = activity.get("activity_type", "unknown")
-            activity_counts[activity_type] += 1
+        counts = np.bincount(activity_codes, minlength=len(_ACTIVITY_NAMES))
+        _, first_seen = np.unique(activity_codes, return_index=True)
+        order = activity_codes[np.sort(first_seen)]
         
-        # Convertir a porcentajes
-        distribution = {}
-        for activity, count in activity_counts.items():
-            distribution[activity] = (count / total_activities) * 100 if total_activities > 0 else 0
-        
-        return distribution
+        return {
+            _ACTIVITY_NAMES[code]: (counts[code] / total_activities) * 100
+            for code in order.tolist()
+        }
     
     async def cleanup(self) -> None:
         """Limpiar recursos del servicio."""
-        self.medical_dict.clear()
-        self.aho_corasick = None
         self.correction_patterns.clear()
         self.is_initialized = False
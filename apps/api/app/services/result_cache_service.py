@@ -0,0 +1,160 @@
+"""
+Cache de resultados de ASR y diarización direccionada por contenido.
+Reutiliza resultados previos del mismo audio, preset y versión de modelo
+clonando sus filas en lugar de volver a ejecutar la inferencia.
+"""
+
+import hashlib
+from typing import Any, Dict, Optional, Type, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import DiarizationResult, TranscriptionResult
+from app.services.base import BaseService
+
+
+ResultadoModelo = TypeVar("ResultadoModelo", TranscriptionResult, DiarizationResult)
+
+# Columnas propias de cada fila que no se copian al clonar
+_COLUMNAS_NO_CLONABLES = {"id", "processing_job_id", "created_at", "updated_at"}
+
+
+class ResultCacheService(BaseService):
+    """
+    Deduplicación de trabajos por hash de contenido del audio.
+
+    La clave combina el SHA-256 del audio original, el preset usado y la
+    versión de modelo, de modo que cambiar cualquiera de ellos invalida la
+    entrada. Los resultados se clonan para que cada ProcessingJob conserve
+    sus propias filas.
+    """
+
+    def __init__(self):
+        super().__init__("ResultCacheService")
+        self.estadisticas = {
+            "hits_transcripcion": 0,
+            "hits_diarizacion": 0,
+            "misses": 0,
+            "tiempo_ahorrado_sec": 0.0
+        }
+
+    @staticmethod
+    def calcular_clave(audio_sha256: Optional[str], preset: str, version_modelo: str) -> Optional[str]:
+        """
+        Calcular la clave de cache de un resultado.
+
+        Returns:
+            Hash hexadecimal, o None si el audio no tiene hash de contenido
+        """
+        if not audio_sha256:
+            return None
+        return hashlib.sha256(f"{audio_sha256}|{preset}|{version_modelo}".encode()).hexdigest()
+
+    async def obtener_transcripcion(
+        self,
+        db: AsyncSession,
+        clave_cache: Optional[str],
+        processing_job_id: Any
+    ) -> Optional[TranscriptionResult]:
+        """
+        Clonar una transcripción previa con la misma clave para un nuevo job.
+
+        Solo se reutilizan transcripciones definitivas (no incrementales en curso).
+        """
+        original = await self._buscar(
+            db, TranscriptionResult, clave_cache,
+            TranscriptionResult.es_parcial.is_(False)
+        )
+        if original is None:
+            return None
+        if original.processing_job_id == processing_job_id:
+            # Reintento del mismo job: el resultado ya es suyo
+            return original
+
+        clon = self._clonar(original, processing_job_id)
+        await self._guardar(db, clon)
+        self._registrar_hit("hits_transcripcion", original, processing_job_id)
+        return clon
+
+    async def obtener_diarizacion(
+        self,
+        db: AsyncSession,
+        clave_cache: Optional[str],
+        processing_job_id: Any
+    ) -> Optional[DiarizationResult]:
+        """Clonar una diarización previa con la misma clave para un nuevo job."""
+        original = await self._buscar(db, DiarizationResult, clave_cache)
+        if original is None:
+            return None
+        if original.processing_job_id == processing_job_id:
+            # Reintento del mismo job: el resultado ya es suyo
+            return original
+
+        clon = self._clonar(original, processing_job_id)
+        await self._guardar(db, clon)
+        self._registrar_hit("hits_diarizacion", original, processing_job_id)
+        return clon
+
+    async def _buscar(
+        self,
+        db: AsyncSession,
+        modelo: Type[ResultadoModelo],
+        clave_cache: Optional[str],
+        *condiciones: Any
+    ) -> Optional[ResultadoModelo]:
+        """Buscar el resultado más reciente con la clave dada."""
+        if not clave_cache:
+            return None
+
+        result = await db.execute(
+            select(modelo)
+            .where(modelo.clave_cache == clave_cache, *condiciones)
+            .order_by(modelo.created_at.desc())
+            .limit(1)
+        )
+        original = result.scalars().first()
+        if original is None:
+            self.estadisticas["misses"] += 1
+        return original
+
+    @staticmethod
+    def _clonar(original: ResultadoModelo, processing_job_id: Any) -> ResultadoModelo:
+        """Copiar todas las columnas de datos a una fila nueva del job destino."""
+        valores = {
+            columna.key: getattr(original, columna.key)
+            for columna in original.__table__.columns
+            if columna.key not in _COLUMNAS_NO_CLONABLES
+        }
+        return type(original)(processing_job_id=processing_job_id, **valores)
+
+    @staticmethod
+    async def _guardar(db: AsyncSession, resultado: Any) -> None:
+        db.add(resultado)
+        await db.commit()
+        await db.refresh(resultado)
+
+    def _registrar_hit(self, contador: str, original: Any, processing_job_id: Any) -> None:
+        self.estadisticas[contador] += 1
+        self.estadisticas["tiempo_ahorrado_sec"] += original.tiempo_procesamiento_sec or 0.0
+        self.logger.info(
+            "Resultado reutilizado desde cache por contenido",
+            extra={
+                "tipo": type(original).__name__,
+                "resultado_origen_id": str(original.id),
+                "processing_job_id": str(processing_job_id),
+                "tiempo_ahorrado_sec": original.tiempo_procesamiento_sec
+            }
+        )
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Verificar estado del servicio."""
+        return {
+            "service": "ResultCacheService",
+            "status": "healthy",
+            "estadisticas": self.estadisticas.copy()
+        }
+
+
+# Instancia global del servicio
+result_cache_service = ResultCacheService()
@@ -0,0 +1,381 @@
+"""
+Servicio de fusión ASR + diarización.
+Asigna cada palabra transcrita a un speaker mediante un índice de intervalos
+ordenado y agrupa el resultado en intervenciones por speaker.
+"""
+
+import threading
+from bisect import bisect_right
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.services.base import BaseService
+
+
+SPEAKER_DESCONOCIDO = "desconocido"
+
+# Índice de una diarización y rol de cada speaker
+DiarizacionIndexada = Tuple["IndiceIntervalos", Dict[str, Optional[str]]]
+
+
+class Intervencion(BaseModel):
+    """Tramo continuo de habla atribuido a un speaker."""
+    speaker_id: str
+    tipo_speaker: Optional[str] = None
+    start: float
+    end: float
+    text: str
+    num_palabras: int
+    confianza: float
+    solapada: bool = False
+
+
+class ResultadoFusion(BaseModel):
+    """Transcripción atribuida por speaker."""
+    intervenciones: List[Intervencion]
+    palabras_totales: int
+    palabras_sin_speaker: int
+    palabras_en_solape: int
+    tiempo_habla_por_speaker: Dict[str, float]
+
+    @property
+    def cobertura_speakers(self) -> float:
+        """Fracción de palabras con speaker asignado."""
+        if not self.palabras_totales:
+            return 0.0
+        return 1.0 - self.palabras_sin_speaker / self.palabras_totales
+
+
+class IndiceIntervalos:
+    """
+    Índice de la diarización como intervalos elementales disjuntos.
+
+    Un barrido sobre los bordes de todos los segmentos parte la línea de
+    tiempo en intervalos sin solape; en los tramos con habla simultánea se
+    elige el speaker con más tiempo total. Cada consulta es un ``bisect``
+    sobre los inicios: O(log S).
+    """
+
+    def __init__(self, segmentos_diarizacion: List[Dict[str, Any]]):
+        tiempo_por_speaker: Counter = Counter()
+        eventos: List[Tuple[float, int, str]] = []
+        for segmento in segmentos_diarizacion:
+            start, end = float(segmento["start"]), float(segmento["end"])
+            if end <= start:
+                continue
+            speaker_id = str(segmento["speaker_id"])
+            tiempo_por_speaker[speaker_id] += end - start
+            # Los fines (-1) se procesan antes que los inicios (+1) en el mismo instante
+            eventos.append((start, 1, speaker_id))
+            eventos.append((end, -1, speaker_id))
+        eventos.sort(key=lambda e: (e[0], e[1]))
+
+        self.tiempo_por_speaker = dict(tiempo_por_speaker)
+        self.inicios: List[float] = []
+        self.fines: List[float] = []
+        self.speakers: List[str] = []
+        self.solapados: List[bool] = []
+
+        activos: Counter = Counter()
+        anterior: Optional[float] = None
+        for instante, tipo, speaker_id in eventos:
+            if anterior is not None and instante > anterior and activos:
+                self._anadir(anterior, instante, activos)
+            activos[speaker_id] += tipo
+            if activos[speaker_id] <= 0:
+                del activos[speaker_id]
+            anterior = instante
+
+    def _anadir(self, start: float, end: float, activos: Counter) -> None:
+        """Añadir un intervalo elemental, fusionándolo con el anterior si coincide."""
+        speaker_id = max(activos, key=lambda s: (self.tiempo_por_speaker[s], s))
+        solapado = len(activos) > 1
+        if (
+            self.speakers and self.speakers[-1] == speaker_id
+            and self.fines[-1] == start and self.solapados[-1] == solapado
+        ):
+            self.fines[-1] = end
+            return
+        self.inicios.append(start)
+        self.fines.append(end)
+        self.speakers.append(speaker_id)
+        self.solapados.append(solapado)
+
+    def __len__(self) -> int:
+        return len(self.inicios)
+
+    def speaker_en(self, instante: float, tolerancia_sec: float) -> Tuple[Optional[str], bool]:
+        """
+        Speaker activo en un instante.
+
+        Si el instante cae en un silencio de la diarización se usa el
+        intervalo más cercano siempre que esté a menos de ``tolerancia_sec``.
+
+        Returns:
+            Tupla (speaker_id o None, tramo con solape)
+        """
+        i = bisect_right(self.inicios, instante) - 1
+        if i >= 0 and instante < self.fines[i]:
+            return self.speakers[i], self.solapados[i]
+
+        # Silencio: candidato anterior (i) y siguiente (i + 1)
+        mejor, distancia_mejor = None, tolerancia_sec
+        if i >= 0 and instante - self.fines[i] <= distancia_mejor:
+            mejor, distancia_mejor = i, instante - self.fines[i]
+        if i + 1 < len(self.inicios) and self.inicios[i + 1] - instante < distancia_mejor:
+            mejor = i + 1
+        if mejor is None:
+            return None, False
+        return self.speakers[mejor], self.solapados[mejor]
+
+    def speaker_dominante(self, start: float, end: float, tolerancia_sec: float) -> Tuple[Optional[str], bool]:
+        """Speaker con más solape en ``[start, end)`` (para segmentos sin palabras)."""
+        i = max(0, bisect_right(self.inicios, start) - 1)
+        solape: Counter = Counter()
+        hay_solape_habla = False
+        while i < len(self.inicios) and self.inicios[i] < end:
+            duracion = min(end, self.fines[i]) - max(start, self.inicios[i])
+            if duracion > 0:
+                solape[self.speakers[i]] += duracion
+                hay_solape_habla = hay_solape_habla or self.solapados[i]
+            i += 1
+        if not solape:
+            return self.speaker_en((start + end) / 2, tolerancia_sec)
+        return solape.most_common(1)[0][0], hay_solape_habla
+
+
+class SpeakerFusionService(BaseService):
+    """
+    Fusión de palabras de Whisper con segmentos de pyannote.
+
+    Cada palabra se asigna por su punto medio, de modo que el coste total
+    es O((W + S) log S) en vez del bucle anidado palabras × segmentos.
+    Los segmentos sin marcas por palabra se asignan completos al speaker
+    con más solape.
+    """
+
+    MAX_INDICES_CACHEADOS = 16
+
+    def __init__(
+        self,
+        tolerancia_silencio_sec: float = 1.0,
+        max_pausa_intervencion_sec: float = 2.0
+    ):
+        super().__init__("SpeakerFusionService")
+        self.tolerancia_silencio_sec = tolerancia_silencio_sec
+        self.max_pausa_intervencion_sec = max_pausa_intervencion_sec
+        self._indices: Dict[str, DiarizacionIndexada] = {}
+        self._lock = threading.Lock()
+
+    def fusionar(
+        self,
+        segmentos_asr: List[Dict[str, Any]],
+        segmentos_diarizacion: List[Dict[str, Any]],
+        speakers_clasificados: Optional[List[Dict[str, Any]]] = None
+    ) -> ResultadoFusion:
+        """
+        Atribuir la transcripción a speakers.
+
+        Args:
+            segmentos_asr: Segmentos de Whisper (con ``words`` si hay word timestamps)
+            segmentos_diarizacion: Segmentos ``{start, end, speaker_id}`` de pyannote
+            speakers_clasificados: SpeakerInfo serializados (para el rol de cada speaker)
+
+        Returns:
+            ResultadoFusion con las intervenciones en orden temporal
+        """
+        indice = IndiceIntervalos(segmentos_diarizacion)
+        roles = self._roles(speakers_clasificados)
+
+        unidades = self._unidades_asr(segmentos_asr)
+        intervenciones: List[Intervencion] = []
+        abierta: Optional[Dict[str, Any]] = None
+        sin_speaker = en_solape = 0
+
+        for start, end, texto, confianza, num_palabras, es_palabra in unidades:
+            if es_palabra:
+                speaker_id, solapada = indice.speaker_en((start + end) / 2, self.tolerancia_silencio_sec)
+            else:
+                speaker_id, solapada = indice.speaker_dominante(start, end, self.tolerancia_silencio_sec)
+
+            if speaker_id is None:
+                speaker_id = SPEAKER_DESCONOCIDO
+                sin_speaker += num_palabras
+            if solapada:
+                en_solape += num_palabras
+
+            if (
+                abierta is not None
+                and abierta["speaker_id"] == speaker_id
+                and start - abierta["end"] <= self.max_pausa_intervencion_sec
+            ):
+                abierta["end"] = max(abierta["end"], end)
+                abierta["textos"].append(texto)
+                abierta["confianzas"].append(confianza * num_palabras)
+                abierta["num_palabras"] += num_palabras
+                abierta["solapada"] = abierta["solapada"] or solapada
+                continue
+
+            if abierta is not None:
+                intervenciones.append(self._cerrar(abierta, roles))
+            abierta = {
+                "speaker_id": speaker_id,
+                "start": start,
+                "end": end,
+                "textos": [texto],
+                "confianzas": [confianza * num_palabras],
+                "num_palabras": num_palabras,
+                "solapada": solapada
+            }
+
+        if abierta is not None:
+            intervenciones.append(self._cerrar(abierta, roles))
+
+        tiempo_habla: Counter = Counter()
+        for intervencion in intervenciones:
+            tiempo_habla[intervencion.speaker_id] += intervencion.end - intervencion.start
+
+        resultado = ResultadoFusion(
+            intervenciones=intervenciones,
+            palabras_totales=sum(u[4] for u in unidades),
+            palabras_sin_speaker=sin_speaker,
+            palabras_en_solape=en_solape,
+            tiempo_habla_por_speaker={k: round(v, 2) for k, v in tiempo_habla.items()}
+        )
+
+        self.logger.info(
+            "Fusión ASR + diarización completada",
+            extra={
+                "intervalos_diarizacion": len(indice),
+                "unidades_asr": len(unidades),
+                "intervenciones": len(intervenciones),
+                "cobertura_speakers": round(resultado.cobertura_speakers, 3)
+            }
+        )
+        return resultado
+
+    def indice_cacheado(self, clave: str) -> Optional[DiarizacionIndexada]:
+        """Índice ya construido para la diarización identificada por ``clave``."""
+        with self._lock:
+            return self._indices.get(clave)
+
+    def indexar_diarizacion(
+        self,
+        clave: str,
+        segmentos_diarizacion: List[Dict[str, Any]],
+        speakers_clasificados: Optional[List[Dict[str, Any]]] = None
+    ) -> DiarizacionIndexada:
+        """
+        Construir y cachear el índice de una diarización.
+
+        La clave debe cambiar cuando cambia la diarización (id y fecha de
+        actualización), de modo que las entradas obsoletas no se reutilizan.
+        """
+        indexada = (IndiceIntervalos(segmentos_diarizacion), self._roles(speakers_clasificados))
+        with self._lock:
+            if len(self._indices) >= self.MAX_INDICES_CACHEADOS:
+                # Descartar el más antiguo
+                self._indices.pop(next(iter(self._indices)))
+            self._indices[clave] = indexada
+        return indexada
+
+    def etiquetar_segmentos(
+        self,
+        segmentos: List[Dict[str, Any]],
+        diarizacion: DiarizacionIndexada
+    ) -> List[Dict[str, Any]]:
+        """
+        Añadir ``speaker_id`` y ``tipo_speaker`` a segmentos y palabras.
+
+        Pensado para páginas pequeñas de la transcripción: los segmentos se
+        modifican en sitio y se devuelven.
+        """
+        indice, roles = diarizacion
+
+        for segmento in segmentos:
+            speaker_id, _ = indice.speaker_dominante(
+                segmento["start"], segmento["end"], self.tolerancia_silencio_sec
+            )
+            segmento["speaker_id"] = speaker_id or SPEAKER_DESCONOCIDO
+            segmento["tipo_speaker"] = roles.get(speaker_id)
+            for palabra in segmento.get("words") or []:
+                speaker_palabra, _ = indice.speaker_en(
+                    (palabra["start"] + palabra["end"]) / 2, self.tolerancia_silencio_sec
+                )
+                palabra["speaker_id"] = speaker_palabra or SPEAKER_DESCONOCIDO
+        return segmentos
+
+    @staticmethod
+    def _roles(speakers_clasificados: Optional[List[Dict[str, Any]]]) -> Dict[str, Optional[str]]:
+        return {
+            str(s["speaker_id"]): s.get("tipo_speaker")
+            for s in (speakers_clasificados or [])
+        }
+
+    @staticmethod
+    def _unidades_asr(segmentos_asr: List[Dict[str, Any]]) -> List[Tuple[float, float, str, float, int, bool]]:
+        """
+        Aplanar la transcripción a unidades ordenadas (palabras o segmentos).
+
+        Returns:
+            Lista de (start, end, texto, confianza, num_palabras, es_palabra)
+        """
+        unidades = []
+        for segmento in segmentos_asr:
+            palabras = segmento.get("words") or []
+            if palabras:
+                for palabra in palabras:
+                    texto = str(palabra.get("word", "")).strip()
+                    if texto:
+                        unidades.append((
+                            float(palabra["start"]),
+                            float(palabra["end"]),
+                            texto,
+                            float(palabra.get("probability", 0.0)),
+                            1,
+                            True
+                        ))
+            else:
+                texto = str(segmento.get("text", "")).strip()
+                if texto:
+                    unidades.append((
+                        float(segmento["start"]),
+                        float(segmento["end"]),
+                        texto,
+                        float(segmento.get("confidence", 0.0)),
+                        len(texto.split()),
+                        False
+                    ))
+        unidades.sort(key=lambda u: u[0])
+        return unidades
+
+    @staticmethod
+    def _cerrar(abierta: Dict[str, Any], roles: Dict[str, Optional[str]]) -> Intervencion:
+        """Construir la intervención a partir del acumulador."""
+        num_palabras = abierta["num_palabras"]
+        return Intervencion(
+            speaker_id=abierta["speaker_id"],
+            tipo_speaker=roles.get(abierta["speaker_id"]),
+            start=abierta["start"],
+            end=abierta["end"],
+            text=" ".join(abierta["textos"]),
+            num_palabras=num_palabras,
+            confianza=sum(abierta["confianzas"]) / num_palabras if num_palabras else 0.0,
+            solapada=abierta["solapada"]
+        )
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Verificar estado del servicio."""
+        return {
+            "service": "SpeakerFusionService",
+            "status": "healthy",
+            "tolerancia_silencio_sec": self.tolerancia_silencio_sec,
+            "max_pausa_intervencion_sec": self.max_pausa_intervencion_sec,
+            "indices_cacheados": len(self._indices)
+        }
+
+
+# Instancia global del servicio
+speaker_fusion_service = SpeakerFusionService()
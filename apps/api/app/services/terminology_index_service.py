@@ -0,0 +1,378 @@
+"""
+Índice compartido de terminología médica.
+Construye una sola vez el autómata Aho-Corasick de MedicalTerminology,
+lo persiste por versión de terminología (disco local y MinIO) y lo
+actualiza de forma incremental cuando cambian los términos.
+"""
+
+import asyncio
+import hashlib
+import io
+import mmap
+import os
+import pickle
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import ahocorasick
+from sqlalchemy import func, select
+
+from app.core import get_async_db, settings
+from app.models.medical_terminology import MedicalTerminology
+from app.services.base import BaseService
+from app.services.minio_service import minio_service
+
+
+# Cambiar al modificar la estructura del snapshot serializado
+FORMATO_SNAPSHOT = 1
+PREFIJO = "terminology"
+
+
+class IndiceTerminologia:
+    """
+    Snapshot inmutable del índice: autómata + información de cada clave.
+
+    Las claves son el término normalizado, sinónimos y variantes ASR en
+    minúsculas; el valor del autómata es ``(term_id, clave)``. Una
+    actualización produce un snapshot nuevo, de modo que quien itera sobre
+    uno no lo ve cambiar.
+    """
+
+    def __init__(
+        self,
+        terminos: Dict[str, Dict[str, Any]],
+        claves_por_termino: Dict[str, Set[str]],
+        estado: Tuple[int, Optional[str]],
+        automaton: Optional[ahocorasick.Automaton] = None
+    ):
+        self.terminos = terminos
+        self.claves_por_termino = claves_por_termino
+        self.estado = estado
+        self.automaton = automaton or self._construir_automaton(terminos)
+
+    @staticmethod
+    def _construir_automaton(terminos: Dict[str, Dict[str, Any]]) -> ahocorasick.Automaton:
+        automaton = ahocorasick.Automaton()
+        for clave, info in terminos.items():
+            automaton.add_word(clave, (info["term_id"], clave))
+        if terminos:
+            automaton.make_automaton()
+        return automaton
+
+    @property
+    def version(self) -> str:
+        """Identificador estable de la versión de terminología indexada."""
+        return _version(self.estado)
+
+    def buscar(self, texto: str) -> List[Tuple[int, int, str, Dict[str, Any]]]:
+        """
+        Términos presentes en ``texto`` como palabras completas, en una pasada.
+
+        Returns:
+            Lista de (inicio, fin exclusivo, clave, info del término)
+        """
+        if not self.terminos:
+            return []
+        texto_lower = texto.lower()
+        if len(texto_lower) != len(texto):
+            # Mantener offsets: no expandir caracteres como 'İ'
+            texto_lower = "".join(c.lower() if len(c.lower()) == 1 else c for c in texto)
+
+        encontrados = []
+        for end_pos, (_, clave) in self.automaton.iter(texto_lower):
+            start_pos = end_pos - len(clave) + 1
+            if (start_pos > 0 and texto_lower[start_pos - 1].isalnum()) or \
+               (end_pos + 1 < len(texto_lower) and texto_lower[end_pos + 1].isalnum()):
+                continue
+            encontrados.append((start_pos, end_pos + 1, clave, self.terminos[clave]))
+        return encontrados
+
+    def con_cambios(
+        self,
+        filas: List[MedicalTerminology],
+        estado: Tuple[int, Optional[str]]
+    ) -> "IndiceTerminologia":
+        """
+        Nuevo snapshot con los términos modificados aplicados sobre éste.
+
+        Solo se tocan las claves de esos términos en una copia del trie y se
+        recalculan los enlaces de fallo; no se vuelve a leer la tabla.
+        """
+        terminos = dict(self.terminos)
+        claves_por_termino = {k: set(v) for k, v in self.claves_por_termino.items()}
+        automaton = pickle.loads(pickle.dumps(self.automaton))
+
+        for fila in filas:
+            term_id = str(fila.id)
+            for clave in claves_por_termino.pop(term_id, set()):
+                if terminos.get(clave, {}).get("term_id") == term_id:
+                    del terminos[clave]
+                    automaton.remove_word(clave)
+            if fila.activo:
+                nuevas = _claves_de_termino(fila)
+                claves_por_termino[term_id] = set(nuevas)
+                for clave, info in nuevas.items():
+                    terminos[clave] = info
+                    automaton.add_word(clave, (term_id, clave))
+
+        if terminos:
+            automaton.make_automaton()
+        return IndiceTerminologia(terminos, claves_por_termino, estado, automaton)
+
+
+def _version(estado: Tuple[int, Optional[str]]) -> str:
+    """Versión de snapshot para un estado (términos activos, último updated_at)."""
+    num_terminos, max_updated_at = estado
+    return hashlib.sha1(
+        f"{FORMATO_SNAPSHOT}|{num_terminos}|{max_updated_at}".encode()
+    ).hexdigest()[:16]
+
+
+def _claves_de_termino(termino: MedicalTerminology) -> Dict[str, Dict[str, Any]]:
+    """Claves de búsqueda de un término (normalizado, sinónimos, variantes ASR)."""
+    info = {
+        "term_id": str(termino.id),
+        "original": termino.termino_original,
+        "categoria": termino.categoria,
+        "definicion_italiana": termino.definicion_italiana,
+        "definicion_espanola": termino.definicion_espanola,
+        "especialidad": termino.especialidad_medica,
+        "nivel_complejidad": termino.nivel_complejidad,
+        "sinonimos": termino.sinonimos or [],
+        "variantes_asr": termino.variantes_asr or [],
+        "confianza": termino.confianza_correccion
+    }
+    claves = [termino.termino_normalizado, *(termino.sinonimos or []), *(termino.variantes_asr or [])]
+    return {clave.lower(): info for clave in claves if clave}
+
+
+class TerminologyIndexService(BaseService):
+    """
+    Autómata de terminología compartido por post-procesamiento, OCR y
+    estimación de dificultad.
+
+    La versión es (términos activos, último ``updated_at``). Al arrancar se
+    intenta cargar el snapshot de esa versión desde disco (mmap) o MinIO;
+    solo si no existe se construye desde la base de datos. Los cambios
+    posteriores se aplican leyendo únicamente las filas modificadas.
+    """
+
+    def __init__(self):
+        super().__init__("TerminologyIndexService")
+        self.cache_dir = Path(tempfile.gettempdir()) / "axonote_terminology"
+        self.intervalo_refresco_sec = settings.TERMINOLOGY_INDEX_REFRESH_SEC
+        self._indice: Optional[IndiceTerminologia] = None
+        self._ultima_verificacion = 0.0
+        # Un lock por event loop: los workers Celery crean un loop por tarea
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.estadisticas = {
+            "construcciones_completas": 0,
+            "actualizaciones_incrementales": 0,
+            "cargas_snapshot_local": 0,
+            "cargas_snapshot_minio": 0
+        }
+
+    def indice_actual(self) -> Optional[IndiceTerminologia]:
+        """Snapshot cargado en este proceso, sin verificar la versión (síncrono)."""
+        return self._indice
+
+    async def obtener_indice(self) -> IndiceTerminologia:
+        """
+        Obtener el índice vigente, refrescándolo si la terminología cambió.
+
+        La versión se comprueba como mucho cada ``TERMINOLOGY_INDEX_REFRESH_SEC``.
+        """
+        if self._indice is not None and time.time() - self._ultima_verificacion < self.intervalo_refresco_sec:
+            return self._indice
+
+        async with self._lock_del_loop():
+            if self._indice is None or time.time() - self._ultima_verificacion >= self.intervalo_refresco_sec:
+                async for db in get_async_db():
+                    await self._refrescar(db)
+                self._ultima_verificacion = time.time()
+        return self._indice
+
+    def _lock_del_loop(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def invalidar(self) -> None:
+        """Forzar la comprobación de versión en la siguiente consulta (tras editar términos)."""
+        self._ultima_verificacion = 0.0
+
+    async def _refrescar(self, db) -> None:
+        """Llevar el índice a la versión actual de la tabla."""
+        estado = await self._estado_terminologia(db)
+        if self._indice is not None and self._indice.estado == estado:
+            return
+
+        if self._indice is None:
+            indice = await self._cargar_snapshot(estado)
+            guardar = False
+        else:
+            indice = await self._actualizar_incremental(db, estado)
+            guardar = True
+
+        if indice is None:
+            indice = await self._construir_completo(db, estado)
+            self.estadisticas["construcciones_completas"] += 1
+            guardar = True
+
+        if guardar:
+            await self._guardar_snapshot(indice)
+
+        self._indice = indice
+        self.logger.info(
+            "Índice de terminología listo",
+            extra={"version": indice.version, "claves": len(indice.terminos)}
+        )
+
+    @staticmethod
+    async def _estado_terminologia(db) -> Tuple[int, Optional[str]]:
+        """(términos activos, último updated_at de cualquier término)."""
+        activos = await db.scalar(
+            select(func.count()).select_from(MedicalTerminology).where(MedicalTerminology.activo.is_(True))
+        )
+        ultimo = await db.scalar(select(func.max(MedicalTerminology.updated_at)))
+        return int(activos or 0), ultimo.isoformat() if ultimo else None
+
+    async def _construir_completo(self, db, estado: Tuple[int, Optional[str]]) -> IndiceTerminologia:
+        """Leer todos los términos activos y construir el autómata."""
+        result = await db.execute(
+            select(MedicalTerminology).where(MedicalTerminology.activo.is_(True))
+        )
+        terminos: Dict[str, Dict[str, Any]] = {}
+        claves_por_termino: Dict[str, Set[str]] = {}
+        for fila in result.scalars():
+            claves = _claves_de_termino(fila)
+            terminos.update(claves)
+            claves_por_termino[str(fila.id)] = set(claves)
+
+        return await asyncio.get_event_loop().run_in_executor(
+            None, IndiceTerminologia, terminos, claves_por_termino, estado
+        )
+
+    async def _actualizar_incremental(
+        self,
+        db,
+        estado: Tuple[int, Optional[str]]
+    ) -> Optional[IndiceTerminologia]:
+        """
+        Aplicar solo las filas modificadas desde el snapshot actual.
+
+        Returns:
+            Nuevo índice, o None si hubo borrados físicos (hace falta reconstruir)
+        """
+        _, desde = self._indice.estado
+        consulta = select(MedicalTerminology)
+        if desde:
+            consulta = consulta.where(MedicalTerminology.updated_at > datetime.fromisoformat(desde))
+        filas = list((await db.execute(consulta)).scalars())
+
+        indice = await asyncio.get_event_loop().run_in_executor(
+            None, self._indice.con_cambios, filas, estado
+        )
+        if len(indice.claves_por_termino) != estado[0]:
+            return None
+
+        self.estadisticas["actualizaciones_incrementales"] += 1
+        self.logger.info(
+            "Índice de terminología actualizado incrementalmente",
+            extra={"terminos_modificados": len(filas), "version": indice.version}
+        )
+        return indice
+
+    def _ruta_snapshot(self, version: str) -> Path:
+        return self.cache_dir / f"{version}.pkl"
+
+    async def _cargar_snapshot(self, estado: Tuple[int, Optional[str]]) -> Optional[IndiceTerminologia]:
+        """Cargar el snapshot de esta versión desde disco o, si no, desde MinIO."""
+        version = _version(estado)
+        ruta = self._ruta_snapshot(version)
+
+        if not ruta.exists():
+            try:
+                object_name = f"{PREFIJO}/{version}.pkl"
+                if not await minio_service.object_exists(object_name):
+                    return None
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                ruta_tmp = ruta.with_suffix(".part")
+                await minio_service.download_to_file(object_name, str(ruta_tmp))
+                os.replace(ruta_tmp, ruta)
+                self.estadisticas["cargas_snapshot_minio"] += 1
+            except Exception as e:
+                self.logger.warning(
+                    "Snapshot de terminología no disponible en MinIO",
+                    extra={"version": version, "error": str(e)}
+                )
+                return None
+        else:
+            self.estadisticas["cargas_snapshot_local"] += 1
+
+        def cargar() -> IndiceTerminologia:
+            with open(ruta, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+                snapshot = pickle.loads(datos)
+            return IndiceTerminologia(
+                snapshot["terminos"], snapshot["claves_por_termino"], estado, snapshot["automaton"]
+            )
+
+        try:
+            return await asyncio.get_event_loop().run_in_executor(None, cargar)
+        except Exception as e:
+            self.logger.warning(
+                "Snapshot de terminología corrupto, se reconstruye",
+                extra={"version": version, "error": str(e)}
+            )
+            ruta.unlink(missing_ok=True)
+            return None
+
+    async def _guardar_snapshot(self, indice: IndiceTerminologia) -> None:
+        """Persistir el snapshot en disco y MinIO (best-effort)."""
+        datos = await asyncio.get_event_loop().run_in_executor(
+            None,
+            lambda: pickle.dumps({
+                "terminos": indice.terminos,
+                "claves_por_termino": indice.claves_por_termino,
+                "automaton": indice.automaton
+            }, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            ruta = self._ruta_snapshot(indice.version)
+            ruta_tmp = ruta.with_suffix(".part")
+            ruta_tmp.write_bytes(datos)
+            os.replace(ruta_tmp, ruta)
+
+            await minio_service.upload_file(
+                io.BytesIO(datos),
+                f"{PREFIJO}/{indice.version}.pkl",
+                content_type="application/octet-stream",
+                metadata={"claves": str(len(indice.terminos))}
+            )
+        except Exception as e:
+            self.logger.warning(
+                "No se pudo persistir el snapshot de terminología",
+                extra={"version": indice.version, "error": str(e)}
+            )
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Verificar estado del servicio."""
+        return {
+            "service": "TerminologyIndexService",
+            "status": "healthy" if self._indice is not None else "not_loaded",
+            "version": self._indice.version if self._indice else None,
+            "claves": len(self._indice.terminos) if self._indice else 0,
+            "estadisticas": self.estadisticas.copy()
+        }
+
+
+# Instancia global del servicio
+terminology_index_service = TerminologyIndexService()
@@ -0,0 +1,349 @@
+"""
+Almacenamiento columnar de segmentos y palabras de transcripción.
+Serializa los segmentos de Whisper como columnas NumPy en un artefacto
+binario en MinIO y responde consultas por rango de tiempo sin cargarlo entero.
+"""
+
+import asyncio
+import io
+import json
+import os
+import struct
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core import settings
+from app.services.base import BaseService
+from app.services.minio_service import minio_service
+
+
+MAGIC = b"AXSEGV1\0"
+ALINEACION = 64
+PREFIJO = "transcripts"
+
+
+class TablaSegmentos:
+    """
+    Segmentos de una transcripción en formato columnar.
+
+    Disposición del artefacto: ``MAGIC``, longitud de cabecera (uint32 LE),
+    cabecera JSON y columnas alineadas a 64 bytes. Las columnas se abren con
+    memory-mapping, de modo que una consulta solo toca las páginas de los
+    segmentos que devuelve.
+
+    Columnas de segmentos: ``seg_start``, ``seg_end``, ``seg_end_max``
+    (máximo acumulado de ``seg_end``, para el bisect), ``seg_confidence``,
+    ``seg_texto`` + ``seg_texto_offsets`` y ``seg_palabras_offsets``.
+    Columnas de palabras: ``pal_start``, ``pal_end``, ``pal_prob`` y
+    ``pal_id``, índice en la tabla de strings ``vocab`` + ``vocab_offsets``.
+    """
+
+    def __init__(self, columnas: Dict[str, np.ndarray]):
+        self.columnas = columnas
+
+    @classmethod
+    def desde_segmentos(cls, segmentos: List[Dict[str, Any]]) -> "TablaSegmentos":
+        """Construir la tabla a partir de segmentos serializados de Whisper."""
+        segmentos = sorted(segmentos, key=lambda s: s["start"])
+        num_segmentos = len(segmentos)
+
+        textos = [str(s.get("text", "")).encode("utf-8") for s in segmentos]
+        palabras = [s.get("words") or [] for s in segmentos]
+
+        vocab: Dict[str, int] = {}
+        pal_id = []
+        for lista in palabras:
+            for palabra in lista:
+                pal_id.append(vocab.setdefault(str(palabra.get("word", "")), len(vocab)))
+        vocab_bytes = [p.encode("utf-8") for p in vocab]
+
+        seg_end = np.array([s["end"] for s in segmentos], dtype="<f8")
+        columnas = {
+            "seg_start": np.array([s["start"] for s in segmentos], dtype="<f8"),
+            "seg_end": seg_end,
+            "seg_end_max": np.maximum.accumulate(seg_end) if num_segmentos else seg_end,
+            "seg_confidence": np.array([s.get("confidence", 0.0) for s in segmentos], dtype="<f4"),
+            "seg_texto_offsets": cls._offsets([len(t) for t in textos]),
+            "seg_texto": np.frombuffer(b"".join(textos), dtype="u1"),
+            "seg_palabras_offsets": cls._offsets([len(p) for p in palabras]),
+            "pal_start": np.array([p["start"] for lista in palabras for p in lista], dtype="<f8"),
+            "pal_end": np.array([p["end"] for lista in palabras for p in lista], dtype="<f8"),
+            "pal_prob": np.array(
+                [p.get("probability", 0.0) for lista in palabras for p in lista], dtype="<f4"
+            ),
+            "pal_id": np.array(pal_id, dtype="<i4"),
+            "vocab_offsets": cls._offsets([len(p) for p in vocab_bytes]),
+            "vocab": np.frombuffer(b"".join(vocab_bytes), dtype="u1"),
+        }
+        return cls(columnas)
+
+    @staticmethod
+    def _offsets(longitudes: List[int]) -> np.ndarray:
+        offsets = np.zeros(len(longitudes) + 1, dtype="<i8")
+        if longitudes:
+            np.cumsum(longitudes, out=offsets[1:])
+        return offsets
+
+    def a_bytes(self) -> bytes:
+        """Serializar la tabla al formato del artefacto."""
+        descripcion = {}
+        offset = 0
+        for nombre, columna in self.columnas.items():
+            descripcion[nombre] = {
+                "dtype": columna.dtype.str,
+                "longitud": int(columna.shape[0]),
+                "offset": offset
+            }
+            offset = self._alinear(offset + columna.nbytes)
+
+        cabecera = json.dumps({
+            "version": 1,
+            "num_segmentos": self.num_segmentos,
+            "num_palabras": int(self.columnas["pal_start"].shape[0]),
+            "columnas": descripcion
+        }).encode("utf-8")
+        inicio_datos = self._alinear(len(MAGIC) + 4 + len(cabecera))
+
+        salida = io.BytesIO()
+        salida.write(MAGIC)
+        salida.write(struct.pack("<I", len(cabecera)))
+        salida.write(cabecera)
+        for nombre, columna in self.columnas.items():
+            salida.seek(inicio_datos + descripcion[nombre]["offset"])
+            salida.write(columna.tobytes())
+        return salida.getvalue()
+
+    @staticmethod
+    def _alinear(posicion: int) -> int:
+        return (posicion + ALINEACION - 1) // ALINEACION * ALINEACION
+
+    @classmethod
+    def abrir(cls, ruta: str) -> "TablaSegmentos":
+        """Mapear en memoria un artefacto local."""
+        with open(ruta, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Artefacto de segmentos no válido: {ruta}")
+            (longitud_cabecera,) = struct.unpack("<I", f.read(4))
+            cabecera = json.loads(f.read(longitud_cabecera))
+        inicio_datos = cls._alinear(len(MAGIC) + 4 + longitud_cabecera)
+
+        columnas = {}
+        for nombre, info in cabecera["columnas"].items():
+            dtype = np.dtype(info["dtype"])
+            if info["longitud"] == 0:
+                columnas[nombre] = np.zeros(0, dtype=dtype)
+            else:
+                columnas[nombre] = np.memmap(
+                    ruta, dtype=dtype, mode="r",
+                    offset=inicio_datos + info["offset"], shape=(info["longitud"],)
+                )
+        return cls(columnas)
+
+    @property
+    def num_segmentos(self) -> int:
+        return int(self.columnas["seg_start"].shape[0])
+
+    def indices_en_rango(self, t0: float, t1: float) -> np.ndarray:
+        """
+        Índices de los segmentos que solapan ``[t0, t1)``, en orden temporal.
+
+        Dos búsquedas binarias acotan el rango: los segmentos anteriores a
+        ``lo`` terminan antes de ``t0`` y los posteriores a ``hi`` empiezan
+        después de ``t1``.
+        """
+        lo = int(np.searchsorted(self.columnas["seg_end_max"], t0, side="right"))
+        hi = int(np.searchsorted(self.columnas["seg_start"], t1, side="left"))
+        if hi <= lo:
+            return np.zeros(0, dtype=np.int64)
+        candidatos = np.arange(lo, hi)
+        return candidatos[np.asarray(self.columnas["seg_end"][lo:hi]) > t0]
+
+    def segmento(self, i: int, incluir_palabras: bool = True) -> Dict[str, Any]:
+        """Reconstruir un segmento en el formato de ``SegmentoTranscripcion``."""
+        c = self.columnas
+        t_ini, t_fin = c["seg_texto_offsets"][i], c["seg_texto_offsets"][i + 1]
+        segmento = {
+            "start": float(c["seg_start"][i]),
+            "end": float(c["seg_end"][i]),
+            "text": bytes(c["seg_texto"][t_ini:t_fin]).decode("utf-8"),
+            "confidence": float(c["seg_confidence"][i]),
+            "words": None
+        }
+        p_ini, p_fin = int(c["seg_palabras_offsets"][i]), int(c["seg_palabras_offsets"][i + 1])
+        if incluir_palabras and p_fin > p_ini:
+            segmento["words"] = [
+                {
+                    "word": self._palabra(int(c["pal_id"][j])),
+                    "start": float(c["pal_start"][j]),
+                    "end": float(c["pal_end"][j]),
+                    "probability": float(c["pal_prob"][j])
+                }
+                for j in range(p_ini, p_fin)
+            ]
+        return segmento
+
+    def _palabra(self, vocab_id: int) -> str:
+        offsets = self.columnas["vocab_offsets"]
+        return bytes(self.columnas["vocab"][offsets[vocab_id]:offsets[vocab_id + 1]]).decode("utf-8")
+
+    def consultar(self, t0: float, t1: float, incluir_palabras: bool = True) -> List[Dict[str, Any]]:
+        """Segmentos que solapan ``[t0, t1)``."""
+        return [self.segmento(int(i), incluir_palabras) for i in self.indices_en_rango(t0, t1)]
+
+    def pagina(
+        self,
+        t0: Optional[float] = None,
+        t1: Optional[float] = None,
+        cursor: int = 0,
+        limite: int = 100,
+        incluir_palabras: bool = True
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Página de segmentos a partir de un cursor, opcionalmente acotada en tiempo.
+
+        El cursor es el índice del segmento en orden temporal; cada segmento
+        devuelto incluye su ``indice``.
+
+        Returns:
+            Tupla (segmentos, cursor siguiente o None si no hay más)
+        """
+        if t0 is None and t1 is None:
+            fin = min(self.num_segmentos, cursor + limite + 1)
+            indices = np.arange(cursor, fin) if fin > cursor else np.zeros(0, dtype=np.int64)
+        else:
+            indices = self.indices_en_rango(
+                t0 if t0 is not None else float("-inf"),
+                t1 if t1 is not None else float("inf")
+            )
+            indices = indices[indices >= cursor]
+
+        siguiente = int(indices[limite]) if len(indices) > limite else None
+        segmentos = []
+        for i in indices[:limite]:
+            segmento = self.segmento(int(i), incluir_palabras)
+            segmento["indice"] = int(i)
+            segmentos.append(segmento)
+        return segmentos, siguiente
+
+
+class TranscriptStoreService(BaseService):
+    """
+    Artefactos columnares de transcripción en MinIO.
+
+    El artefacto se descarga una vez por nodo a un directorio local y se
+    mantiene mapeado en memoria; las consultas por rango solo materializan
+    los segmentos pedidos.
+    """
+
+    MAX_TABLAS_ABIERTAS = 16
+
+    def __init__(self):
+        super().__init__("TranscriptStoreService")
+        self.cache_dir = Path(tempfile.gettempdir()) / "axonote_transcripts"
+        self._tablas: Dict[str, TablaSegmentos] = {}
+        self._lock = threading.Lock()
+
+    async def guardar(self, transcription_id: str, segmentos: List[Dict[str, Any]]) -> str:
+        """
+        Serializar y subir los segmentos de una transcripción.
+
+        Returns:
+            Nombre del objeto en MinIO
+        """
+        loop = asyncio.get_event_loop()
+        datos = await loop.run_in_executor(
+            None, lambda: TablaSegmentos.desde_segmentos(segmentos).a_bytes()
+        )
+
+        object_name = f"{PREFIJO}/{transcription_id}.axseg"
+        await minio_service.upload_file(
+            io.BytesIO(datos),
+            object_name,
+            content_type="application/octet-stream",
+            metadata={"num_segmentos": str(len(segmentos))}
+        )
+
+        self.logger.info(
+            "Segmentos columnares guardados",
+            extra={
+                "transcription_id": transcription_id,
+                "num_segmentos": len(segmentos),
+                "tamano_bytes": len(datos)
+            }
+        )
+        return object_name
+
+    async def abrir(self, object_name: str) -> TablaSegmentos:
+        """Obtener la tabla mapeada de un artefacto, descargándolo si hace falta."""
+        with self._lock:
+            tabla = self._tablas.get(object_name)
+        if tabla is not None:
+            return tabla
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        ruta_local = self.cache_dir / Path(object_name).name
+        if not ruta_local.exists():
+            ruta_tmp = ruta_local.with_suffix(".part")
+            await minio_service.download_to_file(object_name, str(ruta_tmp))
+            os.replace(ruta_tmp, ruta_local)
+
+        tabla = TablaSegmentos.abrir(str(ruta_local))
+        with self._lock:
+            if len(self._tablas) >= self.MAX_TABLAS_ABIERTAS:
+                # Descartar la más antigua; su mmap se libera al perder referencias
+                self._tablas.pop(next(iter(self._tablas)))
+            self._tablas[object_name] = tabla
+        return tabla
+
+    async def consultar_rango(
+        self,
+        object_name: str,
+        t0: float,
+        t1: float,
+        incluir_palabras: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Segmentos que solapan ``[t0, t1)`` segundos.
+
+        Args:
+            object_name: Artefacto columnar en MinIO
+            t0: Inicio del rango en segundos
+            t1: Fin del rango en segundos
+            incluir_palabras: Incluir las palabras con timestamps
+
+        Returns:
+            Segmentos en el formato de ``SegmentoTranscripcion``
+        """
+        tabla = await self.abrir(object_name)
+        return tabla.consultar(t0, t1, incluir_palabras)
+
+    async def obtener_tabla(
+        self,
+        object_name: Optional[str],
+        segmentos_json: Optional[List[Dict[str, Any]]] = None
+    ) -> TablaSegmentos:
+        """
+        Tabla de una transcripción: el artefacto mapeado si existe o, para
+        transcripciones antiguas, una tabla en memoria construida del JSON.
+        """
+        if object_name:
+            return await self.abrir(object_name)
+        return TablaSegmentos.desde_segmentos(segmentos_json or [])
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Verificar estado del servicio."""
+        return {
+            "service": "TranscriptStoreService",
+            "status": "healthy",
+            "enabled": settings.TRANSCRIPT_COLUMNAR_ENABLED,
+            "cache_dir": str(self.cache_dir),
+            "tablas_abiertas": len(self._tablas)
+        }
+
+
+# Instancia global del servicio
+transcript_store_service = TranscriptStoreService()
@@ -4,10 +4,12 @@ Optimizado para hardware RTX 4090 y procesamiento de clases médicas.
 """
 
 import asyncio
+import json
 import os
+import subprocess
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 import torch
@@ -15,7 +17,10 @@ import torch
 from pydantic import BaseModel
 
 from app.core import api_logger, settings
+from app.services.audio_buffer import get_audio_buffer
 from app.services.base import BaseService, ServiceNotAvailableError
+from app.services.inference_executor import inference_executor
+from app.services.model_registry import whisper_model_registry
 
 
 class SegmentoTranscripcion(BaseModel):
@@ -73,6 +78,7 @@ class WhisperService(BaseService):
         self.compute_type: str = "float16" if self.device == "cuda" else "int8"
         self.modelo_size: str = settings.WHISPER_MODEL
         self.modelo_cargado: bool = False
+        self.gpu_memoria_gb: Optional[float] = None
         
         # Configuraciones predefinidas
         self.configuraciones = self._get_configuraciones_whisper()
@@ -185,6 +191,7 @@ class WhisperService(BaseService):
             
             gpu_memory = torch.cuda.get_device_properties(0).total_memory
             gpu_memory_gb = gpu_memory / (1024**3)
+            self.gpu_memoria_gb = gpu_memory_gb
             
             self.logger.info(
                 "Hardware CUDA detectado",
@@ -202,57 +209,125 @@ class WhisperService(BaseService):
                 self.modelo_size = "medium"
 
     async def _cargar_modelo_whisper(self) -> None:
-        """Cargar modelo Whisper optimizado."""
+        """Precalentar el modelo por defecto en el registro de modelos."""
         try:
-            model_dir = Path("models/whisper")
-            model_dir.mkdir(parents=True, exist_ok=True)
-            
-            self.logger.info(
-                "Cargando modelo Whisper",
-                modelo=self.modelo_size,
-                device=self.device,
-                compute_type=self.compute_type
+            self.modelo_whisper = await inference_executor.ejecutar(
+                self._obtener_modelo,
+                self.modelo_size,
+                self.compute_type,
+                descripcion="whisper_carga_modelo"
             )
-            
-            # Configurar parámetros de carga
-            model_kwargs = {
-                "device": self.device,
-                "compute_type": self.compute_type,
-                "download_root": str(model_dir),
-                "local_files_only": False
-            }
-            
-            if self.device == "cuda":
-                model_kwargs.update({
-                    "device_index": 0,
-                    "cpu_threads": 8,
-                    "num_workers": 1
-                })
-            
-            # self.modelo_whisper = WhisperModel(
-            #     self.modelo_size,
-            #     **model_kwargs
-            # )
-            self.modelo_whisper = None  # Temporalmente deshabilitado
-            
-            # Test de carga exitosa
-            # info = self.modelo_whisper.get_model_info()  # Temporalmente deshabilitado
-            self.logger.info(
-                "Modelo Whisper cargado exitosamente (simulado)",
-                modelo=self.modelo_size,
-                device=self.device
-            )
-            
         except Exception as e:
             self.logger.error("Error cargando modelo Whisper", error=str(e))
             raise
 
+    # Memoria aproximada por tamaño de modelo en float16 (MB)
+    MEMORIA_MODELOS_MB = {
+        "tiny": 150,
+        "base": 300,
+        "small": 1000,
+        "medium": 2600,
+        "large-v2": 4800,
+        "large-v3": 4800
+    }
+
+    def _estimar_memoria_mb(self, modelo_size: str, compute_type: str) -> float:
+        """Estimar la memoria de un modelo para el presupuesto del registro."""
+        memoria = self.MEMORIA_MODELOS_MB.get(modelo_size, self.MEMORIA_MODELOS_MB["large-v3"])
+        if compute_type.startswith("int8"):
+            memoria *= 0.55
+        elif compute_type == "float32":
+            memoria *= 2
+        return float(memoria)
+
+    def _resolver_modelo(self, config: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Obtener (tamaño, compute_type) del preset adaptado al hardware.
+        
+        En CPU los compute_type float16 no están soportados y se usa int8;
+        con poca memoria GPU los modelos large bajan a medium.
+        """
+        modelo_size = config.get("model_size") or self.modelo_size
+        compute_type = config.get("compute_type") or self.compute_type
+        
+        if self.device != "cuda" and "float16" in compute_type:
+            compute_type = "int8"
+        
+        if (
+            modelo_size.startswith("large")
+            and self.gpu_memoria_gb is not None
+            and self.gpu_memoria_gb < 8
+        ):
+            modelo_size = "medium"
+        
+        return modelo_size, compute_type
+
+    def modelo_para_preset(self, configuracion: str) -> str:
+        """Identificador ``tamaño-compute_type`` del modelo que usará un preset."""
+        config = self.configuraciones.get(configuracion, self.configuraciones["MEDICAL_HIGH_PRECISION"])
+        return "-".join(self._resolver_modelo(config))
+
+    def _obtener_modelo(self, modelo_size: str, compute_type: str) -> Any:
+        """Obtener el modelo del registro, cargándolo si no está caliente (bloqueante)."""
+        return whisper_model_registry.obtener(
+            (modelo_size, compute_type),
+            lambda: self._crear_modelo_whisper(modelo_size, compute_type),
+            self._estimar_memoria_mb(modelo_size, compute_type)
+        )
+
+    def _crear_modelo_whisper(self, modelo_size: str, compute_type: str) -> Any:
+        """Construir un modelo Whisper optimizado (se ejecuta en el executor)."""
+        model_dir = Path("models/whisper")
+        model_dir.mkdir(parents=True, exist_ok=True)
+        
+        self.logger.info(
+            "Cargando modelo Whisper",
+            extra={
+                "modelo": modelo_size,
+                "device": self.device,
+                "compute_type": compute_type
+            }
+        )
+        
+        # Configurar parámetros de carga
+        model_kwargs = {
+            "device": self.device,
+            "compute_type": compute_type,
+            "download_root": str(model_dir),
+            "local_files_only": False
+        }
+        
+        if self.device == "cuda":
+            model_kwargs.update({
+                "device_index": 0,
+                "cpu_threads": 8,
+                "num_workers": 1
+            })
+        
+        # modelo = WhisperModel(
+        #     modelo_size,
+        #     **model_kwargs
+        # )
+        modelo = None  # Temporalmente deshabilitado
+        
+        # Test de carga exitosa
+        # info = modelo.get_model_info()  # Temporalmente deshabilitado
+        self.logger.info(
+            "Modelo Whisper cargado exitosamente (simulado)",
+            extra={
+                "modelo": modelo_size,
+                "device": self.device
+            }
+        )
+        return modelo
+
     async def transcribir_audio(
         self,
         ruta_audio: str,
         configuracion: str = "MEDICAL_HIGH_PRECISION",
         idioma: Optional[str] = None,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        job_id: Optional[str] = None
     ) -> ResultadoTranscripcion:
         """
         Transcribir archivo de audio con configuración optimizada.
@@ -262,6 +337,7 @@ class WhisperService(BaseService):
             configuracion: Nombre de configuración predefinida
             idioma: Código de idioma (it, en, es) o None para auto-detect
             progress_callback: Función para reportar progreso
+            job_id: ID del ProcessingJob, permite cancelar la inferencia
             
         Returns:
             ResultadoTranscripcion con transcripción completa y metadatos
@@ -299,40 +375,32 @@ class WhisperService(BaseService):
             if progress_callback:
                 await progress_callback({"stage": "analisis_completado", "progress": 10.0})
             
-            # Transcribir con Whisper
-            segmentos, info_transcripcion = self.modelo_whisper.transcribe(
-                ruta_audio,
-                **{k: v for k, v in config.items() if k != "vad_parameters"}
-            )
+            if self._usar_long_form(ruta_audio, caracteristicas):
+                # Clases largas: VAD + ventanas acotadas transcritas en paralelo
+                lista_segmentos, idioma_detectado = await self._transcribir_long_form(
+                    ruta_audio, config, progress_callback, job_id
+                )
+            else:
+                # Transcribir con Whisper en el executor de inferencia
+                segmentos, info_transcripcion = await inference_executor.ejecutar(
+                    self._transcribir_sync,
+                    ruta_audio,
+                    config,
+                    job_id=job_id,
+                    descripcion="whisper_asr"
+                )
+                lista_segmentos = [self._convertir_segmento(segmento, config) for segmento in segmentos]
+                idioma_detectado = info_transcripcion.language
             
             if progress_callback:
                 await progress_callback({"stage": "transcripcion_completada", "progress": 80.0})
             
-            # Procesar segmentos
-            lista_segmentos = []
-            texto_completo_partes = []
-            
-            for segmento in segmentos:
-                segmento_obj = SegmentoTranscripcion(
-                    start=segmento.start,
-                    end=segmento.end,
-                    text=segmento.text.strip(),
-                    confidence=getattr(segmento, 'avg_logprob', 0.0),
-                    words=[
-                        {
-                            "word": word.word,
-                            "start": word.start,
-                            "end": word.end,
-                            "probability": word.probability
-                        }
-                        for word in getattr(segmento, 'words', [])
-                    ] if config.get("word_timestamps", False) else None
-                )
-                lista_segmentos.append(segmento_obj)
-                texto_completo_partes.append(segmento.text.strip())
-            
             # Construir texto completo
-            texto_completo = " ".join(texto_completo_partes).strip()
+            texto_completo = " ".join(s.text for s in lista_segmentos if s.text).strip()
+            
+            # Duración desconocida en cabeceras: usar el final del último segmento
+            if caracteristicas.duracion_sec <= 0 and lista_segmentos:
+                caracteristicas.duracion_sec = max(seg.end for seg in lista_segmentos)
             
             # Calcular métricas
             tiempo_procesamiento = time.time() - inicio_tiempo
@@ -344,13 +412,13 @@ class WhisperService(BaseService):
             resultado = ResultadoTranscripcion(
                 texto_completo=texto_completo,
                 segmentos=lista_segmentos,
-                idioma_detectado=info_transcripcion.language,
+                idioma_detectado=idioma_detectado,
                 confianza_global=float(confianza_global),
                 duracion_audio_sec=caracteristicas.duracion_sec,
                 tiempo_procesamiento_sec=tiempo_procesamiento,
                 num_palabras=num_palabras,
                 palabras_por_minuto=palabras_por_minuto,
-                modelo_usado=f"{self.modelo_size}-{self.compute_type}",
+                modelo_usado="-".join(self._resolver_modelo(config)),
                 configuracion_usada=config
             )
             
@@ -366,7 +434,7 @@ class WhisperService(BaseService):
                 tiempo_procesamiento=tiempo_procesamiento,
                 num_palabras=num_palabras,
                 confianza_global=confianza_global,
-                idioma_detectado=info_transcripcion.language
+                idioma_detectado=idioma_detectado
             )
             
             return resultado
@@ -382,59 +450,524 @@ class WhisperService(BaseService):
             )
             raise
 
-    async def _analizar_audio(self, ruta_audio: str) -> CaracteristicasAudio:
-        """Analizar características del archivo de audio."""
-        try:
-            import soundfile as sf
-            import librosa
+    async def transcribir_fragmento(
+        self,
+        audio: np.ndarray,
+        offset_sec: float = 0.0,
+        configuracion: str = "MEDICAL_HIGH_PRECISION",
+        idioma: Optional[str] = None,
+        job_id: Optional[str] = None
+    ) -> Tuple[List[SegmentoTranscripcion], str]:
+        """
+        Transcribir un fragmento de audio ya decodificado (float32, 16 kHz mono).
+        
+        Args:
+            audio: Muestras del fragmento
+            offset_sec: Posición del fragmento en la grabación completa
+            configuracion: Nombre de configuración predefinida
+            idioma: Código de idioma o None para auto-detect
+            job_id: ID del ProcessingJob, permite cancelar la inferencia
             
-            # Cargar información básica
-            info = sf.info(ruta_audio)
+        Returns:
+            Tupla (segmentos con timestamps globales, idioma detectado)
+        """
+        if not self.modelo_cargado:
+            await self._setup()
+        
+        config = self.configuraciones.get(configuracion, self.configuraciones["MEDICAL_HIGH_PRECISION"])
+        if idioma:
+            config = config.copy()
+            config["language"] = idioma
+        
+        segmentos, info = await inference_executor.ejecutar(
+            self._transcribir_sync,
+            audio,
+            config,
+            job_id=job_id,
+            descripcion="whisper_asr_fragmento"
+        )
+        return (
+            [self._convertir_segmento(segmento, config, offset_sec=offset_sec) for segmento in segmentos],
+            info.language
+        )
+
+    def _transcribir_sync(self, ruta_audio: Any, config: Dict[str, Any]) -> Tuple[List[Any], Any]:
+        """
+        Ejecutar Whisper de forma síncrona dentro del executor de inferencia.
+        
+        ``ruta_audio`` puede ser una ruta o un array float32 a 16 kHz (ventanas
+        del modo long-form y fragmentos incrementales).
+        
+        faster-whisper devuelve un generador perezoso: la decodificación ocurre
+        al iterarlo, por lo que se materializa aquí (fuera del event loop) y se
+        verifica la cancelación entre segmentos.
+        """
+        # Modelo del preset (caliente en el registro o cargado ahora)
+        modelo = self._obtener_modelo(*self._resolver_modelo(config))
+        
+        segmentos, info_transcripcion = modelo.transcribe(
+            ruta_audio,
+            **{
+                k: v for k, v in config.items()
+                if k not in ("vad_parameters", "model_size", "compute_type")
+            }
+        )
+        
+        lista_segmentos = []
+        for segmento in segmentos:
+            inference_executor.verificar_cancelacion()
+            lista_segmentos.append(segmento)
+        
+        return lista_segmentos, info_transcripcion
+
+    def _transcribir_ventana_sync(
+        self,
+        buffer: Any,
+        inicio: float,
+        fin: float,
+        config: Dict[str, Any]
+    ) -> Tuple[List[Any], Any]:
+        """Materializar una ventana del buffer y transcribirla (ejecuta en el worker)."""
+        return self._transcribir_sync(buffer.segmento_float32(inicio, fin), config)
+
+    @staticmethod
+    def _convertir_segmento(
+        segmento: Any,
+        config: Dict[str, Any],
+        offset_sec: float = 0.0
+    ) -> SegmentoTranscripcion:
+        """Convertir un segmento de faster-whisper desplazando sus tiempos."""
+        return SegmentoTranscripcion(
+            start=segmento.start + offset_sec,
+            end=segmento.end + offset_sec,
+            text=segmento.text.strip(),
+            confidence=getattr(segmento, 'avg_logprob', 0.0),
+            words=[
+                {
+                    "word": word.word,
+                    "start": word.start + offset_sec,
+                    "end": word.end + offset_sec,
+                    "probability": word.probability
+                }
+                for word in (getattr(segmento, 'words', None) or [])
+            ] if config.get("word_timestamps", False) else None
+        )
+
+    def _usar_long_form(self, ruta_audio: str, caracteristicas: CaracteristicasAudio) -> bool:
+        """Decidir si la grabación se trocea por VAD (requiere WAV PCM mapeable)."""
+        if not settings.WHISPER_LONGFORM_ENABLED:
+            return False
+        if caracteristicas.duracion_sec < settings.WHISPER_LONGFORM_MIN_DURATION_SEC:
+            return False
+        try:
+            get_audio_buffer(ruta_audio)
+            return True
+        except ValueError:
+            return False
+
+    async def _transcribir_long_form(
+        self,
+        ruta_audio: str,
+        config: Dict[str, Any],
+        progress_callback: Optional[callable] = None,
+        job_id: Optional[str] = None
+    ) -> Tuple[List[SegmentoTranscripcion], str]:
+        """
+        Transcribir una clase larga por ventanas de habla en paralelo.
+        
+        1. VAD sobre el audio mapeado en memoria (por bloques, memoria acotada)
+        2. Empaquetado de regiones de habla en ventanas de duración máxima fija
+        3. Transcripción concurrente de las ventanas en el executor de inferencia
+        4. Unión de segmentos con timestamps globales y descarte del solape
+        
+        Returns:
+            Tupla (segmentos ordenados, idioma detectado)
+        """
+        buffer = get_audio_buffer(ruta_audio)
+        
+        regiones_vad = await inference_executor.ejecutar(
+            self._detectar_voz_sync,
+            buffer,
+            config.get("vad_parameters") or {},
+            job_id=job_id,
+            descripcion="whisper_vad"
+        )
+        ventanas = self._empaquetar_ventanas(
+            regiones_vad,
+            max_ventana_sec=float(settings.WHISPER_LONGFORM_WINDOW_SEC),
+            solape_sec=float(settings.WHISPER_LONGFORM_OVERLAP_SEC)
+        )
+        
+        self.logger.info(
+            "Transcripción long-form",
+            extra={
+                "ruta_audio": ruta_audio,
+                "regiones_vad": len(regiones_vad),
+                "ventanas": len(ventanas),
+                "duracion_sec": round(buffer.duracion_sec, 1)
+            }
+        )
+        
+        # El VAD ya se aplicó: cada ventana se transcribe completa
+        config_ventana = {
+            k: v for k, v in config.items()
+            if k not in ("vad_filter", "vad_parameters")
+        }
+        config_ventana["vad_filter"] = False
+        
+        completadas = 0
+        
+        async def transcribir_ventana(ventana: Dict[str, float]) -> Tuple[List[SegmentoTranscripcion], str]:
+            nonlocal completadas
+            # La copia float32 se hace en el worker: las ventanas en cola no
+            # retienen audio, solo sus límites
+            segmentos, info = await inference_executor.ejecutar(
+                self._transcribir_ventana_sync,
+                buffer,
+                ventana["inicio"],
+                ventana["fin"],
+                config_ventana,
+                job_id=job_id,
+                descripcion="whisper_asr_ventana"
+            )
+            resultado = [
+                self._convertir_segmento(segmento, config_ventana, offset_sec=ventana["inicio"])
+                for segmento in segmentos
+            ]
             
-            # Cargar audio para análisis
-            audio, sr = librosa.load(ruta_audio, sr=None, mono=True)
+            completadas += 1
+            if progress_callback:
+                await progress_callback({
+                    "stage": "transcripcion_ventanas",
+                    "progress": 10.0 + 70.0 * completadas / len(ventanas)
+                })
+            return resultado, info.language
+        
+        # El executor acota cuántas ventanas corren a la vez
+        resultados = await asyncio.gather(*(transcribir_ventana(v) for v in ventanas))
+        
+        segmentos_ventanas = [segmentos for segmentos, _ in resultados]
+        idiomas = [idioma for _, idioma in resultados if idioma]
+        idioma_detectado = (
+            max(set(idiomas), key=idiomas.count) if idiomas
+            else config.get("language") or "unknown"
+        )
+        
+        return self._unir_segmentos_ventanas(ventanas, segmentos_ventanas), idioma_detectado
+
+    def _detectar_voz_sync(
+        self,
+        buffer: Any,
+        vad_parameters: Dict[str, Any],
+        bloque_sec: float = 600.0
+    ) -> List[SegmentoVAD]:
+        """
+        Detectar regiones de habla con el VAD Silero de faster-whisper.
+        
+        El audio se procesa en bloques para no materializar la grabación
+        completa en float32. Sin faster-whisper disponible, se considera
+        habla todo el audio (las ventanas quedan a tamaño fijo).
+        """
+        try:
+            from faster_whisper.vad import VadOptions, get_speech_timestamps
+        except ImportError:
+            self.logger.warning("VAD de faster-whisper no disponible, ventanas de tamaño fijo")
+            return [SegmentoVAD(start=0.0, end=buffer.duracion_sec, confidence=0.0)]
+        
+        # Los campos de VadOptions varían entre versiones de faster-whisper
+        campos = getattr(VadOptions, "_fields", None) or VadOptions.__dataclass_fields__
+        opciones = VadOptions(**{k: v for k, v in vad_parameters.items() if k in campos})
+        sample_rate = buffer.sample_rate
+        
+        regiones: List[SegmentoVAD] = []
+        inicio_bloque = 0.0
+        while inicio_bloque < buffer.duracion_sec:
+            inference_executor.verificar_cancelacion()
+            fin_bloque = min(buffer.duracion_sec, inicio_bloque + bloque_sec)
+            audio = buffer.segmento_float32(inicio_bloque, fin_bloque)
             
-            # Calcular métricas básicas
-            duracion = len(audio) / sr
-            nivel_ruido = float(np.std(audio))
+            for marca in get_speech_timestamps(audio, opciones):
+                inicio = inicio_bloque + marca["start"] / sample_rate
+                fin = inicio_bloque + marca["end"] / sample_rate
+                # Unir regiones cortadas por el borde del bloque
+                if regiones and inicio - regiones[-1].end < 0.05:
+                    regiones[-1].end = fin
+                else:
+                    regiones.append(SegmentoVAD(start=inicio, end=fin, confidence=1.0))
             
-            # Estimar calidad
-            if nivel_ruido < 0.01:
-                calidad = "high"
-            elif nivel_ruido < 0.05:
-                calidad = "medium"
+            inicio_bloque = fin_bloque
+        
+        return regiones
+
+    @staticmethod
+    def _empaquetar_ventanas(
+        regiones: List[SegmentoVAD],
+        max_ventana_sec: float,
+        solape_sec: float
+    ) -> List[Dict[str, float]]:
+        """
+        Agrupar regiones de habla consecutivas en ventanas de duración acotada.
+        
+        Las regiones más largas que la ventana se parten con solape. Cada
+        ventana lleva además su tramo "propio" (``propio_inicio``,
+        ``propio_fin``): la mitad del solape pertenece a cada vecina, lo que
+        permite descartar duplicados al unir.
+        
+        Returns:
+            Lista de ventanas con ``inicio``, ``fin``, ``propio_inicio`` y ``propio_fin``
+        """
+        solape_sec = min(solape_sec, max_ventana_sec / 4)
+        paso = max_ventana_sec - solape_sec
+        
+        # Partir regiones demasiado largas
+        piezas: List[Tuple[float, float, bool]] = []  # (inicio, fin, continua_con_la_siguiente)
+        for region in regiones:
+            inicio = region.start
+            while region.end - inicio > max_ventana_sec:
+                piezas.append((inicio, inicio + max_ventana_sec, True))
+                inicio += paso
+            piezas.append((inicio, region.end, False))
+        
+        # Empaquetar piezas contiguas mientras quepan en la ventana
+        ventanas: List[Dict[str, float]] = []
+        for inicio, fin, partida in piezas:
+            if ventanas and not ventanas[-1]["partida"] and fin - ventanas[-1]["inicio"] <= max_ventana_sec:
+                ventanas[-1]["fin"] = fin
+                ventanas[-1]["partida"] = partida
             else:
-                calidad = "low"
-            
-            return CaracteristicasAudio(
-                duracion_sec=duracion,
-                sample_rate=info.samplerate,
-                canales=info.channels,
-                formato=info.format,
-                bitrate=None,  # No siempre disponible
-                nivel_ruido_estimado=nivel_ruido,
-                idioma_probable="it",  # Default para clases médicas
-                calidad_estimada=calidad
+                ventanas.append({"inicio": inicio, "fin": fin, "partida": partida})
+        
+        # Tramos propios: frontera en el centro del solape o del silencio entre ventanas
+        for i, ventana in enumerate(ventanas):
+            ventana["propio_inicio"] = ventanas[i - 1]["propio_fin"] if i > 0 else 0.0
+            if i + 1 < len(ventanas):
+                ventana["propio_fin"] = (ventana["fin"] + ventanas[i + 1]["inicio"]) / 2
+            else:
+                ventana["propio_fin"] = float("inf")
+            ventana.pop("partida")
+        
+        return ventanas
+
+    @staticmethod
+    def _unir_segmentos_ventanas(
+        ventanas: List[Dict[str, float]],
+        segmentos_ventanas: List[List[SegmentoTranscripcion]]
+    ) -> List[SegmentoTranscripcion]:
+        """
+        Unir los segmentos de todas las ventanas en una línea temporal global.
+        
+        Un segmento se conserva solo en la ventana dueña de su punto medio;
+        además se descartan repeticiones exactas de texto que se solapan en el tiempo.
+        """
+        unidos: List[SegmentoTranscripcion] = []
+        for ventana, segmentos in zip(ventanas, segmentos_ventanas, strict=True):
+            for segmento in segmentos:
+                medio = (segmento.start + segmento.end) / 2
+                if ventana["propio_inicio"] <= medio < ventana["propio_fin"]:
+                    unidos.append(segmento)
+        
+        unidos.sort(key=lambda s: (s.start, s.end))
+        
+        resultado: List[SegmentoTranscripcion] = []
+        for segmento in unidos:
+            if (
+                resultado
+                and segmento.start < resultado[-1].end
+                and segmento.text.lower() == resultado[-1].text.lower()
+            ):
+                continue
+            resultado.append(segmento)
+        return resultado
+
+    async def _analizar_audio(self, ruta_audio: str) -> CaracteristicasAudio:
+        """
+        Caracterizar el audio sin decodificarlo completo.
+        
+        Duración y formato salen de las cabeceras del contenedor; el ruido se
+        estima sobre una muestra espaciada de ventanas cortas, por lo que el
+        coste no depende de la duración de la clase.
+        """
+        try:
+            return await asyncio.get_event_loop().run_in_executor(
+                None, self._probar_audio_sync, ruta_audio
             )
-            
         except Exception as e:
             self.logger.warning(
-                "Error analizando audio, usando valores por defecto",
+                "Error analizando audio, duración desconocida",
                 ruta_audio=ruta_audio,
                 error=str(e)
             )
             
-            # Valores por defecto
+            # Duración 0 = desconocida: se deriva luego de los segmentos
             return CaracteristicasAudio(
-                duracion_sec=3600.0,  # 1 hora estimada
+                duracion_sec=0.0,
                 sample_rate=16000,
                 canales=1,
                 formato="unknown",
+                bitrate=None,
                 nivel_ruido_estimado=0.02,
                 idioma_probable="it",
                 calidad_estimada="medium"
             )
 
+    def _probar_audio_sync(self, ruta_audio: str) -> CaracteristicasAudio:
+        """Leer cabeceras y muestrear ventanas (WAV mapeado → soundfile → ffprobe)."""
+        # 1. WAV PCM (audio normalizado): cabecera RIFF + memmap
+        try:
+            buffer = get_audio_buffer(ruta_audio)
+            bits = buffer.muestras.dtype.itemsize * 8
+            nivel_ruido = self._estimar_ruido_muestreado(
+                lambda inicio, duracion: buffer.segmento_float32(inicio, inicio + duracion),
+                buffer.duracion_sec
+            )
+            return self._construir_caracteristicas(
+                duracion=buffer.duracion_sec,
+                sample_rate=buffer.sample_rate,
+                canales=buffer.canales,
+                formato="WAV",
+                bitrate=buffer.sample_rate * buffer.canales * bits,
+                nivel_ruido=nivel_ruido
+            )
+        except ValueError:
+            pass
+        
+        # 2. Contenedores legibles por libsndfile (FLAC, OGG, ...) con seek
+        try:
+            import soundfile as sf
+            
+            with sf.SoundFile(ruta_audio) as archivo:
+                sample_rate = archivo.samplerate
+                duracion = archivo.frames / float(sample_rate) if sample_rate else 0.0
+                
+                def leer_ventana(inicio: float, duracion_ventana: float) -> np.ndarray:
+                    archivo.seek(int(inicio * sample_rate))
+                    datos = archivo.read(int(duracion_ventana * sample_rate), dtype="float32", always_2d=True)
+                    return datos.mean(axis=1)
+                
+                nivel_ruido = (
+                    self._estimar_ruido_muestreado(leer_ventana, duracion)
+                    if archivo.seekable() else None
+                )
+                return self._construir_caracteristicas(
+                    duracion=duracion,
+                    sample_rate=sample_rate,
+                    canales=archivo.channels,
+                    formato=archivo.format,
+                    bitrate=None,
+                    nivel_ruido=nivel_ruido
+                )
+        except RuntimeError:
+            pass
+        
+        # 3. Resto de contenedores (m4a, mp3 antiguos, ...): ffprobe solo lee cabeceras
+        info = self._ffprobe_sync(ruta_audio)
+        return self._construir_caracteristicas(
+            duracion=info["duracion"],
+            sample_rate=info["sample_rate"],
+            canales=info["canales"],
+            formato=info["formato"],
+            bitrate=info["bitrate"],
+            nivel_ruido=None
+        )
+
+    @staticmethod
+    def _estimar_ruido_muestreado(
+        leer_ventana: Callable[[float, float], np.ndarray],
+        duracion_sec: float,
+        num_ventanas: int = 64,
+        ventana_sec: float = 0.5
+    ) -> float:
+        """
+        Estimar la desviación estándar del audio con ventanas cortas repartidas.
+        
+        Lee como máximo ``num_ventanas * ventana_sec`` segundos de audio.
+        """
+        if duracion_sec <= 0:
+            return 0.0
+        
+        ventana_sec = min(ventana_sec, duracion_sec)
+        num_ventanas = max(1, min(num_ventanas, int(duracion_sec / ventana_sec)))
+        inicios = np.linspace(0.0, max(0.0, duracion_sec - ventana_sec), num_ventanas)
+        
+        n = 0
+        suma = 0.0
+        suma_cuadrados = 0.0
+        for inicio in inicios:
+            datos = np.asarray(leer_ventana(float(inicio), ventana_sec), dtype=np.float64)
+            n += datos.size
+            suma += float(datos.sum())
+            suma_cuadrados += float(np.dot(datos, datos))
+        
+        if n == 0:
+            return 0.0
+        media = suma / n
+        return float(np.sqrt(max(0.0, suma_cuadrados / n - media * media)))
+
+    @staticmethod
+    def _ffprobe_sync(ruta_audio: str) -> Dict[str, Any]:
+        """Leer duración y formato con ffprobe (sin decodificar el stream)."""
+        resultado = subprocess.run(
+            [
+                settings.FFPROBE_BIN, "-v", "error",
+                "-select_streams", "a:0",
+                "-show_entries", "format=duration,format_name,bit_rate:stream=sample_rate,channels",
+                "-of", "json",
+                ruta_audio
+            ],
+            capture_output=True,
+            text=True,
+            timeout=15
+        )
+        if resultado.returncode != 0:
+            raise RuntimeError(f"ffprobe falló: {resultado.stderr.strip()[:300]}")
+        
+        datos = json.loads(resultado.stdout or "{}")
+        formato = datos.get("format", {})
+        stream = (datos.get("streams") or [{}])[0]
+        
+        duracion = float(formato.get("duration") or 0.0)
+        if duracion <= 0:
+            raise RuntimeError("ffprobe no reportó duración")
+        
+        return {
+            "duracion": duracion,
+            "sample_rate": int(stream.get("sample_rate") or 16000),
+            "canales": int(stream.get("channels") or 1),
+            "formato": formato.get("format_name", "unknown"),
+            "bitrate": int(formato["bit_rate"]) if formato.get("bit_rate") else None
+        }
+
+    @staticmethod
+    def _construir_caracteristicas(
+        duracion: float,
+        sample_rate: int,
+        canales: int,
+        formato: str,
+        bitrate: Optional[int],
+        nivel_ruido: Optional[float]
+    ) -> CaracteristicasAudio:
+        """Construir CaracteristicasAudio estimando la calidad por nivel de ruido."""
+        if nivel_ruido is None:
+            nivel_ruido = 0.02  # No estimable sin decodificar: valor neutro
+        
+        if nivel_ruido < 0.01:
+            calidad = "high"
+        elif nivel_ruido < 0.05:
+            calidad = "medium"
+        else:
+            calidad = "low"
+        
+        return CaracteristicasAudio(
+            duracion_sec=duracion,
+            sample_rate=sample_rate,
+            canales=canales,
+            formato=formato,
+            bitrate=bitrate,
+            nivel_ruido_estimado=nivel_ruido,
+            idioma_probable="it",  # Default para clases médicas
+            calidad_estimada=calidad
+        )
+
     def _actualizar_estadisticas(self, resultado: ResultadoTranscripcion, tiempo_procesamiento: float) -> None:
         """Actualizar estadísticas de rendimiento."""
         self.estadisticas["transcripciones_completadas"] += 1
@@ -467,7 +1000,8 @@ class WhisperService(BaseService):
             "modelo_size": self.modelo_size,
             "device": self.device,
             "compute_type": self.compute_type,
-            "estadisticas": self.estadisticas.copy()
+            "estadisticas": self.estadisticas.copy(),
+            "registro_modelos": whisper_model_registry.get_estadisticas()
         }
         
         try:
@@ -523,6 +1057,7 @@ class WhisperService(BaseService):
             
             self.modelo_whisper = None
             self.modelo_cargado = False
+            whisper_model_registry.desalojar()
             
             self.logger.info("WhisperService cleanup completado")
         except Exception as e:
@@ -180,10 +180,24 @@ async def _execute_ocr_pipeline(
                 }
             )
             
+            def report_page_progress(pages_done: int, total_pages: int) -> None:
+                # La extracción ocupa el tramo 20-45% del progreso total
+                task.update_state(
+                    state="PROCESSING",
+                    meta={
+                        "step": "ocr_extraction",
+                        "progress": 20 + int(25 * pages_done / max(total_pages, 1)),
+                        "message": f"Extrayendo texto con OCR: página {pages_done}/{total_pages}",
+                        "pages_done": pages_done,
+                        "total_pages": total_pages
+                    }
+                )
+            
             ocr_result = await ocr_service.process_document(
                 file_key=file_key,
                 class_session_id=class_session_id,
-                config=config
+                config=config,
+                progress_callback=report_page_progress
             )
             
             # Guardar resultado OCR en BD
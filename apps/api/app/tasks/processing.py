@@ -1,6 +1,6 @@
 """
 Tareas de procesamiento de audio y transcripción con IA.
-Pipeline completo: Normalización → ASR → Diarización → Fusión → Post-procesamiento.
+Pipeline completo: Normalización → (ASR ∥ Diarización) → Fusión → Post-procesamiento.
 """
 
 import asyncio
@@ -10,15 +10,23 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
+import redis
 from celery import current_task
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core import api_logger, get_async_db
+from app.core import api_logger, get_async_db, settings
 from app.models import ProcessingJob, TranscriptionResult, DiarizationResult
 from app.models.processing_job import EstadoProcesamiento, EtapaProcesamiento
+from app.services.audio_normalization_service import audio_normalization_service
 from app.services.whisper_service import whisper_service
 from app.services.diarization_service import diarization_service
+from app.services.incremental_asr_service import incremental_asr_service
+from app.services.inference_executor import inference_executor
 from app.services.minio_service import minio_service
+from app.services.pipeline_runner import EtapaPipeline, PipelineRunner
+from app.services.result_cache_service import result_cache_service
+from app.services.speaker_fusion_service import speaker_fusion_service
+from app.services.transcript_store_service import transcript_store_service
 from app.workers.celery_app import celery_app
 
 
@@ -137,51 +145,181 @@ def diarize_audio_task(self, processing_job_id: str) -> Dict[str, Any]:
         self.retry(countdown=60 * (2 ** self.request.retries), max_retries=3)
 
 
+@celery_app.task(bind=True, name="transcribe_incremental")
+def transcribe_incremental_task(self, upload_session_id: str, final: bool = False) -> Dict[str, Any]:
+    """
+    Tarea de ASR incremental sobre el prefijo de chunks recibido.
+    
+    Las pasadas intermedias se descartan si ya hay otra en curso para la
+    misma sesión (la siguiente recogerá los chunks nuevos); la pasada
+    final espera a que termine la anterior.
+    """
+    cliente_redis = redis.Redis.from_url(str(settings.REDIS_URL))
+    lock = cliente_redis.lock(
+        f"axonote:asr_incremental:{upload_session_id}",
+        timeout=settings.MAX_PROCESSING_TIME_MINUTES * 60
+    )
+    if not lock.acquire(blocking=final):
+        return {"status": "en_curso", "upload_session_id": upload_session_id}
+    
+    try:
+        api_logger.info(
+            "Iniciando pasada de ASR incremental",
+            upload_session_id=upload_session_id,
+            final=final,
+            task_id=current_task.request.id
+        )
+        
+        resultado = asyncio.run(_execute_incremental_asr(upload_session_id, final))
+        
+        api_logger.info(
+            "Pasada de ASR incremental finalizada",
+            upload_session_id=upload_session_id,
+            resultado=resultado
+        )
+        return resultado
+        
+    except Exception as e:
+        api_logger.error(
+            "Error en ASR incremental",
+            upload_session_id=upload_session_id,
+            final=final,
+            error=str(e)
+        )
+        # Solo la pasada final es imprescindible; las intermedias se repiten solas
+        if final:
+            self.retry(countdown=60 * (2 ** self.request.retries), max_retries=3)
+        return {"status": "error", "upload_session_id": upload_session_id, "error": str(e)}
+    finally:
+        try:
+            lock.release()
+        except redis.exceptions.LockError:
+            pass
+
+
 # ============================================================================
 # FUNCIONES AUXILIARES ASÍNCRONAS
 # ============================================================================
 
 async def _execute_complete_pipeline(job_id: UUID) -> Dict[str, Any]:
-    """Ejecutar pipeline completo de procesamiento."""
+    """
+    Ejecutar pipeline completo de procesamiento.
+    
+    Las etapas se ejecutan como un DAG: ASR y diarización dependen solo del
+    audio normalizado y corren en paralelo; la fusión espera a ambas.
+    """
     inicio_tiempo = time.time()
     
     async for db in get_async_db():
+        vigilante = asyncio.create_task(_watch_job_cancellation(job_id))
         try:
             # Cargar job
             job = await _get_processing_job(db, job_id)
             if not job:
                 raise ValueError(f"ProcessingJob {job_id} no encontrado")
             
+            # Etapas ya completadas en un intento anterior no se repiten
+            resultados_previos = await _load_stage_checkpoints(db, job)
+            if resultados_previos:
+                api_logger.info(
+                    "Reanudando pipeline desde checkpoints",
+                    job_id=str(job_id),
+                    etapas_completadas=sorted(resultados_previos)
+                )
+            
+            # La sesión y el job se ligan como argumentos por defecto: las etapas
+            # se ejecutan más tarde, dentro del runner
+            async def etapa_normalizacion(
+                resultados: Dict[str, Any], *, db: AsyncSession = db, job: ProcessingJob = job
+            ) -> str:
+                return await _normalize_audio_pipeline(db, job)
+            
+            async def etapa_asr(
+                resultados: Dict[str, Any], *, job: ProcessingJob = job
+            ) -> TranscriptionResult:
+                # Sesión propia: la sesión principal no admite uso concurrente
+                return await _run_with_own_session(
+                    _execute_whisper_asr, job, resultados["normalizacion"]
+                )
+            
+            async def etapa_diarizacion(
+                resultados: Dict[str, Any], *, job: ProcessingJob = job
+            ) -> DiarizationResult:
+                return await _run_with_own_session(
+                    _execute_pyannote_diarization, job, resultados["normalizacion"]
+                )
+            
+            async def etapa_fusion(
+                resultados: Dict[str, Any], *, db: AsyncSession = db, job: ProcessingJob = job
+            ) -> Dict[str, Any]:
+                return await _fuse_asr_diarization(
+                    db, job, resultados["asr"], resultados["diarizacion"]
+                )
+            
+            async def etapa_post_procesamiento(
+                resultados: Dict[str, Any], *, db: AsyncSession = db, job: ProcessingJob = job
+            ) -> Dict[str, Any]:
+                return await _post_process_results(db, job, resultados["fusion"])
+            
+            # Peso de cada etapa en el progreso global del job
+            progreso_etapas = {
+                "normalizacion": (EtapaProcesamiento.NORMALIZACION, 15.0),
+                "asr": (EtapaProcesamiento.ASR, 32.5),
+                "diarizacion": (EtapaProcesamiento.DIARIZACION, 32.5),
+                "fusion": (EtapaProcesamiento.FUSION, 10.0),
+                "post_procesamiento": (EtapaProcesamiento.FINALIZACION, 10.0)
+            }
+            progreso_acumulado = sum(progreso_etapas[nombre][1] for nombre in resultados_previos)
+            
             # Actualizar estado inicial
             await _update_job_state(
                 db, job, 
                 EstadoProcesamiento.PROCESANDO, 
                 EtapaProcesamiento.VALIDACION,
-                0.0
+                progreso_acumulado
             )
             
-            # 1. Validación y normalización de audio
-            audio_normalizado = await _normalize_audio_pipeline(db, job)
-            await _update_job_progress(db, job, EtapaProcesamiento.NORMALIZACION, 15.0)
-            
-            # 2. ASR con Whisper
-            resultado_asr = await _execute_whisper_asr(db, job, audio_normalizado)
-            await _update_job_progress(db, job, EtapaProcesamiento.ASR, 50.0)
-            
-            # 3. Diarización con pyannote
-            resultado_diarizacion = await _execute_pyannote_diarization(db, job, audio_normalizado)
-            await _update_job_progress(db, job, EtapaProcesamiento.DIARIZACION, 80.0)
+            async def on_etapa_completada(
+                nombre: str,
+                tiempos: Dict[str, float],
+                resultado: Any,
+                *,
+                db: AsyncSession = db,
+                job: ProcessingJob = job,
+                progreso_etapas: Dict[str, Any] = progreso_etapas
+            ) -> None:
+                nonlocal progreso_acumulado
+                etapa, peso = progreso_etapas[nombre]
+                progreso_acumulado += peso
+                _record_stage_checkpoint(job, nombre, resultado)
+                await _update_job_progress(db, job, etapa, min(100.0, progreso_acumulado))
             
-            # 4. Fusión de resultados
-            resultado_fusion = await _fuse_asr_diarization(db, job, resultado_asr, resultado_diarizacion)
-            await _update_job_progress(db, job, EtapaProcesamiento.FUSION, 90.0)
+            runner = PipelineRunner(
+                [
+                    EtapaPipeline("normalizacion", etapa_normalizacion),
+                    EtapaPipeline("asr", etapa_asr, depende_de=["normalizacion"]),
+                    EtapaPipeline("diarizacion", etapa_diarizacion, depende_de=["normalizacion"]),
+                    EtapaPipeline("fusion", etapa_fusion, depende_de=["asr", "diarizacion"]),
+                    EtapaPipeline("post_procesamiento", etapa_post_procesamiento, depende_de=["fusion"])
+                ],
+                on_etapa_completada=on_etapa_completada
+            )
+            resultados = await runner.ejecutar(resultados_previos)
             
-            # 5. Post-procesamiento y finalización
-            resultado_final = await _post_process_results(db, job, resultado_fusion)
-            await _update_job_progress(db, job, EtapaProcesamiento.FINALIZACION, 100.0)
+            resultado_asr = resultados["asr"]
+            resultado_diarizacion = resultados["diarizacion"]
+            resultado_fusion = resultados["fusion"]
+            resultado_final = resultados["post_procesamiento"]
             
-            # Finalizar job
+            # Finalizar job con tiempos por etapa
             tiempo_total = time.time() - inicio_tiempo
+            job.metricas_calidad = {
+                **(job.metricas_calidad or {}),
+                "pipeline": {
+                    **runner.get_metricas_tiempos(tiempo_total),
+                    "etapas_reanudadas": sorted(resultados_previos)
+                }
+            }
             await _finalize_job(db, job, tiempo_total, resultado_final)
             
             return {
@@ -197,6 +335,7 @@ async def _execute_complete_pipeline(job_id: UUID) -> Dict[str, Any]:
             await _update_job_error(job_id, str(e))
             raise
         finally:
+            vigilante.cancel()
             await db.close()
 
 
@@ -260,20 +399,50 @@ async def _execute_diarization_pipeline(job_id: UUID) -> Dict[str, Any]:
             await db.close()
 
 
+async def _execute_incremental_asr(upload_session_id: str, final: bool) -> Dict[str, Any]:
+    """Ejecutar una pasada de ASR incremental con su propia sesión de BD."""
+    async for db in get_async_db():
+        try:
+            return await incremental_asr_service.procesar(db, upload_session_id, final=final)
+        finally:
+            await db.close()
+
+
 async def _normalize_audio_pipeline(db: AsyncSession, job: ProcessingJob) -> str:
-    """Normalizar audio para procesamiento óptimo."""
+    """
+    Normalizar audio para procesamiento óptimo.
+    
+    Decodifica el original una única vez a PCM 16 kHz mono con ffmpeg (cacheado
+    en MinIO por hash de contenido); ASR, diarización y embeddings leen todos
+    ese mismo artefacto.
+    """
     try:
         api_logger.info("Iniciando normalización de audio", job_id=str(job.id))
         
-        # TODO: Implementar normalización con ffmpeg
-        # Por ahora, usar el audio original
-        ruta_normalizada = job.ruta_audio_original
+        if not settings.ENABLE_AUDIO_NORMALIZATION:
+            ruta_normalizada = job.ruta_audio_original
+            job.ruta_audio_normalizado = ruta_normalizada
+            await db.commit()
+            return ruta_normalizada
         
-        # Actualizar job con ruta normalizada
+        resultado = await audio_normalization_service.normalizar(job.ruta_audio_original)
+        ruta_normalizada = resultado.ruta_local
+        
+        # Actualizar job con ruta normalizada y metadatos del audio
         job.ruta_audio_normalizado = ruta_normalizada
+        job.audio_sha256 = resultado.audio_sha256
+        job.duracion_audio_sec = resultado.duracion_sec
+        job.sample_rate = resultado.sample_rate
+        job.canales = resultado.canales
         await db.commit()
         
-        api_logger.info("Normalización completada", ruta_normalizada=ruta_normalizada)
+        api_logger.info(
+            "Normalización completada",
+            ruta_normalizada=ruta_normalizada,
+            audio_sha256=resultado.audio_sha256,
+            cache_hit=resultado.cache_hit,
+            tiempo_sec=resultado.tiempo_procesamiento_sec
+        )
         return ruta_normalizada
         
     except Exception as e:
@@ -286,13 +455,24 @@ async def _execute_whisper_asr(db: AsyncSession, job: ProcessingJob, ruta_audio:
     try:
         api_logger.info("Iniciando ASR con Whisper", job_id=str(job.id))
         
+        configuracion = job.config_whisper.get("preset", "MEDICAL_HIGH_PRECISION")
+        
+        # Mismo audio, preset y modelo: reutilizar la transcripción existente
+        clave_cache = result_cache_service.calcular_clave(
+            job.audio_sha256, configuracion, whisper_service.modelo_para_preset(configuracion)
+        )
+        transcripcion_cacheada = await result_cache_service.obtener_transcripcion(db, clave_cache, job.id)
+        if transcripcion_cacheada is not None:
+            api_logger.info("ASR reutilizado por hash de contenido", transcription_id=str(transcripcion_cacheada.id))
+            return transcripcion_cacheada
+        
         # TODO: Implementar callback de progreso real
         # Ejecutar transcripción
-        configuracion = job.config_whisper.get("preset", "MEDICAL_HIGH_PRECISION")
         resultado_whisper = await whisper_service.transcribir_audio(
             ruta_audio=ruta_audio,
             configuracion=configuracion,
-            idioma="it"
+            idioma="it",
+            job_id=str(job.id)
         )
         
         # Crear registro en base de datos
@@ -308,17 +488,20 @@ async def _execute_whisper_asr(db: AsyncSession, job: ProcessingJob, ruta_audio:
             duracion_audio_sec=resultado_whisper.duracion_audio_sec,
             palabras_por_minuto=resultado_whisper.palabras_por_minuto,
             modelo_whisper_usado=resultado_whisper.modelo_usado,
-            compute_type_usado="float16",
+            compute_type_usado=resultado_whisper.modelo_usado.rsplit("-", 1)[-1],
             configuracion_whisper=resultado_whisper.configuracion_usada,
             vad_aplicado=True,
             alineacion_temporal_aplicada=True,
-            tiempo_procesamiento_sec=resultado_whisper.tiempo_procesamiento_sec
+            tiempo_procesamiento_sec=resultado_whisper.tiempo_procesamiento_sec,
+            clave_cache=clave_cache
         )
         
         db.add(transcription_result)
         await db.commit()
         await db.refresh(transcription_result)
         
+        await _store_columnar_segments(db, transcription_result)
+        
         api_logger.info("ASR completado exitosamente", transcription_id=str(transcription_result.id))
         return transcription_result
         
@@ -332,11 +515,21 @@ async def _execute_pyannote_diarization(db: AsyncSession, job: ProcessingJob, ru
     try:
         api_logger.info("Iniciando diarización con pyannote", job_id=str(job.id))
         
-        # Ejecutar diarización
         configuracion = job.config_diarizacion.get("preset", "MEDICAL_CLASS_STANDARD")
+        modelo_diarizacion = "pyannote/speaker-diarization-3.1"
+        
+        # Mismo audio, preset y modelo: reutilizar la diarización existente
+        clave_cache = result_cache_service.calcular_clave(job.audio_sha256, configuracion, modelo_diarizacion)
+        diarizacion_cacheada = await result_cache_service.obtener_diarizacion(db, clave_cache, job.id)
+        if diarizacion_cacheada is not None:
+            api_logger.info("Diarización reutilizada por hash de contenido", diarization_id=str(diarizacion_cacheada.id))
+            return diarizacion_cacheada
+        
+        # Ejecutar diarización
         resultado_diarizacion = await diarization_service.diarizar_audio(
             ruta_audio=ruta_audio,
-            configuracion=configuracion
+            configuracion=configuracion,
+            job_id=str(job.id)
         )
         
         # Crear registro en base de datos
@@ -355,9 +548,10 @@ async def _execute_pyannote_diarization(db: AsyncSession, job: ProcessingJob, ru
                 if s.tipo_speaker.startswith("alumno")
             ],
             calidad_separacion=resultado_diarizacion.calidad_separacion,
-            modelo_diarizacion_usado="pyannote/speaker-diarization-3.1",
+            modelo_diarizacion_usado=modelo_diarizacion,
             configuracion_diarizacion=resultado_diarizacion.configuracion_usada,
-            tiempo_procesamiento_sec=resultado_diarizacion.tiempo_procesamiento_sec
+            tiempo_procesamiento_sec=resultado_diarizacion.tiempo_procesamiento_sec,
+            clave_cache=clave_cache
         )
         
         db.add(diarization_result)
@@ -372,6 +566,23 @@ async def _execute_pyannote_diarization(db: AsyncSession, job: ProcessingJob, ru
         raise
 
 
+async def _store_columnar_segments(db: AsyncSession, transcription: TranscriptionResult) -> None:
+    """Guardar la copia columnar de los segmentos (best-effort: el JSON sigue siendo la fuente)."""
+    if not settings.TRANSCRIPT_COLUMNAR_ENABLED or not transcription.segmentos:
+        return
+    try:
+        transcription.ruta_segmentos_columnar = await transcript_store_service.guardar(
+            str(transcription.id), transcription.segmentos
+        )
+        await db.commit()
+    except Exception as e:
+        api_logger.warning(
+            "No se pudieron guardar segmentos columnares",
+            transcription_id=str(transcription.id),
+            error=str(e)
+        )
+
+
 async def _fuse_asr_diarization(
     db: AsyncSession, 
     job: ProcessingJob, 
@@ -382,20 +593,38 @@ async def _fuse_asr_diarization(
     try:
         api_logger.info("Iniciando fusión ASR + Diarización", job_id=str(job.id))
         
+        # Asignación palabra → speaker por índice de intervalos (CPU, fuera del loop)
+        fusion = await asyncio.get_event_loop().run_in_executor(
+            None,
+            speaker_fusion_service.fusionar,
+            asr_result.segmentos or [],
+            diarization_result.segmentos_diarizacion or [],
+            diarization_result.speakers_clasificados or []
+        )
+        
         fusion_resultado = {
             "transcripcion_id": str(asr_result.id),
             "diarizacion_id": str(diarization_result.id),
             "texto_completo": asr_result.texto_completo,
             "speakers_detectados": diarization_result.num_speakers_detectados,
             "speaker_profesor": diarization_result.speaker_profesor,
-            "calidad_fusion": (asr_result.confianza_global + diarization_result.calidad_separacion) / 2
+            "calidad_fusion": (asr_result.confianza_global + diarization_result.calidad_separacion) / 2,
+            "intervenciones": [i.dict() for i in fusion.intervenciones],
+            "tiempo_habla_por_speaker": fusion.tiempo_habla_por_speaker,
+            "cobertura_speakers": fusion.cobertura_speakers,
+            "palabras_en_solape": fusion.palabras_en_solape
         }
         
         # Actualizar job con resultado de fusión
         job.resultado_fusion = fusion_resultado
         await db.commit()
         
-        api_logger.info("Fusión completada")
+        api_logger.info(
+            "Fusión completada",
+            job_id=str(job.id),
+            intervenciones=len(fusion.intervenciones),
+            cobertura_speakers=round(fusion.cobertura_speakers, 3)
+        )
         return fusion_resultado
         
     except Exception as e:
@@ -475,6 +704,88 @@ async def _update_job_progress(
     await db.commit()
 
 
+async def _run_with_own_session(etapa_func, job: ProcessingJob, *args: Any) -> Any:
+    """Ejecutar una etapa con su propia sesión de BD (etapas en paralelo)."""
+    async for stage_db in get_async_db():
+        try:
+            return await etapa_func(stage_db, job, *args)
+        finally:
+            await stage_db.close()
+
+
+# Modelos cuyas filas se referencian por ID en los checkpoints
+_CHECKPOINT_MODELS = {
+    "TranscriptionResult": TranscriptionResult,
+    "DiarizationResult": DiarizationResult
+}
+
+
+def _record_stage_checkpoint(job: ProcessingJob, etapa: str, resultado: Any) -> None:
+    """
+    Registrar la salida de una etapa en ``job.checkpoints_etapas``.
+    
+    Las filas de resultados se guardan por ID, la ruta del audio normalizado
+    como ruta y el resto (dicts de fusión y post-procesamiento) por valor.
+    Se persiste con el siguiente commit del job.
+    """
+    if isinstance(resultado, tuple(_CHECKPOINT_MODELS.values())):
+        datos = {"tipo": type(resultado).__name__, "id": str(resultado.id)}
+    elif isinstance(resultado, str):
+        datos = {"tipo": "ruta", "valor": resultado}
+    else:
+        datos = {"tipo": "valor", "valor": resultado}
+    
+    job.checkpoints_etapas = {
+        **(job.checkpoints_etapas or {}),
+        etapa: {"resultado": datos, "completado_en": datetime.utcnow().isoformat()}
+    }
+
+
+async def _load_stage_checkpoints(db: AsyncSession, job: ProcessingJob) -> Dict[str, Any]:
+    """
+    Reconstruir los resultados de las etapas completadas en intentos previos.
+    
+    Un checkpoint cuyo artefacto ya no existe (fila borrada, audio
+    normalizado en otro nodo) se descarta y la etapa se repite.
+    """
+    resultados: Dict[str, Any] = {}
+    for etapa, checkpoint in (job.checkpoints_etapas or {}).items():
+        datos = checkpoint.get("resultado") or {}
+        tipo = datos.get("tipo")
+        
+        if tipo in _CHECKPOINT_MODELS:
+            valor = await db.get(_CHECKPOINT_MODELS[tipo], UUID(datos["id"]))
+        elif tipo == "ruta":
+            valor = datos["valor"] if os.path.exists(datos["valor"]) else None
+        else:
+            valor = datos.get("valor")
+        
+        if valor is not None:
+            resultados[etapa] = valor
+    
+    return resultados
+
+
+async def _watch_job_cancellation(job_id: UUID, intervalo_sec: float = 5.0) -> None:
+    """
+    Vigilar el estado del job mientras la inferencia corre en el executor.
+    
+    Si el job pasa a CANCELADO (endpoint /processing/cancel), se cancelan sus
+    trabajos de inferencia en curso. Usa su propia sesión de BD para no
+    interferir con la del pipeline.
+    """
+    while True:
+        await asyncio.sleep(intervalo_sec)
+        async for db in get_async_db():
+            try:
+                job = await _get_processing_job(db, job_id)
+                if job and job.estado == EstadoProcesamiento.CANCELADO:
+                    inference_executor.cancelar(str(job_id))
+                    return
+            finally:
+                await db.close()
+
+
 async def _update_job_error(job_id: UUID, error_message: str) -> None:
     """Actualizar job con error."""
     async for db in get_async_db():
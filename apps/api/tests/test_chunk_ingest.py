@@ -0,0 +1,131 @@
+"""Tests para la ingesta de chunks, el spool local y el ASR incremental."""
+import asyncio
+import hashlib
+import importlib
+from io import BytesIO
+from types import SimpleNamespace
+
+from app.services.base import ServiceNotAvailableError
+from app.services.chunk_service import chunk_service
+from app.services.minio_service import minio_service
+
+# app.services reexporta la instancia con el mismo nombre que el módulo
+modulo = importlib.import_module("app.services.chunk_service")
+
+
+CHUNK = b"audio de prueba " * 1000
+
+
+def test_chunk_al_spool_si_minio_falla(tmp_path, monkeypatch):
+    """Con MinIO caído el chunk queda en el spool y se sube al ensamblar."""
+    async def upload_stream_caido(*args, **kwargs):
+        raise ServiceNotAvailableError("MinIO", "conexión rechazada")
+
+    subidos = []
+
+    async def upload_many(pares, content_type=None):
+        subidos.extend((ruta, objeto, open(ruta, "rb").read()) for ruta, objeto in pares)
+
+    monkeypatch.setattr(chunk_service, "temp_dir", tmp_path)
+    monkeypatch.setattr(minio_service, "upload_stream", upload_stream_caido)
+    monkeypatch.setattr(minio_service, "upload_many", upload_many)
+
+    checksum = asyncio.run(chunk_service._ingest_chunk(
+        "sesion-1", 3, BytesIO(CHUNK), len(CHUNK), "uploads/sesion-1/chunks/chunk_000003"
+    ))
+
+    spool = tmp_path / "sesion-1" / "chunk_000003"
+    assert checksum == hashlib.md5(CHUNK).hexdigest()
+    assert spool.read_bytes() == CHUNK
+
+    upload_session = SimpleNamespace(id="sesion-1", storage_path_chunks="uploads/sesion-1/chunks")
+    assert asyncio.run(chunk_service._upload_spooled_chunks(upload_session)) == 1
+    assert subidos == [(str(spool), "uploads/sesion-1/chunks/chunk_000003", CHUNK)]
+
+
+def test_chunk_directo_a_minio(tmp_path, monkeypatch):
+    recibidos = {}
+
+    async def upload_stream(data, object_name, length, **kwargs):
+        recibidos[object_name] = data.read(length)
+
+    monkeypatch.setattr(chunk_service, "temp_dir", tmp_path)
+    monkeypatch.setattr(minio_service, "upload_stream", upload_stream)
+
+    checksum = asyncio.run(chunk_service._ingest_chunk(
+        "sesion-2", 1, BytesIO(CHUNK), len(CHUNK), "chunks/chunk_000001"
+    ))
+
+    assert checksum == hashlib.md5(CHUNK).hexdigest()
+    assert recibidos == {"chunks/chunk_000001": CHUNK}
+    assert not (tmp_path / "sesion-2").exists()
+    upload_session = SimpleNamespace(id="sesion-2", storage_path_chunks="chunks")
+    assert asyncio.run(chunk_service._upload_spooled_chunks(upload_session)) == 0
+
+
+class _ResultadoFalso:
+    def __init__(self, valor):
+        self._valor = valor
+
+    def scalar_one_or_none(self):
+        return self._valor
+
+
+class _DbFalsa:
+    """AsyncSession mínima: devuelve siempre la misma sesión de upload."""
+
+    def __init__(self, upload_session):
+        self.upload_session = upload_session
+        self.agregados = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        return _ResultadoFalso(self.upload_session)
+
+    def add(self, instancia):
+        self.agregados.append(instancia)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def test_upload_no_falla_si_el_broker_no_responde(monkeypatch):
+    """Un fallo al encolar el ASR incremental no afecta al chunk ya guardado."""
+    upload_session = SimpleNamespace(
+        id="sesion-3",
+        is_active=True,
+        is_expired=False,
+        estado=modulo.EstadoUpload.SUBIENDO,
+        storage_path_chunks="chunks",
+        total_chunks_expected=12,
+        chunks_received=5,
+        contiguous_chunks_received=5,
+        progress_percentage=50.0,
+        is_chunk_received=lambda n: False,
+    )
+
+    async def ingest(*args):
+        return "checksum"
+
+    async def marcar(db, sesion, chunk_number, chunk_size):
+        sesion.chunks_received += 1
+        sesion.contiguous_chunks_received += 1
+        return True
+
+    def send_task(*args, **kwargs):
+        raise ConnectionError("broker no disponible")
+
+    monkeypatch.setattr(modulo.settings, "ASR_INCREMENTAL_ENABLED", True)
+    monkeypatch.setattr(modulo.settings, "ASR_INCREMENTAL_EVERY_CHUNKS", 6)
+    monkeypatch.setattr(modulo, "ChunkUpload", lambda **kwargs: kwargs)
+    monkeypatch.setattr(modulo.celery_app, "send_task", send_task)
+    monkeypatch.setattr(chunk_service, "_ingest_chunk", ingest)
+    monkeypatch.setattr(chunk_service, "_mark_chunk_received", marcar)
+
+    db = _DbFalsa(upload_session)
+    respuesta = asyncio.run(chunk_service.upload_chunk(db, "sesion-3", 6, b"chunk"))
+
+    assert respuesta["status"] == "received"
+    assert respuesta["chunks_received"] == 6
+    assert db.commits == 1
+    assert db.agregados[0]["chunk_checksum"] == "checksum"
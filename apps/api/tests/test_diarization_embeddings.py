@@ -0,0 +1,61 @@
+"""Tests para la extracción de embeddings de speakers por lotes."""
+import importlib
+
+import numpy as np
+
+from app.services.diarization_service import SegmentoDiarizacion, diarization_service
+
+modulo = importlib.import_module("app.services.diarization_service")
+
+
+def _segmento(start, end, speaker_id):
+    return SegmentoDiarizacion(
+        start=start, end=end, speaker_id=speaker_id, confidence=1.0, duration=end - start
+    )
+
+
+SEGMENTOS = [
+    _segmento(0.0, 1.0, "A"),
+    _segmento(2.0, 3.5, "B"),
+    _segmento(5.0, 7.0, "A"),
+    _segmento(8.0, 8.2, "B"),  # Menor de 0.5 s: no se usa
+]
+
+
+class _BufferFalso:
+    """Cada recorte es constante e igual a su instante de inicio."""
+
+    def segmento_float32(self, start, end):
+        return np.full(int((end - start) * 10), start, dtype=np.float32)
+
+
+def _embeddings_lote(audios):
+    """Embedding (inicio, 1.0) por recorte; el lote con el recorte de B falla."""
+    if any(audio[0] == 2.0 for audio in audios):
+        raise RuntimeError("CUDA out of memory")
+    return np.array([[audio[0], 1.0] for audio in audios], dtype=np.float32)
+
+
+def test_lote_fallido_no_descarta_los_demas(monkeypatch):
+    monkeypatch.setattr(modulo.settings, "DIARIZATION_EMBEDDING_BATCH_SIZE", 1)
+    monkeypatch.setattr(modulo, "get_audio_buffer", lambda ruta: _BufferFalso())
+    monkeypatch.setattr(diarization_service, "embedding_model", object())
+    monkeypatch.setattr(diarization_service, "_embeddings_lote", _embeddings_lote)
+
+    embeddings = diarization_service._extraer_embeddings_sync("clase.wav", SEGMENTOS)
+
+    # A conserva el promedio de sus dos recortes; B queda con embedding nulo
+    assert embeddings == {"A": [2.5, 1.0], "B": [0.0, 0.0]}
+
+
+def test_todos_los_lotes_fallidos(monkeypatch):
+    def falla(audios):
+        raise RuntimeError("modelo no disponible")
+
+    monkeypatch.setattr(modulo, "get_audio_buffer", lambda ruta: _BufferFalso())
+    monkeypatch.setattr(diarization_service, "embedding_model", object())
+    monkeypatch.setattr(diarization_service, "_embeddings_lote", falla)
+
+    embeddings = diarization_service._extraer_embeddings_sync("clase.wav", SEGMENTOS)
+
+    assert embeddings == {"A": [0.0] * 512, "B": [0.0] * 512}
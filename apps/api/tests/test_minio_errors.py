@@ -0,0 +1,70 @@
+"""Tests para la traducción de errores de MinIO a ServiceNotAvailableError."""
+import asyncio
+
+import pytest
+from minio.error import S3Error
+
+from app.services.base import ServiceNotAvailableError
+from app.services.minio_service import minio_service
+
+
+def _s3_error(code="InternalError"):
+    return S3Error(
+        code=code,
+        message="fallo simulado",
+        resource="/axonote",
+        request_id="req",
+        host_id="host",
+        response=None,
+    )
+
+
+class _ClienteCaido:
+    """Cliente de MinIO cuyas operaciones fallan siempre con S3Error."""
+
+    def __getattr__(self, nombre):
+        def operacion(*args, **kwargs):
+            raise _s3_error()
+        return operacion
+
+
+@pytest.fixture
+def cliente_caido(monkeypatch):
+    monkeypatch.setattr(minio_service, "client", _ClienteCaido())
+
+
+def test_compose_file(cliente_caido):
+    with pytest.raises(ServiceNotAvailableError) as exc_info:
+        asyncio.run(minio_service.compose_file(["a", "b"], "ab"))
+    assert isinstance(exc_info.value.__cause__, S3Error)
+
+
+def test_iter_object_y_download_range(cliente_caido):
+    with pytest.raises(ServiceNotAvailableError) as exc_info:
+        asyncio.run(minio_service.download_range("audio.wav", 0, 1024))
+    assert isinstance(exc_info.value.__cause__, S3Error)
+
+
+def test_download_to_file(cliente_caido, tmp_path):
+    with pytest.raises(ServiceNotAvailableError) as exc_info:
+        asyncio.run(minio_service.download_to_file("audio.wav", str(tmp_path / "audio.wav")))
+    assert isinstance(exc_info.value.__cause__, S3Error)
+
+
+def test_upload_from_file(cliente_caido, tmp_path):
+    ruta = tmp_path / "audio.wav"
+    ruta.write_bytes(b"RIFF")
+    with pytest.raises(ServiceNotAvailableError) as exc_info:
+        asyncio.run(minio_service.upload_from_file(str(ruta), "audio.wav"))
+    assert isinstance(exc_info.value.__cause__, S3Error)
+
+
+def test_object_exists(monkeypatch, cliente_caido):
+    with pytest.raises(ServiceNotAvailableError):
+        asyncio.run(minio_service.object_exists("audio.wav"))
+
+    def stat_object(*args):
+        raise _s3_error("NoSuchKey")
+
+    monkeypatch.setattr(minio_service.client, "stat_object", stat_object, raising=False)
+    assert asyncio.run(minio_service.object_exists("audio.wav")) is False
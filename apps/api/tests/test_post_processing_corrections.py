@@ -0,0 +1,111 @@
+"""Tests para la resolución de correcciones ASR y el mapeo de offsets."""
+from app.services.post_processing_service import PostProcessingService
+
+
+def _candidato(start, end, corrected, priority, tipo="pattern"):
+    return {
+        "type": tipo,
+        "start": start,
+        "end": end,
+        "corrected": corrected,
+        "confidence": 0.9,
+        "priority": priority,
+    }
+
+
+def _spans(seleccionados):
+    return [(c["start"], c["end"]) for c in seleccionados]
+
+
+def test_prioridad_gana_sobre_longitud():
+    """Un término médico corto desplaza a un patrón más largo que lo solapa."""
+    seleccionados = PostProcessingService._select_non_overlapping([
+        _candidato(0, 10, "patrón", PostProcessingService._PRIORITY_PATTERN),
+        _candidato(6, 9, "término", PostProcessingService._PRIORITY_MEDICAL_TERM, "medical_term"),
+    ])
+    assert _spans(seleccionados) == [(6, 9)]
+
+
+def test_misma_prioridad_gana_el_mas_largo_y_despues_el_primero():
+    seleccionados = PostProcessingService._select_non_overlapping([
+        _candidato(2, 6, "b", 1),
+        _candidato(0, 4, "a", 1),
+        _candidato(3, 12, "largo", 1),
+        _candidato(12, 14, "c", 1),
+    ])
+    # 3-12 es el más largo; de 0-4 y 2-6 (misma longitud, ambos lo solapan)
+    # no entra ninguno; 12-14 es contiguo y no solapa
+    assert _spans(seleccionados) == [(3, 12), (12, 14)]
+
+    seleccionados = PostProcessingService._select_non_overlapping([
+        _candidato(2, 6, "b", 1),
+        _candidato(0, 4, "a", 1),
+    ])
+    assert _spans(seleccionados) == [(0, 4)]
+
+
+def test_seleccion_ordenada_por_posicion():
+    seleccionados = PostProcessingService._select_non_overlapping([
+        _candidato(20, 22, "z", 1),
+        _candidato(0, 2, "x", 2),
+        _candidato(10, 15, "y", 1),
+    ])
+    assert _spans(seleccionados) == [(0, 2), (10, 15), (20, 22)]
+
+
+TEXTO = "la pressione del la arteria"
+# "pressione" (3-12) crece 10 caracteres; "la arteria" (17-27) no cambia de
+# longitud y desplaza al patrón "del la" (13-19) que lo solapa
+CANDIDATOS = [
+    _candidato(3, 12, "pressione sanguigna", 1),
+    _candidato(13, 19, "della", 1),
+    _candidato(17, 27, "l'arteria", 2, "medical_term"),
+]
+
+
+def _corregir():
+    seleccionados = PostProcessingService._select_non_overlapping(list(CANDIDATOS))
+    return PostProcessingService._apply_corrections(TEXTO, seleccionados)
+
+
+def test_aplicar_correcciones():
+    corregido, correcciones = _corregir()
+
+    assert corregido == "la pressione sanguigna del l'arteria"
+    assert [
+        (c["original"], c["position"], c["original_end"], c["corrected_position"])
+        for c in correcciones
+    ] == [
+        ("pressione", 3, 12, 3),
+        ("la arteria", 17, 27, 27),
+    ]
+    for c in correcciones:
+        inicio = c["corrected_position"]
+        assert corregido[inicio:inicio + len(c["corrected"])] == c["corrected"]
+
+
+def test_mapear_offset_al_texto_original():
+    corregido, correcciones = _corregir()
+    mapear = PostProcessingService.map_corrected_offset
+
+    assert mapear(correcciones, 0) == 0
+    # Dentro de un tramo corregido: inicio del tramo original
+    assert mapear(correcciones, 5) == 3
+    assert mapear(correcciones, 30) == 17
+    # Justo después de cada tramo y al final del texto
+    assert mapear(correcciones, 22) == 12
+    assert mapear(correcciones, len(corregido)) == len(TEXTO)
+
+    # Todo carácter fuera de un tramo corregido vuelve a su original
+    tramos = [
+        range(c["corrected_position"], c["corrected_position"] + len(c["corrected"]))
+        for c in correcciones
+    ]
+    for i, caracter in enumerate(corregido):
+        if not any(i in tramo for tramo in tramos):
+            assert TEXTO[mapear(correcciones, i)] == caracter
+
+
+def test_mapear_offset_sin_correcciones():
+    assert PostProcessingService.map_corrected_offset([], 7) == 7
+
@@ -0,0 +1,111 @@
+"""Tests para el índice de intervalos de la fusión ASR + diarización."""
+from app.services.speaker_fusion_service import (
+    SPEAKER_DESCONOCIDO,
+    IndiceIntervalos,
+    SpeakerFusionService,
+)
+
+
+# A habla 0-10 y 15-20, B habla 8-12 (solape 8-10) y hay silencio 12-15
+DIARIZACION = [
+    {"start": 0.0, "end": 10.0, "speaker_id": "A"},
+    {"start": 8.0, "end": 12.0, "speaker_id": "B"},
+    {"start": 15.0, "end": 20.0, "speaker_id": "A"},
+]
+
+
+def test_intervalos_elementales_con_solape():
+    """El tramo solapado se asigna al speaker con más tiempo total."""
+    indice = IndiceIntervalos(DIARIZACION)
+
+    assert indice.inicios == [0.0, 8.0, 10.0, 15.0]
+    assert indice.fines == [8.0, 10.0, 12.0, 20.0]
+    assert indice.speakers == ["A", "A", "B", "A"]
+    assert indice.solapados == [False, True, False, False]
+    assert indice.tiempo_por_speaker == {"A": 15.0, "B": 4.0}
+
+
+def test_speaker_en_habla_y_solape():
+    indice = IndiceIntervalos(DIARIZACION)
+
+    assert indice.speaker_en(5.0, 1.0) == ("A", False)
+    assert indice.speaker_en(9.0, 1.0) == ("A", True)
+    assert indice.speaker_en(11.0, 1.0) == ("B", False)
+    # Los bordes son semiabiertos: 10.0 ya pertenece al tramo de B
+    assert indice.speaker_en(10.0, 1.0) == ("B", False)
+
+
+def test_speaker_en_silencio_usa_el_intervalo_mas_cercano():
+    indice = IndiceIntervalos(DIARIZACION)
+
+    # Cerca del final de B
+    assert indice.speaker_en(12.5, 1.0) == ("B", False)
+    # Cerca del inicio del segundo tramo de A
+    assert indice.speaker_en(14.8, 1.0) == ("A", False)
+    # Lejos de ambos vecinos
+    assert indice.speaker_en(13.5, 1.0) == (None, False)
+    # Equidistante: gana el anterior
+    assert indice.speaker_en(13.5, 2.0) == ("B", False)
+    # Antes del primer intervalo y después del último
+    assert indice.speaker_en(-0.5, 1.0) == ("A", False)
+    assert indice.speaker_en(25.0, 1.0) == (None, False)
+
+
+def test_speaker_dominante():
+    indice = IndiceIntervalos(DIARIZACION)
+
+    # 9-10 es de A (solapado) y 10-12 de B: domina B y se marca el solape
+    assert indice.speaker_dominante(9.0, 12.0, 1.0) == ("B", True)
+    assert indice.speaker_dominante(1.0, 7.0, 1.0) == ("A", False)
+    # Segmento completamente en silencio: se usa su punto medio
+    assert indice.speaker_dominante(12.2, 14.9, 1.0) == (None, False)
+    assert indice.speaker_dominante(12.2, 14.9, 2.0) == ("A", False)
+
+
+def test_intervalos_contiguos_del_mismo_speaker_se_fusionan():
+    indice = IndiceIntervalos([
+        {"start": 0.0, "end": 5.0, "speaker_id": "A"},
+        {"start": 5.0, "end": 8.0, "speaker_id": "A"},
+        {"start": 9.0, "end": 9.0, "speaker_id": "B"},  # duración nula: se ignora
+    ])
+
+    assert len(indice) == 1
+    assert (indice.inicios, indice.fines) == ([0.0], [8.0])
+    assert "B" not in indice.tiempo_por_speaker
+
+
+def test_diarizacion_vacia():
+    indice = IndiceIntervalos([])
+
+    assert len(indice) == 0
+    assert indice.speaker_en(3.0, 1.0) == (None, False)
+    assert indice.speaker_dominante(0.0, 1.0, 1.0) == (None, False)
+
+
+def test_etiquetar_segmentos_con_indice_cacheado():
+    service = SpeakerFusionService(tolerancia_silencio_sec=1.0)
+    indexada = service.indexar_diarizacion(
+        "diarizacion-1",
+        DIARIZACION,
+        [{"speaker_id": "A", "tipo_speaker": "profesor"}]
+    )
+    assert service.indice_cacheado("diarizacion-1") is indexada
+    assert service.indice_cacheado("diarizacion-2") is None
+
+    segmentos = [
+        {
+            "start": 9.0,
+            "end": 12.0,
+            "words": [
+                {"word": "sì", "start": 9.0, "end": 9.5},
+                {"word": "esatto", "start": 10.5, "end": 11.5},
+            ],
+        },
+        {"start": 13.2, "end": 13.8, "words": None},
+    ]
+    service.etiquetar_segmentos(segmentos, indexada)
+
+    assert segmentos[0]["speaker_id"] == "B"
+    assert segmentos[0]["tipo_speaker"] is None
+    assert [p["speaker_id"] for p in segmentos[0]["words"]] == ["A", "B"]
+    assert segmentos[1]["speaker_id"] == SPEAKER_DESCONOCIDO
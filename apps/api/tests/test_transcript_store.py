@@ -0,0 +1,115 @@
+"""Tests para el almacenamiento columnar de segmentos de transcripción."""
+import pytest
+
+from app.services.transcript_store_service import TablaSegmentos
+
+
+# Desordenados a propósito; el segmento 1.5-6.0 solapa al siguiente
+SEGMENTOS = [
+    {
+        "start": 7.0, "end": 8.0, "text": "fine", "confidence": 0.75,
+        "words": [{"word": "fine", "start": 7.0, "end": 8.0, "probability": 0.5}],
+    },
+    {
+        "start": 0.0, "end": 2.0, "text": "ciao a tutti", "confidence": 0.5,
+        "words": [
+            {"word": "ciao", "start": 0.0, "end": 0.5, "probability": 0.25},
+            {"word": "a", "start": 0.5, "end": 1.0, "probability": 0.5},
+            {"word": "tutti", "start": 1.0, "end": 2.0, "probability": 0.75},
+        ],
+    },
+    {
+        "start": 1.5, "end": 6.0, "text": "il cuore è un muscolo", "confidence": 0.25,
+        "words": [{"word": "cuore", "start": 2.0, "end": 2.5, "probability": 1.0}],
+    },
+    {"start": 3.0, "end": 4.0, "text": "sì", "confidence": 1.0, "words": None},
+]
+
+ORDENADOS = sorted(SEGMENTOS, key=lambda s: s["start"])
+
+
+@pytest.fixture
+def tabla(tmp_path):
+    """Tabla escrita a disco y reabierta con memory-mapping."""
+    ruta = tmp_path / "transcripcion.axseg"
+    ruta.write_bytes(TablaSegmentos.desde_segmentos(SEGMENTOS).a_bytes())
+    return TablaSegmentos.abrir(str(ruta))
+
+
+def test_ida_y_vuelta(tabla):
+    assert tabla.num_segmentos == len(SEGMENTOS)
+    for i, esperado in enumerate(ORDENADOS):
+        assert tabla.segmento(i) == esperado
+
+
+def test_segmento_sin_palabras(tabla):
+    assert tabla.segmento(1, incluir_palabras=False)["words"] is None
+
+
+def test_artefacto_no_valido(tmp_path):
+    ruta = tmp_path / "otro.bin"
+    ruta.write_bytes(b"no es un artefacto")
+    with pytest.raises(ValueError):
+        TablaSegmentos.abrir(str(ruta))
+
+
+@pytest.mark.parametrize("t0, t1, esperados", [
+    (0.0, 1.0, [0]),
+    (3.5, 3.6, [1, 2]),
+    # Solo el segmento largo cubre 4.5-5.0 (lo encuentra seg_end_max)
+    (4.5, 5.0, [1]),
+    # Rango semiabierto: 0.0-2.0 termina en t0 y 3.0-4.0 empieza en t1
+    (2.0, 3.0, [1]),
+    (6.0, 7.0, []),
+    (10.0, 20.0, []),
+    (float("-inf"), float("inf"), [0, 1, 2, 3]),
+])
+def test_indices_en_rango(tabla, t0, t1, esperados):
+    assert tabla.indices_en_rango(t0, t1).tolist() == esperados
+
+
+def test_pagina_por_cursor(tabla):
+    segmentos, siguiente = tabla.pagina(cursor=0, limite=2)
+    assert [s["indice"] for s in segmentos] == [0, 1]
+    assert siguiente == 2
+
+    segmentos, siguiente = tabla.pagina(cursor=2, limite=2)
+    assert [s["indice"] for s in segmentos] == [2, 3]
+    assert siguiente is None
+
+
+@pytest.mark.parametrize("cursor", [4, 10])
+def test_pagina_con_cursor_al_final(tabla, cursor):
+    assert tabla.pagina(cursor=cursor, limite=2) == ([], None)
+
+
+def test_pagina_por_rango_y_cursor(tabla):
+    segmentos, siguiente = tabla.pagina(t0=3.5, t1=10.0, cursor=0, limite=1)
+    assert [s["indice"] for s in segmentos] == [1]
+    assert siguiente == 2
+
+    segmentos, siguiente = tabla.pagina(t0=3.5, t1=10.0, cursor=siguiente, limite=1)
+    assert [s["indice"] for s in segmentos] == [2]
+    assert siguiente == 3
+
+    segmentos, siguiente = tabla.pagina(t0=3.5, t1=10.0, cursor=siguiente, limite=1)
+    assert [s["indice"] for s in segmentos] == [3]
+    assert siguiente is None
+
+
+def test_pagina_solo_con_t0(tabla):
+    segmentos, siguiente = tabla.pagina(t0=5.0, limite=10, incluir_palabras=False)
+    assert [s["indice"] for s in segmentos] == [1, 3]
+    assert all(s["words"] is None for s in segmentos)
+    assert siguiente is None
+
+
+def test_tabla_vacia(tmp_path):
+    ruta = tmp_path / "vacia.axseg"
+    ruta.write_bytes(TablaSegmentos.desde_segmentos([]).a_bytes())
+    tabla = TablaSegmentos.abrir(str(ruta))
+
+    assert tabla.num_segmentos == 0
+    assert tabla.indices_en_rango(0.0, 10.0).tolist() == []
+    assert tabla.pagina() == ([], None)
+    assert tabla.pagina(t0=0.0, t1=1.0) == ([], None)
@@ -0,0 +1,102 @@
+"""Tests para el ETag y la respuesta 304 de los segmentos de transcripción."""
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import Response
+from starlette.requests import Request
+
+from app.api.v1.endpoints.processing import (
+    _etag_coincide,
+    _transcription_etag,
+    get_transcription_segments,
+)
+
+ETAG = 'W/"abc123"'
+
+
+@pytest.mark.parametrize("if_none_match", [
+    'W/"abc123"',
+    '"abc123"',
+    '"otro", W/"abc123"',
+    ' "otro" ,"abc123" ',
+    "*",
+])
+def test_etag_coincide(if_none_match):
+    assert _etag_coincide(if_none_match, ETAG)
+
+
+@pytest.mark.parametrize("if_none_match", [
+    None,
+    "",
+    '"abc"',
+    'W/"abc1234"',
+    # Subcadena del ETag, no un ETag de la lista
+    'W/"xabc123"',
+    '"otro", W/"distinto"',
+])
+def test_etag_no_coincide(if_none_match):
+    assert not _etag_coincide(if_none_match, ETAG)
+
+
+class _ResultadoFalso:
+    def __init__(self, fila):
+        self._fila = fila
+
+    def first(self):
+        return self._fila
+
+
+class _DbFalsa:
+    """AsyncSession mínima que solo responde a la consulta de metadatos."""
+
+    def __init__(self, fila):
+        self.fila = fila
+        self.consultas = 0
+
+    async def execute(self, statement):
+        self.consultas += 1
+        return _ResultadoFalso(self.fila)
+
+    async def get(self, *args):
+        raise AssertionError("Un 304 no debe cargar los segmentos")
+
+
+def _pedir(db, transcription_id, if_none_match):
+    request = Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"if-none-match", if_none_match.encode())],
+    })
+    return asyncio.run(get_transcription_segments(
+        transcription_id,
+        request,
+        Response(),
+        t0=None,
+        t1=None,
+        cursor=0,
+        limit=100,
+        include_words=True,
+        include_speakers=False,
+        db=db,
+    ))
+
+
+def test_segmentos_no_modificados_devuelve_304():
+    transcription_id = uuid4()
+    fila = SimpleNamespace(
+        ruta_segmentos_columnar="transcripciones/t.axseg",
+        processing_job_id=uuid4(),
+        updated_at=datetime(2024, 3, 1, 10, 30),
+    )
+    etag = _transcription_etag(transcription_id, fila.updated_at, None)
+    db = _DbFalsa(fila)
+
+    respuesta = _pedir(db, transcription_id, f'"otro", {etag}')
+
+    assert respuesta.status_code == 304
+    assert respuesta.headers["ETag"] == etag
+    assert db.consultas == 1
@@ -0,0 +1,67 @@
+"""Tests para el bitmap de chunks recibidos de UploadSession."""
+import pytest
+
+from app.models.upload_session import UploadSession
+
+
+def _bitmap(chunks, total):
+    """Bitmap con la numeración de bits de set_bit de PostgreSQL."""
+    bitmap = bytearray(UploadSession.empty_chunks_bitmap(total))
+    for chunk_number in chunks:
+        indice = chunk_number - 1
+        bitmap[indice >> 3] |= 1 << (indice & 7)
+    return bytes(bitmap)
+
+
+def _recibidos(bitmap, total):
+    return [n for n in range(1, total + 1) if UploadSession.chunk_in_bitmap(bitmap, n)]
+
+
+@pytest.mark.parametrize("bitmap", [b"", None])
+def test_bitmap_vacio(bitmap):
+    assert UploadSession.contiguous_chunks_from_bitmap(bitmap) == 0
+    assert UploadSession.missing_chunks_from_bitmap(bitmap, 3) == [1, 2, 3]
+    assert not UploadSession.chunk_in_bitmap(bitmap, 1)
+
+
+def test_chunks_fuera_de_orden():
+    bitmap = _bitmap([1, 2, 4, 9], 10)
+
+    assert UploadSession.contiguous_chunks_from_bitmap(bitmap) == 2
+    assert UploadSession.missing_chunks_from_bitmap(bitmap, 10) == [3, 5, 6, 7, 8, 10]
+    assert _recibidos(bitmap, 10) == [1, 2, 4, 9]
+    # Más allá del bitmap
+    assert not UploadSession.chunk_in_bitmap(bitmap, 17)
+    assert not UploadSession.chunk_in_bitmap(bitmap, 100)
+
+
+@pytest.mark.parametrize("total", [1, 7, 8, 9, 16, 500])
+def test_todos_recibidos(total):
+    bitmap = _bitmap(range(1, total + 1), total)
+
+    assert UploadSession.contiguous_chunks_from_bitmap(bitmap) == total
+    assert UploadSession.missing_chunks_from_bitmap(bitmap, total) == []
+    assert _recibidos(bitmap, total) == list(range(1, total + 1))
+
+
+def test_prefijo_contiguo_cruza_bytes():
+    bitmap = _bitmap([*range(1, 12), 13], 16)
+
+    assert UploadSession.contiguous_chunks_from_bitmap(bitmap) == 11
+    assert UploadSession.missing_chunks_from_bitmap(bitmap, 16) == [12, 14, 15, 16]
+
+
+def test_bitmap_mas_corto_que_el_total():
+    """El total puede crecer después de recibir chunks (bitmap sin ampliar)."""
+    assert UploadSession.missing_chunks_from_bitmap(b"\xff\xff", 18) == [17, 18]
+
+
+def test_bitmap_mas_largo_que_el_total():
+    """Los bits posteriores al total no cuentan como faltantes."""
+    assert UploadSession.missing_chunks_from_bitmap(b"\x0f\x00", 4) == []
+    assert UploadSession.missing_chunks_from_bitmap(b"\x07\x00", 4) == [4]
+
+
+@pytest.mark.parametrize("total, longitud", [(None, 0), (0, 0), (1, 1), (8, 1), (9, 2), (500, 63)])
+def test_bitmap_vacio_por_total(total, longitud):
+    assert UploadSession.empty_chunks_bitmap(total) == bytes(longitud)